@@ -0,0 +1,47 @@
+"""
+Benchmark of builds with uniformly spaced X coordinates.
+
+Compares building with the default X coordinates (not allocated, the indices are used directly)
+against passing the same X coordinates explicitly, in time and in peak memory allocated by NumPy.
+
+Usage: python benchmarks/uniform_xs.py [n]
+"""
+
+import sys
+import tracemalloc
+from timeit import repeat
+
+import numpy as np
+
+from ts2vg import HorizontalVG, NaturalVG
+
+
+def peak_memory(f):
+    tracemalloc.start()
+    f()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return peak
+
+
+def main(n=1_000_000):
+    rng = np.random.default_rng(0)
+    ts = rng.random(n)
+    xs = np.arange(n, dtype=np.float64)
+
+    print(f"n = {n}")
+    print(f"{'graph':<30} {'xs':<10} {'time (s)':>10} {'peak memory (MB)':>18}")
+
+    for graph in [NaturalVG(), NaturalVG(weighted="distance"), HorizontalVG(), HorizontalVG(weighted="distance")]:
+        name = f"{type(graph).__name__}({graph.weighted or ''})"
+
+        for label, args in [("default", (ts,)), ("explicit", (ts, xs))]:
+            t = min(repeat(lambda: graph.count_edges(*args), number=1, repeat=3))
+            mem = peak_memory(lambda: graph.count_edges(*args))
+
+            print(f"{name:<30} {label:<10} {t:>10.3f} {mem / 2**20:>18.1f}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -33,6 +33,11 @@ def main():
                   [f"ts2vg/graph/_horizontal_penetrable.pyx"],
                   include_dirs=include_dirs,
                   define_macros=define_macros),
+
+        Extension("ts2vg.graph._metrics",
+                  [f"ts2vg/graph/_metrics.pyx"],
+                  include_dirs=include_dirs,
+                  define_macros=define_macros),
     ]
     # fmt: on
 
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+import ts2vg
+from ts2vg.batch import build_async_iter
+
+
+def test_build_async():
+    ts = np.random.default_rng(0).random(200)
+    g_ref = ts2vg.NaturalVG(weighted="distance").build(ts)
+
+    g = ts2vg.NaturalVG(weighted="distance")
+    out = asyncio.run(g.build_async(ts))
+
+    assert out is g
+    assert g.edges == g_ref.edges
+
+
+def test_build_async_process_pool():
+    ts = np.random.default_rng(1).random(200)
+    g_ref = ts2vg.HorizontalVG(directed="left_to_right").build(ts)
+
+    g = ts2vg.HorizontalVG(directed="left_to_right")
+
+    async def main():
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            await g.build_async(ts, executor=executor)
+
+    asyncio.run(main())
+
+    assert g.edges == g_ref.edges
+    np.testing.assert_array_equal(g.degrees, g_ref.degrees)
+
+
+@pytest.mark.parametrize("kwargs", [{"cancel": threading.Event()}, {"progress": print}])
+def test_build_async_process_pool_unsupported(kwargs):
+    async def main():
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            await ts2vg.NaturalVG().build_async([1.0, 3.0, 2.0], executor=executor, **kwargs)
+
+    with pytest.raises(ValueError, match="ProcessPoolExecutor"):
+        asyncio.run(main())
+
+
+def test_build_async_cancel():
+    ts = (np.arange(3000) - 1500.0) ** 2  # complete graph, slow to build
+    started = threading.Event()
+
+    async def main():
+        task = asyncio.ensure_future(ts2vg.NaturalVG().build_async(ts, progress=lambda *_: started.set()))
+
+        while not started.is_set():
+            await asyncio.sleep(0.001)
+
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 3])
+def test_build_async_iter(max_concurrency):
+    rng = np.random.default_rng(2)
+    series = [rng.random(n) for n in [5, 100, 0, 50, 10]]
+
+    async def main():
+        results = []
+        in_flight = 0
+        max_in_flight = 0
+
+        async def gen():
+            nonlocal in_flight, max_in_flight
+
+            for ts in series:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+                yield ts
+
+        async for i, g in build_async_iter(gen(), ts2vg.NaturalVG(), max_concurrency=max_concurrency):
+            in_flight -= 1
+            results.append((i, g))
+
+        return results, max_in_flight
+
+    results, max_in_flight = asyncio.run(main())
+
+    assert sorted(i for i, _ in results) == list(range(len(series)))
+    assert max_in_flight <= max_concurrency + 1
+
+    for i, g in results:
+        assert g.edges == ts2vg.NaturalVG().build(series[i]).edges
+
+
+def test_build_async_iter_stop_early():
+    series = [(np.arange(2000) - 1000.0) ** 2 for _ in range(4)]  # complete graphs, slow to build
+
+    async def main():
+        results = build_async_iter(series, ts2vg.NaturalVG(), max_concurrency=2)
+
+        await results.__anext__()
+        await results.aclose()
+
+        return asyncio.all_tasks()
+
+    # only the main task is left
+    assert len(asyncio.run(main())) == 1
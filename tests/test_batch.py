@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+import ts2vg
+from ts2vg.batch import build_parallel
+
+
+@pytest.mark.parametrize("graph", [
+    ts2vg.NaturalVG(),
+    ts2vg.NaturalVG(directed="top_to_bottom", weighted="distance"),
+    ts2vg.HorizontalVG(weighted="slope", min_weight=0),
+    ts2vg.NaturalVG(penetrable_limit=2),
+])
+def test_build_parallel(graph):
+    rng = np.random.default_rng(0)
+    series = [rng.random(n) for n in [0, 1, 2, 50, 300]] + [rng.integers(0, 5, 100)]
+
+    graphs = build_parallel(iter(series), graph, processes=2)
+
+    assert len(graphs) == len(series)
+
+    for g, ts in zip(graphs, series):
+        g_ref = graph._empty_copy().build(ts)
+
+        assert g is not graph
+        assert g.edges == g_ref.edges
+        np.testing.assert_array_equal(g.ts, g_ref.ts)
+        np.testing.assert_array_equal(g.xs, g_ref.xs)
+        np.testing.assert_array_equal(g.degrees, g_ref.degrees)
+        np.testing.assert_array_equal(g.degrees_in, g_ref.degrees_in)
+        np.testing.assert_array_equal(g.degrees_out, g_ref.degrees_out)
+
+
+def test_build_parallel_empty():
+    assert build_parallel([], ts2vg.NaturalVG()) == []
+
+
+def test_build_parallel_invalid():
+    with pytest.raises(ValueError):
+        build_parallel([[1, 2], [[1, 2], [3, 4]]], ts2vg.NaturalVG())
@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+import ts2vg
+from ts2vg.graph.base import BudgetExceededError
+from fixtures import empty_ts, sample_ts
+
+
+@pytest.fixture
+def convex_ts():
+    # every pair of points is visible, resulting in a complete graph
+    return (np.arange(500, dtype="float64") - 250) ** 2
+
+
+@pytest.mark.parametrize("vg_class", [ts2vg.NaturalVG, ts2vg.HorizontalVG])
+@pytest.mark.parametrize("penetrable_limit", [0, 1])
+def test_max_edges_exceeded(convex_ts, vg_class, penetrable_limit):
+    with pytest.raises(BudgetExceededError) as exc_info:
+        vg_class(penetrable_limit=penetrable_limit).build(convex_ts, max_edges=100)
+
+    assert exc_info.value.n_edges == 100
+    assert exc_info.value.max_edges == 100
+    assert exc_info.value.degrees_in.sum() == 100
+    assert exc_info.value.degrees_out.sum() == 100
+
+
+def test_max_edges_not_exceeded(sample_ts):
+    out_got = ts2vg.NaturalVG().build(sample_ts, max_edges=4).n_edges
+
+    assert out_got == 4
+
+
+def test_max_edges_zero(sample_ts, empty_ts):
+    with pytest.raises(BudgetExceededError):
+        ts2vg.NaturalVG().build(sample_ts, max_edges=0)
+
+    assert ts2vg.NaturalVG().build(empty_ts, max_edges=0).n_edges == 0
+
+
+def test_max_edges_only_degrees(convex_ts):
+    with pytest.raises(BudgetExceededError):
+        ts2vg.NaturalVG().build(convex_ts, only_degrees=True, max_edges=100)
+
+
+def test_max_edges_parametric(sample_ts):
+    # filtered out edges do not count towards the budget
+    out_got = ts2vg.NaturalVG(weighted="h_distance", min_weight=1.5).build(sample_ts, max_edges=1).n_edges
+
+    assert out_got == 1
+
+
+def test_max_edges_negative(sample_ts):
+    with pytest.raises(ValueError):
+        ts2vg.NaturalVG().build(sample_ts, max_edges=-1)
+
+
+def test_max_memory_exceeded(convex_ts):
+    g = ts2vg.NaturalVG()
+
+    with pytest.raises(BudgetExceededError) as exc_info:
+        g.build(convex_ts, max_memory=1_000_000)
+
+    bytes_per_node, bytes_per_edge = g._memory_model(convex_ts)
+    assert "max_memory" in str(exc_info.value)
+    assert exc_info.value.max_memory == 1_000_000
+    assert exc_info.value.max_edges is None
+    assert exc_info.value.n_edges == (1_000_000 - len(convex_ts) * bytes_per_node) // bytes_per_edge
+    assert exc_info.value.memory == len(convex_ts) * bytes_per_node + (exc_info.value.n_edges + 1) * bytes_per_edge
+    assert exc_info.value.memory > 1_000_000
+
+
+def test_max_memory_and_max_edges(convex_ts):
+    # the tighter of the two budgets is the one reported
+    with pytest.raises(BudgetExceededError) as exc_info:
+        ts2vg.NaturalVG().build(convex_ts, max_edges=100, max_memory=1_000_000)
+
+    assert "maximum number of edges" in str(exc_info.value)
+    assert (exc_info.value.n_edges, exc_info.value.max_edges, exc_info.value.max_memory) == (100, 100, 1_000_000)
+    assert exc_info.value.memory < 1_000_000
+
+    with pytest.raises(BudgetExceededError) as exc_info:
+        ts2vg.NaturalVG().build(convex_ts, max_edges=100_000, max_memory=1_000_000)
+
+    assert "max_memory" in str(exc_info.value)
+    assert exc_info.value.max_edges == 100_000
+
+
+def test_max_memory_nodes_exceeded(convex_ts):
+    with pytest.raises(BudgetExceededError) as exc_info:
+        ts2vg.NaturalVG().build(convex_ts, only_degrees=True, max_memory=1_000)
+
+    assert exc_info.value.n_edges == 0
+    assert exc_info.value.max_edges is None
+    assert exc_info.value.max_memory == 1_000
+    assert exc_info.value.memory > 1_000
+
+
+def test_max_memory_not_exceeded(convex_ts):
+    out_got = ts2vg.NaturalVG().build(convex_ts, max_memory=100_000_000).n_edges
+
+    assert out_got == len(convex_ts) * (len(convex_ts) - 1) // 2
+
+
+def test_memory_model_inputs(convex_ts):
+    g = ts2vg.NaturalVG()
+
+    # float64 and float32 arrays are used as they are, lists and other dtypes are copied
+    assert g._memory_model(convex_ts) == g._memory_model(convex_ts.astype("float32"))
+    assert g._memory_model(convex_ts.tolist())[0] == g._memory_model(convex_ts)[0] + 8
+    assert g._memory_model(convex_ts.astype("float16"))[0] == g._memory_model(convex_ts)[0] + 8
+    assert g._memory_model(convex_ts, xs=np.arange(len(convex_ts)))[0] == g._memory_model(convex_ts)[0] + 8
+    assert g._memory_model(convex_ts, xs=np.arange(len(convex_ts), dtype="float64")) == g._memory_model(convex_ts)
+
+
+def test_budget_exceeded_keeps_previous_graph(sample_ts, convex_ts):
+    g = ts2vg.NaturalVG().build(sample_ts)
+
+    with pytest.raises(BudgetExceededError):
+        g.build(convex_ts, max_edges=100)
+
+    assert len(g.ts) == len(sample_ts)
+    assert g.n_edges == 4
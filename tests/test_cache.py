@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+import ts2vg
+from ts2vg.graph.cache import GraphCache
+
+
+def test_build_cache(tmp_path):
+    ts = np.random.default_rng(0).random(200)
+    cache = GraphCache(tmp_path)
+
+    g1 = ts2vg.NaturalVG(weighted="distance").build(ts, cache=cache)
+    assert len(cache.entries()) == 1
+
+    g2 = ts2vg.NaturalVG(weighted="distance").build(ts, cache=tmp_path)
+    assert len(cache.entries()) == 1
+    assert isinstance(g2.ts, np.memmap)  # loaded from the cache
+
+    assert sorted(g2.edges) == sorted(g1.edges)
+    np.testing.assert_array_equal(g2.degrees, g1.degrees)
+
+
+def test_build_cache_keys(tmp_path):
+    ts = np.random.default_rng(1).random(100)
+    cache = GraphCache(tmp_path)
+
+    ts2vg.NaturalVG().build(ts, cache=cache)
+    ts2vg.NaturalVG().build(ts, cache=cache)
+    ts2vg.NaturalVG().build(ts, only_degrees=True, cache=cache)
+    ts2vg.NaturalVG(directed="left_to_right").build(ts, cache=cache)
+    ts2vg.HorizontalVG().build(ts, cache=cache)
+    ts2vg.NaturalVG().build(ts, np.arange(100) * 2, cache=cache)
+    ts2vg.NaturalVG().build(ts[::-1], cache=cache)
+
+    assert len(cache.entries()) == 6
+
+    g = ts2vg.NaturalVG().build(ts, np.arange(100) * 2, cache=cache)
+    np.testing.assert_array_equal(g.xs, np.arange(100) * 2)
+
+
+def test_cache_eviction(tmp_path):
+    rng = np.random.default_rng(2)
+    cache = GraphCache(tmp_path)
+
+    series = [rng.random(100) for _ in range(3)]
+
+    for ts in series:
+        ts2vg.NaturalVG().build(ts, cache=cache)
+
+    sizes = [size for _, size, _ in cache.entries()]
+    assert len(sizes) == 3
+
+    cache.max_size = sum(sizes) - 1
+    cache.evict()
+    assert len(cache.entries()) == 2
+
+    cache.clear()
+    assert cache.entries() == []
+    assert cache.size == 0
+
+
+def test_cache_entry_larger_than_max_size(tmp_path):
+    rng = np.random.default_rng(3)
+    cache = GraphCache(tmp_path, max_size=1000)
+
+    ts2vg.NaturalVG().build(rng.random(100), cache=cache)
+    assert len(cache.entries()) == 1
+
+    # the previous entry is evicted, the new one is kept
+    ts = rng.random(100)
+    ts2vg.NaturalVG().build(ts, cache=cache)
+    assert len(cache.entries()) == 1
+    assert isinstance(ts2vg.NaturalVG().build(ts, cache=cache).ts, np.memmap)
+
+
+def test_build_cache_invalid(tmp_path):
+    with pytest.raises(ValueError):
+        ts2vg.NaturalVG().build([1, 2, 3], sink=lambda *_: None, cache=tmp_path)
@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import ts2vg
+from ts2vg.chunked import build_chunk, build_chunked, merge_chunks
+
+
+def _sorted_edges(g):
+    e = np.asarray(g.edges, dtype=float).reshape(-1, 3 if g.is_weighted else 2)
+    return e[np.lexsort(e.T[::-1])]
+
+
+def _assert_same_graph(g_chunked, g_ref):
+    np.testing.assert_array_equal(_sorted_edges(g_chunked), _sorted_edges(g_ref))
+    np.testing.assert_array_equal(g_chunked.degrees, g_ref.degrees)
+    np.testing.assert_array_equal(g_chunked.degrees_in, g_ref.degrees_in)
+    np.testing.assert_array_equal(g_chunked.degrees_out, g_ref.degrees_out)
+
+
+@pytest.mark.parametrize("graph_class", [ts2vg.NaturalVG, ts2vg.HorizontalVG])
+@pytest.mark.parametrize("directed", [None, "left_to_right", "top_to_bottom"])
+@pytest.mark.parametrize("n_chunks", [1, 2, 3, 7])
+def test_build_chunked(graph_class, directed, n_chunks):
+    rng = np.random.default_rng(0)
+    ts = rng.random(500)
+
+    g_ref = graph_class(directed=directed).build(ts)
+    g = build_chunked(graph_class(directed=directed), ts, n_chunks=n_chunks)
+
+    _assert_same_graph(g, g_ref)
+
+
+@pytest.mark.parametrize("graph_class", [ts2vg.NaturalVG, ts2vg.HorizontalVG])
+def test_build_chunked_weighted_xs(graph_class):
+    rng = np.random.default_rng(1)
+    ts = rng.integers(0, 5, 400)  # ties
+    xs = np.cumsum(rng.random(400) + 0.1)
+
+    g_ref = graph_class(weighted="distance", min_weight=2).build(ts, xs)
+    g = build_chunked(graph_class(weighted="distance", min_weight=2), ts, xs, chunk_size=37)
+
+    _assert_same_graph(g, g_ref)
+
+
+@pytest.mark.parametrize("offset", [10**13, 10**15])
+def test_build_chunked_int64(offset):
+    # large integer values, where comparing slopes with a tolerance is not exact
+    ts = np.cumsum(np.random.default_rng(4).integers(-1000, 1000, 5000)) + offset
+
+    g_ref = ts2vg.NaturalVG().build(ts)
+    g = build_chunked(ts2vg.NaturalVG(), ts, n_chunks=4)
+
+    _assert_same_graph(g, g_ref)
+
+
+def test_build_chunked_executor():
+    ts = np.random.default_rng(2).random(300)
+
+    g_ref = ts2vg.NaturalVG(weighted="slope").build(ts)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        g = build_chunked(ts2vg.NaturalVG(weighted="slope"), ts, executor=executor)
+
+    _assert_same_graph(g, g_ref)
+
+
+def test_merge_chunks():
+    ts = np.random.default_rng(3).random(200)
+    g_ref = ts2vg.NaturalVG(directed="top_to_bottom").build(ts)
+
+    gr = ts2vg.NaturalVG(directed="top_to_bottom")
+    chunks = [build_chunk(gr, ts[a : a + 50], start=a) for a in range(0, 200, 50)]
+
+    merged = merge_chunks(gr, merge_chunks(gr, chunks[0], chunks[1]), merge_chunks(gr, chunks[2], chunks[3]))
+    g = merged.to_graph(ts2vg.NaturalVG(directed="top_to_bottom"))
+
+    _assert_same_graph(g, g_ref)
+    assert merged.xs is None
+    np.testing.assert_array_equal(g.xs, np.arange(200))
+
+
+def test_merge_chunks_not_contiguous():
+    gr = ts2vg.NaturalVG()
+    left = build_chunk(gr, [1, 2, 3], start=0)
+    right = build_chunk(gr, [1, 2, 3], start=4)
+
+    with pytest.raises(ValueError):
+        merge_chunks(gr, left, right)
+
+
+def test_build_chunked_penetrable():
+    with pytest.raises(ValueError):
+        build_chunked(ts2vg.NaturalVG(penetrable_limit=1), [1, 2, 3], n_chunks=2)
@@ -0,0 +1,143 @@
+import ctypes
+import math
+import pickle
+
+import numpy as np
+import pytest
+
+import ts2vg
+
+WEIGHT_FUNC_TYPE = ctypes.CFUNCTYPE(ctypes.c_double, *[ctypes.c_double] * 5)
+
+
+def log_return(x_a, x_b, y_a, y_b, slope):
+    return np.log(y_b) - np.log(y_a)
+
+
+def scalar_decayed_distance(x_a, x_b, y_a, y_b, slope):
+    return abs(y_b - y_a) * math.exp(-(x_b - x_a))
+
+
+@pytest.fixture
+def positive_ts():
+    # enough edges to fill several blocks of weights
+    return np.exp(np.cumsum(np.random.default_rng(0).standard_normal(5000) * 0.1))
+
+
+@pytest.mark.parametrize("graph_type", [ts2vg.NaturalVG, ts2vg.HorizontalVG])
+def test_callable(positive_ts, graph_type):
+    ts = positive_ts
+
+    g = graph_type(directed="left_to_right", weighted=log_return).build(ts)
+
+    assert g.is_weighted
+    assert g.edges == [(a, b, pytest.approx(math.log(ts[b]) - math.log(ts[a]))) for a, b, _ in g.edges]
+
+
+def test_same_as_builtin(positive_ts):
+    def slope(x_a, x_b, y_a, y_b, slope):
+        return slope
+
+    g = ts2vg.NaturalVG(weighted=slope, penetrable_limit=1).build(positive_ts)
+
+    assert g.edges == ts2vg.NaturalVG(weighted="slope", penetrable_limit=1).build(positive_ts).edges
+
+
+def test_weight_limits(positive_ts):
+    g_all = ts2vg.NaturalVG(weighted=log_return).build(positive_ts)
+    g = ts2vg.NaturalVG(weighted=log_return, min_weight=-0.1, max_weight=0.2).build(positive_ts)
+
+    assert g.edges == [e for e in g_all.edges if -0.1 < e[2] < 0.2]
+
+
+def test_scalar_result():
+    g = ts2vg.NaturalVG(weighted=lambda x_a, x_b, y_a, y_b, slope: 1.0).build([1.0, 3.0, 2.0, 4.0])
+
+    assert {w for _, _, w in g.edges} == {1.0}
+
+
+def test_invalid_result():
+    with pytest.raises(ValueError, match="must return 4 weights"):
+        ts2vg.NaturalVG(weighted=lambda x_a, x_b, y_a, y_b, slope: x_a[:-1]).build([1.0, 3.0, 2.0, 4.0])
+
+
+def test_ctypes_function_pointer(positive_ts):
+    func = WEIGHT_FUNC_TYPE(scalar_decayed_distance)
+
+    g = ts2vg.NaturalVG(weighted=func).build(positive_ts[:500])
+    expected = ts2vg.NaturalVG(weighted=np.vectorize(scalar_decayed_distance)).build(positive_ts[:500])
+
+    assert g.edges == expected.edges
+
+
+def new_capsule(address, name):
+    new = ctypes.pythonapi.PyCapsule_New
+    new.restype = ctypes.py_object
+    new.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_void_p]
+    return new(address, name, None)
+
+
+def test_capsule(positive_ts):
+    func = WEIGHT_FUNC_TYPE(scalar_decayed_distance)
+    capsule = new_capsule(ctypes.cast(func, ctypes.c_void_p).value, b"double (double, double, double, double, double)")
+
+    expected = ts2vg.NaturalVG(weighted=func).build(positive_ts[:500]).edges
+
+    assert ts2vg.NaturalVG(weighted=capsule).build(positive_ts[:500]).edges == expected
+
+
+def test_invalid_function_pointer():
+    with pytest.raises(TypeError, match="signature"):
+        ts2vg.NaturalVG(weighted=ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_int)(lambda a: a))
+
+    with pytest.raises(TypeError, match="signature"):
+        ts2vg.NaturalVG(weighted=ctypes.CFUNCTYPE(ctypes.c_double, *[ctypes.c_double] * 5, use_errno=True)(scalar_decayed_distance))
+
+    func = WEIGHT_FUNC_TYPE(scalar_decayed_distance)
+    func.restype = ctypes.c_float
+
+    with pytest.raises(TypeError, match="signature"):
+        ts2vg.NaturalVG(weighted=func)
+
+    with pytest.raises(TypeError, match="null"):
+        ts2vg.NaturalVG(weighted=WEIGHT_FUNC_TYPE())
+
+
+def test_invalid_capsule():
+    address = ctypes.cast(WEIGHT_FUNC_TYPE(scalar_decayed_distance), ctypes.c_void_p).value
+
+    with pytest.raises(TypeError, match="signature"):
+        ts2vg.NaturalVG(weighted=new_capsule(address, None))
+
+    with pytest.raises(TypeError, match="signature"):
+        ts2vg.NaturalVG(weighted=new_capsule(address, b"int (int)"))
+
+
+def test_invalid_object():
+    class CompiledFunction:
+        # objects with an integer address are not trusted as function pointers
+        address = 1
+
+    with pytest.raises(TypeError):
+        ts2vg.NaturalVG(weighted=CompiledFunction())
+
+    with pytest.raises(TypeError):
+        ts2vg.HorizontalVG(weighted=1.5)
+
+
+def test_not_saved(tmp_path):
+    g = ts2vg.NaturalVG(weighted=log_return).build([1.0, 3.0, 2.0, 4.0])
+
+    with pytest.raises(ValueError):
+        g.save(tmp_path / "g")
+
+    with pytest.raises(ValueError):
+        ts2vg.NaturalVG(weighted=log_return).build([1.0, 3.0, 2.0, 4.0], cache=tmp_path / "cache")
+
+
+def test_pickle():
+    g = ts2vg.NaturalVG(weighted=log_return).build([1.0, 3.0, 2.0, 4.0])
+    g2 = pickle.loads(pickle.dumps(g))
+
+    assert g2.weighted is log_return
+    assert g2.edges == g.edges
@@ -0,0 +1,100 @@
+import math
+
+import numpy as np
+import pytest
+
+from fixtures import *
+import ts2vg
+
+
+@pytest.fixture
+def hvg_white_noise():
+    return ts2vg.HorizontalVG().build(np.random.default_rng(0).standard_normal(200_000))
+
+
+def test_degree_counts(brownian_motion_ts):
+    g = ts2vg.NaturalVG().build(brownian_motion_ts)
+
+    ks, cs = g.degree_counts
+    expected_ks, expected_cs = np.unique(g.degrees, return_counts=True)
+
+    np.testing.assert_array_equal(ks, expected_ks)
+    np.testing.assert_array_equal(cs, expected_cs)
+
+    ks, ps = g.degree_distribution
+    np.testing.assert_allclose(ps, expected_cs / len(brownian_motion_ts))
+
+
+def test_degree_counts_cached(brownian_motion_ts):
+    g = ts2vg.NaturalVG()
+
+    assert g.build(brownian_motion_ts).degree_counts[0][-1] == np.max(g.degrees)
+    assert g.build(brownian_motion_ts[:10]).degree_counts[0][-1] == np.max(g.degrees)
+
+
+def test_degree_counts_empty(empty_ts):
+    g = ts2vg.NaturalVG().build(empty_ts)
+
+    assert len(g.degree_counts[0]) == 0
+    assert len(g.degree_ccdf[0]) == 0
+    assert len(g.log_binned_degree_distribution()[0]) == 0
+    assert math.isnan(g.degree_exponent())
+
+
+def test_degree_ccdf(brownian_motion_ts):
+    g = ts2vg.NaturalVG().build(brownian_motion_ts)
+
+    ks, ps = g.degree_ccdf
+
+    np.testing.assert_array_equal(ks, g.degree_counts[0])
+    np.testing.assert_allclose(ps, [np.mean(g.degrees >= k) for k in ks])
+    assert ps[0] == 1.0
+
+
+@pytest.mark.parametrize("base", [2.0, 1.5, 10.0])
+def test_log_binned_degree_distribution(brownian_motion_ts, base):
+    g = ts2vg.NaturalVG().build(brownian_motion_ts)
+    degrees = g.degrees
+
+    ks, ps = g.log_binned_degree_distribution(base)
+
+    edges = sorted({math.ceil(base**i - 1e-9) for i in range(int(math.log(np.max(degrees), base)) + 2)})
+    expected = [
+        (math.sqrt(lo * (hi - 1)), np.sum((degrees >= lo) & (degrees < hi)) / (hi - lo) / len(degrees))
+        for lo, hi in zip(edges[:-1], edges[1:])
+        if np.any((degrees >= lo) & (degrees < hi))
+    ]
+
+    assert edges[-1] > np.max(degrees)
+    np.testing.assert_allclose(ks, [k for k, _ in expected])
+    np.testing.assert_allclose(ps, [p for _, p in expected])
+
+
+def test_hvg_exponent(hvg_white_noise):
+    # P(k) = (1/3) (2/3)^(k-2) for uncorrelated series (the two boundary nodes have degree 1)
+    assert hvg_white_noise.degree_exponent(k_min=2) == pytest.approx(math.log(3 / 2), abs=0.01)
+    assert hvg_white_noise.degree_exponent(k_min=5) == pytest.approx(math.log(3 / 2), abs=0.01)
+
+
+def test_power_law_exponent():
+    # degrees with a discrete power-law tail of exponent 2.5 for k >= 5
+    rng = np.random.default_rng(0)
+    ks = np.arange(5, 100_000)
+    ps = ks**-2.5
+    degrees = rng.choice(ks, size=200_000, p=ps / ps.sum())
+
+    g = ts2vg.NaturalVG()
+    g.ts = np.zeros(len(degrees))
+    g._degrees = degrees
+
+    assert g.degree_exponent("power_law", k_min=5) == pytest.approx(2.5, abs=0.05)
+
+
+def test_exponent_invalid(hvg_white_noise):
+    with pytest.raises(ValueError):
+        hvg_white_noise.degree_exponent("gamma")
+
+    with pytest.raises(ValueError):
+        hvg_white_noise.degree_exponent(k_min=0)
+
+    assert math.isnan(hvg_white_noise.degree_exponent(k_min=10_000))
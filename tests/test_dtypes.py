@@ -0,0 +1,73 @@
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+import ts2vg
+from naive_implementations import horizontal_visibility_graph, natural_visibility_graph
+
+GRAPHS = [
+    ts2vg.NaturalVG(),
+    ts2vg.NaturalVG(directed="left_to_right", weighted="slope", penetrable_limit=2),
+    ts2vg.HorizontalVG(weighted="distance"),
+    ts2vg.HorizontalVG(directed="top_to_bottom", penetrable_limit=1),
+]
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float64", "int32", "int64"])
+def test_supported_dtypes_not_copied(dtype):
+    ts = np.array([3, 1, 4, 1, 5, 9, 2, 6], dtype=dtype)
+
+    g = ts2vg.NaturalVG().build(ts)
+
+    assert g.ts is ts
+
+
+@pytest.mark.parametrize("dtype, expected", [("int8", "int64"), ("uint32", "int64"), ("uint64", "float64"), ("float16", "float64"), ("bool", "int64")])
+def test_other_dtypes_converted(dtype, expected):
+    ts = np.array([3, 1, 4, 1, 5, 9, 2, 6]).astype(dtype)
+
+    g = ts2vg.NaturalVG().build(ts)
+
+    assert g.ts.dtype == expected
+
+
+@pytest.mark.parametrize("graph", GRAPHS)
+@pytest.mark.parametrize("dtype", ["float32", "int32", "int64"])
+def test_same_as_float64(graph, dtype):
+    ts = np.random.default_rng(0).integers(-20, 20, 400)  # ties and collinear points
+
+    g = graph._empty_copy().build(ts.astype(dtype))
+    g_float64 = graph._empty_copy().build(ts.astype("float64"))
+
+    assert g.edges == g_float64.edges
+
+
+def test_int64_exact():
+    # the middle point is just below the line joining its neighbours, not distinguishable in float64
+    ts = np.array([0, 2**60 - 1, 2**61], dtype="int64")
+
+    assert sorted(ts2vg.NaturalVG().build(ts).edges) == [(0, 1), (0, 2), (1, 2)]
+    assert sorted(ts2vg.NaturalVG().build(ts.astype("float64")).edges) == [(0, 1), (1, 2)]
+
+
+@pytest.mark.parametrize("penetrable_limit", [0, 1, 3])
+def test_int64_large_values_natural(penetrable_limit):
+    rng = np.random.default_rng(1)
+    # nearly collinear points with large values
+    ts = 2**58 + np.arange(300, dtype="int64") * 2**40 + rng.integers(-3, 4, 300)
+
+    g = ts2vg.NaturalVG(penetrable_limit=penetrable_limit).build(ts)
+    expected = natural_visibility_graph([Fraction(int(y)) for y in ts], range(len(ts)), penetrable_limit)
+
+    assert sorted(g.edges) == sorted(expected)
+
+
+@pytest.mark.parametrize("penetrable_limit", [0, 2])
+def test_int64_large_values_horizontal(penetrable_limit):
+    ts = 2**62 + np.random.default_rng(2).integers(0, 5, 300)
+
+    g = ts2vg.HorizontalVG(penetrable_limit=penetrable_limit).build(ts)
+    expected = horizontal_visibility_graph([int(y) for y in ts], range(len(ts)), penetrable_limit)
+
+    assert sorted(g.edges) == sorted(expected)
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+import ts2vg
+
+
+def _blocks_to_edges(blocks, weighted):
+    edges = []
+
+    for sources, targets, weights in blocks:
+        if weighted:
+            edges.extend(zip(sources.tolist(), targets.tolist(), weights.tolist()))
+        else:
+            assert weights is None
+            edges.extend(zip(sources.tolist(), targets.tolist()))
+
+    return edges
+
+
+@pytest.mark.parametrize("graph_class", [ts2vg.NaturalVG, ts2vg.HorizontalVG])
+@pytest.mark.parametrize("weighted", [None, "distance"])
+def test_iter_edges(graph_class, weighted):
+    ts = np.random.default_rng(0).random(500)
+    g_ref = graph_class(weighted=weighted).build(ts)
+
+    g = graph_class(weighted=weighted)
+    blocks = list(g.iter_edges(ts, chunk_size=100))
+
+    assert all(len(b[0]) <= 100 for b in blocks)
+    assert _blocks_to_edges(blocks, weighted) == g_ref.edges
+    assert g.ts is None
+
+
+def test_iter_edges_close_early():
+    ts = (np.arange(2000) - 1000.0) ** 2  # complete graph
+
+    it = ts2vg.NaturalVG().iter_edges(ts, chunk_size=10)
+    sources, targets, _ = next(it)
+    it.close()
+
+    assert len(sources) == 10
+
+
+def test_iter_edges_error():
+    ts = np.random.default_rng(1).random(100)
+
+    with pytest.raises(ts2vg.graph.base.BudgetExceededError):
+        list(ts2vg.NaturalVG().iter_edges(ts, max_edges=10))
+
+
+def test_iter_edges_empty():
+    assert list(ts2vg.NaturalVG().iter_edges([])) == []
+
+
+def test_build_sink():
+    ts = np.random.default_rng(2).random(300)
+    g_ref = ts2vg.NaturalVG(weighted="slope").build(ts)
+
+    blocks = []
+    g = ts2vg.NaturalVG(weighted="slope").build(
+        ts, sink=lambda s, t, w: blocks.append((s.copy(), t.copy(), w.copy())), chunk_size=64
+    )
+
+    assert _blocks_to_edges(blocks, True) == g_ref.edges
+    assert g.n_edges == g_ref.n_edges
+    np.testing.assert_array_equal(g.degrees, g_ref.degrees)
+
+
+def test_build_sink_out_dir(tmp_path):
+    with pytest.raises(ValueError):
+        ts2vg.NaturalVG().build([1, 2, 3], sink=lambda *_: None, out_dir=tmp_path)
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+import ts2vg
+from fixtures import empty_ts, sample_ts, white_noise_ts, brownian_motion_ts
+
+
+@pytest.mark.parametrize("vg_class", [ts2vg.NaturalVG, ts2vg.HorizontalVG])
+@pytest.mark.parametrize("penetrable_limit", [0, 1])
+def test_count_edges(brownian_motion_ts, vg_class, penetrable_limit):
+    g = vg_class(penetrable_limit=penetrable_limit)
+
+    out_got = g.count_edges(brownian_motion_ts)
+
+    out_truth = vg_class(penetrable_limit=penetrable_limit).build(brownian_motion_ts).n_edges
+
+    assert out_got == out_truth
+
+
+def test_count_edges_parametric(sample_ts):
+    out_got = ts2vg.NaturalVG(weighted="h_distance", min_weight=1.5).count_edges(sample_ts)
+
+    assert out_got == 1
+
+
+def test_count_edges_does_not_build(sample_ts):
+    g = ts2vg.NaturalVG()
+    g.count_edges(sample_ts)
+
+    assert g.ts is None
+
+    with pytest.raises(ts2vg.graph.base.NotBuiltError):
+        g.edges
+
+
+def test_count_edges_empty_ts(empty_ts):
+    assert ts2vg.NaturalVG().count_edges(empty_ts) == 0
+
+
+@pytest.mark.parametrize("vg_class", [ts2vg.NaturalVG, ts2vg.HorizontalVG])
+@pytest.mark.parametrize("penetrable_limit", [0, 2])
+@pytest.mark.parametrize("directed", [None, "top_to_bottom"])
+def test_estimate_edges_exhaustive(white_noise_ts, vg_class, penetrable_limit, directed):
+    g = vg_class(directed=directed, weighted="v_distance", min_weight=0.0, penetrable_limit=penetrable_limit)
+
+    out_got = g.estimate_edges(white_noise_ts, n_samples=len(white_noise_ts), horizon=None)
+
+    out_truth = g.count_edges(white_noise_ts)
+
+    assert out_got == out_truth
+
+
+@pytest.mark.parametrize("vg_class", [ts2vg.NaturalVG, ts2vg.HorizontalVG])
+def test_estimate_edges_sampled(vg_class):
+    ts = np.random.default_rng(0).standard_normal(size=20_000)
+    g = vg_class()
+
+    m = g.count_edges(ts)
+    estimate = g.estimate_edges(ts, n_samples=2_000, confidence=None, seed=0)
+    upper = g.estimate_edges(ts, n_samples=2_000, confidence=0.99, seed=0)
+
+    assert estimate == pytest.approx(m, rel=0.1)
+    assert upper >= estimate
+
+
+def test_estimate_edges_horizon():
+    # all the nodes of a convex series are visible from each other
+    ts = np.arange(5_000, dtype=np.float64) ** 2
+    g = ts2vg.NaturalVG()
+
+    with pytest.warns(RuntimeWarning, match="horizon"):
+        estimate = g.estimate_edges(ts, n_samples=len(ts), horizon=100)
+
+    assert estimate == len(ts) * (len(ts) - 1) // 2
+
+
+def test_estimate_edges_invalid(sample_ts):
+    with pytest.raises(ValueError):
+        ts2vg.NaturalVG().estimate_edges(sample_ts, n_samples=0)
+
+    with pytest.raises(ValueError):
+        ts2vg.NaturalVG().estimate_edges(sample_ts, horizon=0)
+
+
+def test_estimate_memory(white_noise_ts):
+    g = ts2vg.NaturalVG()
+
+    full = g.estimate_memory(white_noise_ts)
+    only_degrees = g.estimate_memory(white_noise_ts, only_degrees=True)
+
+    assert full > only_degrees > 0
@@ -0,0 +1,108 @@
+import threading
+
+import numpy as np
+import pytest
+
+import ts2vg
+from ts2vg.graph.base import BuildCancelledError, BuildTimeoutError
+from fixtures import empty_ts, sample_ts, brownian_motion_ts
+
+
+@pytest.mark.parametrize("vg_class", [ts2vg.NaturalVG, ts2vg.HorizontalVG])
+@pytest.mark.parametrize("penetrable_limit", [0, 1])
+def test_progress(brownian_motion_ts, vg_class, penetrable_limit):
+    calls = []
+
+    vg_class(penetrable_limit=penetrable_limit).build(
+        brownian_motion_ts,
+        progress=lambda n_processed, n_total: calls.append((n_processed, n_total)),
+        progress_every=100,
+    )
+
+    n = len(brownian_motion_ts)
+
+    assert len(calls) == n // 100
+    assert calls[-1] == (n, n)
+    assert all(total == n for (_, total) in calls)
+    assert [done for (done, _) in calls] == sorted(done for (done, _) in calls)
+
+
+def test_progress_default_interval(brownian_motion_ts):
+    calls = []
+
+    ts2vg.NaturalVG().build(brownian_motion_ts, progress=lambda *args: calls.append(args))
+
+    assert len(calls) == 100
+
+
+def test_progress_empty_ts(empty_ts):
+    calls = []
+
+    ts2vg.NaturalVG().build(empty_ts, progress=lambda *args: calls.append(args))
+
+    assert calls == [(0, 0)]
+
+
+def test_progress_raises(brownian_motion_ts):
+    def progress(n_processed, n_total):
+        raise KeyboardInterrupt()
+
+    with pytest.raises(KeyboardInterrupt):
+        ts2vg.NaturalVG().build(brownian_motion_ts, progress=progress)
+
+
+@pytest.mark.parametrize("vg_class", [ts2vg.NaturalVG, ts2vg.HorizontalVG])
+@pytest.mark.parametrize("penetrable_limit", [0, 1])
+def test_cancel(brownian_motion_ts, vg_class, penetrable_limit):
+    cancel = threading.Event()
+    cancel.set()
+
+    with pytest.raises(BuildCancelledError) as exc_info:
+        vg_class(penetrable_limit=penetrable_limit).build(brownian_motion_ts, cancel=cancel)
+
+    assert exc_info.value.n_processed <= len(brownian_motion_ts)
+
+
+def test_cancel_from_progress(brownian_motion_ts):
+    cancel = threading.Event()
+
+    def progress(n_processed, n_total):
+        if n_processed >= n_total // 2:
+            cancel.set()
+
+    with pytest.raises(BuildCancelledError) as exc_info:
+        ts2vg.NaturalVG(penetrable_limit=1).build(brownian_motion_ts, progress=progress, cancel=cancel)
+
+    assert exc_info.value.n_processed < len(brownian_motion_ts)
+    assert exc_info.value.n_edges > 0
+
+
+def test_cancel_not_set(sample_ts):
+    out_got = ts2vg.NaturalVG().build(sample_ts, cancel=threading.Event()).n_edges
+
+    assert out_got == 4
+
+
+def test_timeout():
+    ts = np.random.default_rng(0).standard_normal(size=200_000)
+
+    with pytest.raises(BuildTimeoutError) as exc_info:
+        ts2vg.NaturalVG(penetrable_limit=1).build(ts, timeout=0.1)
+
+    assert isinstance(exc_info.value, TimeoutError)
+    assert isinstance(exc_info.value, BuildCancelledError)
+    assert exc_info.value.n_processed < len(ts)
+
+
+def test_timeout_not_exceeded(sample_ts):
+    out_got = ts2vg.NaturalVG().build(sample_ts, timeout=60).n_edges
+
+    assert out_got == 4
+
+
+def test_count_edges_cancel(brownian_motion_ts):
+    cancel = threading.Event()
+    cancel.set()
+
+    with pytest.raises(BuildCancelledError):
+        ts2vg.NaturalVG().count_edges(brownian_motion_ts, cancel=cancel)
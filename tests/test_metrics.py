@@ -0,0 +1,497 @@
+import numpy as np
+import pytest
+
+import ts2vg
+from ts2vg import metrics
+
+GRAPHS = [
+    ts2vg.NaturalVG(),
+    ts2vg.NaturalVG(directed="left_to_right", weighted="distance"),
+    ts2vg.NaturalVG(penetrable_limit=2),
+    ts2vg.HorizontalVG(),
+    ts2vg.HorizontalVG(directed="top_to_bottom", penetrable_limit=1),
+]
+
+
+def adjacency(g):
+    a = np.zeros((g.n_vertices, g.n_vertices), dtype=np.int64)
+    for u, v in g.edges_unweighted:
+        a[u, v] = a[v, u] = 1
+
+    return a
+
+
+def distances(a):
+    n = len(a)
+    dist = np.where(a > 0, 1.0, np.inf)
+    np.fill_diagonal(dist, 0.0)
+
+    for k in range(n):
+        dist = np.minimum(dist, dist[:, k, None] + dist[None, k, :])
+
+    return dist
+
+
+@pytest.fixture
+def ts():
+    return np.cumsum(np.random.default_rng(0).standard_normal(200))
+
+
+@pytest.mark.parametrize("graph", GRAPHS)
+def test_clustering(graph, ts):
+    g = graph._empty_copy().build(ts)
+    a = adjacency(g)
+    d = a.sum(axis=1)
+
+    expected_triangles = np.diag(a @ a @ a) // 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        expected_clustering = np.where(d > 1, 2 * expected_triangles / (d * (d - 1)), 0.0)
+
+    np.testing.assert_array_equal(metrics.triangles(g), expected_triangles)
+    np.testing.assert_allclose(metrics.local_clustering(g), expected_clustering)
+    assert metrics.average_clustering(g) == pytest.approx(np.mean(expected_clustering))
+    assert metrics.transitivity(g) == pytest.approx(np.sum(expected_triangles) / np.sum(d * (d - 1) / 2))
+
+
+def test_triangles_hubs():
+    ts = np.cumsum(np.random.default_rng(1).standard_normal(400))
+    ts[[0, 150, 151]] = 1e6  # nodes that see (almost) every other node
+
+    g = ts2vg.NaturalVG().build(ts)
+    a = adjacency(g)
+
+    np.testing.assert_array_equal(metrics.triangles(g), np.diag(a @ a @ a) // 2)
+
+
+@pytest.mark.parametrize("graph", GRAPHS)
+def test_csr(graph, ts):
+    g = graph._empty_copy().build(ts)
+    indptr, indices, forward = g._undirected_csr()
+    a = adjacency(g)
+
+    for u in range(len(ts)):
+        neighbors = indices[indptr[u] : indptr[u + 1]]
+
+        np.testing.assert_array_equal(neighbors, np.flatnonzero(a[u]))
+        assert np.all(indices[indptr[u] : forward[u]] < u)
+        assert np.all(indices[forward[u] : indptr[u + 1]] > u)
+
+
+@pytest.mark.parametrize("graph", GRAPHS)
+def test_assortativity(graph, ts):
+    g = graph._empty_copy().build(ts)
+    d = g.degrees
+    e = np.array(g.edges_unweighted)
+
+    expected = np.corrcoef(np.concatenate((d[e[:, 0]], d[e[:, 1]])), np.concatenate((d[e[:, 1]], d[e[:, 0]])))[0, 1]
+
+    assert metrics.degree_assortativity(g) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("graph", GRAPHS)
+def test_joint_degree_distribution(graph, ts):
+    g = graph._empty_copy().build(ts)
+    d = g.degrees
+    e = np.array(g.edges_unweighted)
+
+    pairs = np.concatenate((np.column_stack((d[e[:, 0]], d[e[:, 1]])), np.column_stack((d[e[:, 1]], d[e[:, 0]]))))
+    expected_pairs, expected_counts = np.unique(pairs, axis=0, return_counts=True)
+
+    ks, ks_other, counts = metrics.joint_degree_distribution(g, normalize=False)
+    np.testing.assert_array_equal(np.column_stack((ks, ks_other)), expected_pairs)
+    np.testing.assert_array_equal(counts, expected_counts)
+
+    ks, ks_other, ps = metrics.joint_degree_distribution(g)
+    np.testing.assert_allclose(ps, expected_counts / len(pairs))
+
+
+@pytest.mark.parametrize("graph", GRAPHS)
+def test_average_degree_connectivity(graph, ts):
+    g = graph._empty_copy().build(ts)
+    d = g.degrees
+    a = adjacency(g)
+
+    ks, knns = metrics.average_degree_connectivity(g)
+
+    np.testing.assert_array_equal(ks, np.unique(d[d > 0]))
+    np.testing.assert_allclose(knns, [np.mean((a @ d)[d == k] / k) for k in ks])
+
+
+def test_degree_correlations_empty():
+    g = ts2vg.NaturalVG().build([])
+
+    assert all(len(x) == 0 for x in metrics.joint_degree_distribution(g))
+    assert all(len(x) == 0 for x in metrics.average_degree_connectivity(g))
+
+
+def motif_code(a, start, size):
+    pairs = [(p, q) for p in range(size) for q in range(p + 1, size)]
+
+    return sum(1 << k for k, (p, q) in enumerate(pairs) if a[start + p, start + q])
+
+
+@pytest.mark.parametrize("graph", GRAPHS)
+@pytest.mark.parametrize("size", [2, 3, 4, 5])
+def test_motif_sequence(graph, ts, size):
+    g = graph._empty_copy().build(ts)
+    a = adjacency(g)
+
+    expected = [motif_code(a, i, size) for i in range(len(ts) - size + 1)]
+
+    np.testing.assert_array_equal(metrics.motif_sequence(g, size), expected)
+
+
+def test_motif_profile(ts):
+    g = ts2vg.HorizontalVG().build(ts)
+    codes = metrics.motif_sequence(g, 3)
+
+    profile = metrics.motif_profile(g, 3)
+
+    assert profile.shape == (8,)
+    assert np.sum(profile) == pytest.approx(1.0)
+    np.testing.assert_allclose(profile, np.bincount(codes, minlength=8) / len(codes))
+    np.testing.assert_array_equal(metrics.motif_profile(g, 3, normalize=False), np.bincount(codes, minlength=8))
+
+
+@pytest.mark.parametrize("window, step", [(3, 1), (10, 1), (50, 7), (20, 30), (198, 1), (200, 5)])
+def test_motif_profile_windows(ts, window, step):
+    g = ts2vg.NaturalVG().build(ts)
+    codes = metrics.motif_sequence(g, 3)
+
+    profiles = metrics.motif_profile(g, 3, window=window, step=step, normalize=False)
+    expected = [np.bincount(codes[s : s + window - 2], minlength=8) for s in range(0, len(ts) - window + 1, step)]
+
+    np.testing.assert_array_equal(profiles, np.array(expected).reshape(-1, 8))
+    np.testing.assert_allclose(np.sum(metrics.motif_profile(g, 3, window=window, step=step), axis=1), 1.0)
+
+
+def test_motif_profile_invalid(ts):
+    g = ts2vg.NaturalVG().build(ts)
+
+    with pytest.raises(ValueError):
+        metrics.motif_profile(g, 7)
+
+    with pytest.raises(ValueError):
+        metrics.motif_profile(g, 4, window=3)
+
+
+def test_motif_profiles():
+    series = [np.random.default_rng(i).standard_normal(100 + i) for i in range(5)]
+    graphs = [ts2vg.NaturalVG().build(ts) for ts in series]
+
+    profiles = metrics.motif_profiles(graphs, 4)
+
+    assert profiles.shape == (5, 64)
+    for g, profile in zip(graphs, profiles):
+        np.testing.assert_array_equal(profile, metrics.motif_profile(g, 4))
+
+    assert metrics.motif_profiles([], 4).shape == (0, 64)
+
+
+@pytest.mark.parametrize("graph", GRAPHS)
+def test_core_numbers(graph, ts):
+    g = graph._empty_copy().build(ts)
+    a = adjacency(g)
+    cores = metrics.core_numbers(g)
+
+    for k in range(cores.max() + 2):
+        # k-core by repeatedly removing the nodes with degree lower than k
+        nodes = np.ones(len(a), dtype=bool)
+        while True:
+            low = nodes & (a[:, nodes].sum(axis=1) < k)
+            if not low.any():
+                break
+            nodes &= ~low
+
+        np.testing.assert_array_equal(cores >= k, nodes)
+        np.testing.assert_array_equal(metrics.k_core(g, k), np.flatnonzero(nodes))
+
+    np.testing.assert_array_equal(metrics.k_core(g), np.flatnonzero(cores == cores.max()))
+
+
+@pytest.mark.parametrize("graph", GRAPHS)
+def test_path_lengths(graph, ts):
+    g = graph._empty_copy().build(ts)
+    dist = distances(adjacency(g))
+
+    np.testing.assert_array_equal(metrics.shortest_path_lengths(g, 17), dist[17])
+    assert metrics.average_shortest_path_length(g) == pytest.approx(np.sum(dist) / (len(ts) * (len(ts) - 1)))
+    assert metrics.diameter(g) == np.max(dist)
+    np.testing.assert_array_equal(metrics.eccentricity(g), np.max(dist, axis=1))
+    np.testing.assert_allclose(metrics.closeness(g), (len(ts) - 1) / np.sum(dist, axis=1))
+
+
+@pytest.mark.parametrize("threads", [1, 3, 8])
+def test_path_lengths_threads(ts, threads):
+    g = ts2vg.NaturalVG(penetrable_limit=1).build(ts)
+
+    assert metrics.average_shortest_path_length(g, threads=threads) == metrics.average_shortest_path_length(g, threads=1)
+    np.testing.assert_array_equal(metrics.eccentricity(g, threads=threads), metrics.eccentricity(g, threads=1))
+    np.testing.assert_array_equal(metrics.closeness(g, sample=20, seed=0, threads=threads), metrics.closeness(g, sample=20, seed=0, threads=1))
+
+
+def test_path_lengths_sampled(ts):
+    g = ts2vg.NaturalVG().build(ts)
+    dist = distances(adjacency(g))
+    sources = np.sort(np.random.default_rng(0).choice(len(ts), size=30, replace=False))
+
+    assert metrics.average_shortest_path_length(g, sample=30, seed=0) == pytest.approx(np.mean(dist[sources]) * len(ts) / (len(ts) - 1))
+    assert metrics.diameter(g, sample=30, seed=0) == np.max(dist[sources])
+    np.testing.assert_array_equal(metrics.eccentricity(g, sample=30, seed=0), np.max(dist[sources], axis=0))
+    np.testing.assert_allclose(metrics.closeness(g, sample=30, seed=0), (len(ts) - 1) / (np.sum(dist[sources], axis=0) * len(ts) / 30))
+
+    # exact when sampling all the nodes
+    assert metrics.diameter(g, sample=len(ts)) == metrics.diameter(g)
+
+    with pytest.raises(ValueError):
+        metrics.diameter(g, sample=0)
+
+
+CENTRALITY_GRAPHS = [
+    ts2vg.NaturalVG(),
+    ts2vg.HorizontalVG(directed="left_to_right"),
+    ts2vg.NaturalVG(weighted="abs_v_distance", penetrable_limit=1),
+]
+
+
+def weighted_adjacency(g, use_weights):
+    sources, targets, weights = g._edge_columns()
+    a = np.zeros((g.n_vertices, g.n_vertices))
+    a[sources, targets] = a[targets, sources] = weights if use_weights else 1.0
+
+    return a
+
+
+@pytest.mark.parametrize("graph", CENTRALITY_GRAPHS)
+@pytest.mark.parametrize("nan", [False, True])
+def test_pagerank(graph, ts, nan):
+    ts = np.where(np.arange(len(ts)) % 50 == 7, np.nan, ts) if nan else ts  # isolated nodes
+    g = graph._empty_copy().build(ts)
+    n = len(ts)
+
+    for use_weights in [False, True] if g.is_weighted else [False]:
+        a = weighted_adjacency(g, use_weights)
+        strengths = a.sum(axis=0)
+        p = np.where(strengths > 0, a / np.where(strengths > 0, strengths, 1), 1 / n)  # column stochastic
+
+        expected = np.linalg.solve(np.eye(n) - 0.85 * p, np.full(n, 0.15 / n))
+
+        np.testing.assert_allclose(metrics.pagerank(g, use_weights=use_weights, tol=1e-12), expected, rtol=1e-8)
+
+
+@pytest.mark.parametrize("graph", CENTRALITY_GRAPHS)
+def test_eigenvector_centrality(graph, ts):
+    g = graph._empty_copy().build(ts)
+
+    for use_weights in [False, True] if g.is_weighted else [False]:
+        _, vectors = np.linalg.eigh(weighted_adjacency(g, use_weights))
+        expected = np.abs(vectors[:, -1])
+
+        np.testing.assert_allclose(metrics.eigenvector_centrality(g, use_weights=use_weights, tol=1e-12, max_iter=10_000), expected, atol=1e-8)
+
+
+@pytest.mark.parametrize("graph", CENTRALITY_GRAPHS)
+def test_katz_centrality(graph, ts):
+    g = graph._empty_copy().build(ts)
+    n = len(ts)
+    beta = np.linspace(0.5, 1.5, n)
+
+    for use_weights in [False, True] if g.is_weighted else [False]:
+        a = weighted_adjacency(g, use_weights)
+        alpha = 0.5 / np.max(np.linalg.eigvalsh(a))
+
+        expected = np.linalg.solve(np.eye(n) - alpha * a, beta)
+        katz = metrics.katz_centrality(g, alpha, beta, tol=1e-12, normalized=False, use_weights=use_weights)
+
+        np.testing.assert_allclose(katz, expected, rtol=1e-8)
+        np.testing.assert_allclose(
+            metrics.katz_centrality(g, alpha, beta, tol=1e-12, use_weights=use_weights), expected / np.linalg.norm(expected), rtol=1e-8
+        )
+
+
+def test_centrality_warm_start(ts):
+    g = ts2vg.NaturalVG().build(ts)
+
+    pr = metrics.pagerank(g, tol=1e-10)
+    ev = metrics.eigenvector_centrality(g, tol=1e-10, max_iter=1000)
+    katz = metrics.katz_centrality(g, 0.01, tol=1e-10, normalized=False)
+
+    with pytest.raises(metrics.ConvergenceError):
+        metrics.pagerank(g, max_iter=2)
+
+    # already converged
+    np.testing.assert_allclose(metrics.pagerank(g, start=pr * 3, max_iter=2), pr)
+    np.testing.assert_allclose(metrics.eigenvector_centrality(g, start=ev, max_iter=2), ev, atol=1e-6)
+    np.testing.assert_allclose(metrics.katz_centrality(g, 0.01, start=katz, max_iter=2, normalized=False), katz)
+
+    # graphs of overlapping windows
+    pr = metrics.pagerank(ts2vg.NaturalVG().build(ts[:190]))
+    g_next = ts2vg.NaturalVG().build(ts[10:])
+    start = np.append(pr[10:], np.full(10, np.mean(pr)))
+    n_iter = {}
+
+    for name, s in [("cold", None), ("warm", start)]:
+        for max_iter in range(1, 100):
+            try:
+                n_iter[name] = max_iter
+                metrics.pagerank(g_next, start=s, max_iter=max_iter)
+                break
+            except metrics.ConvergenceError:
+                pass
+
+    assert n_iter["warm"] < n_iter["cold"]
+
+
+def test_centrality_invalid(ts):
+    g = ts2vg.NaturalVG().build(ts)
+
+    with pytest.raises(ValueError, match="weighted graphs"):
+        metrics.pagerank(g, use_weights=True)
+
+    with pytest.raises(ValueError, match="one value for each node"):
+        metrics.pagerank(g, start=np.ones(10))
+
+    with pytest.raises(ValueError, match="all zeros"):
+        metrics.eigenvector_centrality(g, start=np.zeros(len(ts)))
+
+
+def test_not_connected():
+    g = ts2vg.NaturalVG().build([1.0, 2.0, np.nan, 2.0, 1.0])
+
+    np.testing.assert_array_equal(metrics.shortest_path_lengths(g, 0), [0, 1, -1, 2, 3])  # the NaN node is isolated
+
+    with pytest.raises(ValueError, match="not connected"):
+        metrics.average_shortest_path_length(g)
+
+    with pytest.raises(ValueError, match="not connected"):
+        metrics.diameter(g)
+
+    with pytest.raises(ValueError, match="not connected"):
+        metrics.eccentricity(g)
+
+    # closeness within the connected component of each node
+    np.testing.assert_allclose(metrics.closeness(g), [3 / 6 * 3 / 4, 3 / 4 * 3 / 4, 0.0, 3 / 4 * 3 / 4, 3 / 6 * 3 / 4])
+
+
+def test_small_graphs():
+    g = ts2vg.NaturalVG().build([1.0])
+
+    assert metrics.average_shortest_path_length(g) == 0.0
+    assert metrics.diameter(g) == 0
+    assert metrics.transitivity(g) == 0.0
+    np.testing.assert_array_equal(metrics.core_numbers(g), [0])
+
+    g = ts2vg.NaturalVG().build([])
+
+    assert np.isnan(metrics.average_clustering(g))
+    assert len(metrics.triangles(g)) == 0
+
+
+def test_same_as_networkx(ts):
+    nx = pytest.importorskip("networkx")
+
+    g = ts2vg.NaturalVG(penetrable_limit=1).build(ts)
+    nx_g = g.as_networkx()
+
+    np.testing.assert_allclose(metrics.local_clustering(g), [nx.clustering(nx_g, i) for i in range(len(ts))])
+    assert metrics.degree_assortativity(g) == pytest.approx(nx.degree_assortativity_coefficient(nx_g))
+    assert dict(zip(*metrics.average_degree_connectivity(g))) == pytest.approx(nx.average_degree_connectivity(nx_g))
+    assert metrics.average_shortest_path_length(g) == pytest.approx(nx.average_shortest_path_length(nx_g))
+    np.testing.assert_allclose(metrics.closeness(g), [nx.closeness_centrality(nx_g, i) for i in range(len(ts))])
+
+
+def test_cache_reset(ts):
+    g = ts2vg.NaturalVG()
+
+    triangles = metrics.triangles(g.build(ts))
+
+    assert not np.array_equal(metrics.triangles(g.build(ts[::-1])), triangles)
+    np.testing.assert_array_equal(metrics.triangles(g.build(ts)), triangles)
+
+
+def kl_divergence(a, b):
+    values = sorted(set(a) | set(b))
+    p = np.array([np.mean([x == v for x in a]) for v in values])
+    q = np.array([np.mean([x == v for x in b]) for v in values])
+    mask = (p > 0) & (q > 0)
+
+    return np.sum(p[mask] * np.log(p[mask] / q[mask]))
+
+
+@pytest.mark.parametrize("graph_type", [ts2vg.NaturalVG, ts2vg.HorizontalVG])
+def test_irreversibility(graph_type, ts):
+    g = graph_type(directed="left_to_right").build(ts)
+    d_in, d_out = g.degrees_in.tolist(), g.degrees_out.tolist()
+
+    assert metrics.irreversibility(g) == pytest.approx(kl_divergence(d_out, d_in))
+    assert metrics.irreversibility(graph_type(directed="left_to_right").build(ts, only_degrees=True)) == metrics.irreversibility(g)
+
+    blocks_out = list(zip(d_out[:-2], d_out[1:-1], d_out[2:]))
+    blocks_in = list(zip(d_in[::-1][:-2], d_in[::-1][1:-1], d_in[::-1][2:]))
+    assert metrics.irreversibility(g, "degree_sequence", order=3) == pytest.approx(kl_divergence(blocks_out, blocks_in))
+
+    codes = metrics.motif_sequence(g, 3).tolist()
+    reversed_codes = metrics.motif_sequence(graph_type().build(ts[::-1]), 3).tolist()
+    assert metrics.irreversibility(g, "motif", size=3) == pytest.approx(kl_divergence(codes, reversed_codes))
+
+
+@pytest.mark.parametrize("method", ["degree", "degree_sequence", "motif"])
+def test_irreversibility_reversible(method, ts):
+    g = ts2vg.NaturalVG(directed="left_to_right").build(np.concatenate((ts, ts[::-1])))
+
+    assert metrics.irreversibility(g, method) == pytest.approx(0.0, abs=1e-12)
+    assert metrics.irreversibility(ts2vg.NaturalVG(directed="left_to_right").build(ts), method) > 0
+
+
+@pytest.mark.parametrize("graph_type", [ts2vg.NaturalVG, ts2vg.HorizontalVG])
+@pytest.mark.parametrize("method", ["degree", "degree_sequence", "motif"])
+@pytest.mark.parametrize("window, step", [(50, None), (40, 15), (200, 1)])
+def test_irreversibility_windows(graph_type, method, ts, window, step):
+    g = graph_type(directed="left_to_right").build(ts)
+
+    result = metrics.irreversibility(g, method, window=window, step=step)
+    expected = [
+        metrics.irreversibility(graph_type(directed="left_to_right").build(ts[s : s + window]), method)
+        for s in range(0, len(ts) - window + 1, step or window)
+    ]
+
+    np.testing.assert_allclose(result, expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("method", ["degree", "degree_sequence"])
+def test_irreversibility_window_blocks(monkeypatch, method, ts):
+    g = ts2vg.NaturalVG(directed="left_to_right").build(ts)
+    expected = metrics.irreversibility(g, method, window=50, step=3)
+
+    # windows processed in several blocks, with a block size that is not a multiple of the window
+    monkeypatch.setattr(metrics, "_WINDOW_BLOCK_SIZE", 170)
+    np.testing.assert_array_equal(metrics.irreversibility(g, method, window=50, step=3), expected)
+
+
+@pytest.mark.parametrize("method", ["degree", "degree_sequence"])
+def test_irreversibility_windows_only_degrees(method, ts):
+    g = ts2vg.NaturalVG(directed="left_to_right").build(ts, only_degrees=True)
+
+    with pytest.raises(ValueError, match="only_degrees"):
+        metrics.irreversibility(g, method, window=50)
+
+
+def test_irreversibility_batch():
+    graphs = [ts2vg.HorizontalVG(directed="left_to_right").build(np.random.default_rng(i).standard_normal(300)) for i in range(4)]
+
+    np.testing.assert_array_equal(metrics.irreversibility(graphs), [metrics.irreversibility(g) for g in graphs])
+
+    windowed = metrics.irreversibility(graphs, "motif", window=100)
+    assert len(windowed) == 4
+    np.testing.assert_array_equal(windowed[2], metrics.irreversibility(graphs[2], "motif", window=100))
+
+
+def test_irreversibility_invalid(ts):
+    with pytest.raises(ValueError, match="left_to_right"):
+        metrics.irreversibility(ts2vg.NaturalVG().build(ts))
+
+    with pytest.raises(ValueError, match="method"):
+        metrics.irreversibility(ts2vg.NaturalVG(directed="left_to_right").build(ts), "entropy")
+
+    # undirected graphs can be used with motifs
+    assert metrics.irreversibility(ts2vg.NaturalVG().build(ts), "motif") > 0
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+import ts2vg
+from fixtures import empty_ts, sample_ts, brownian_motion_ts
+
+
+def test_strengths(sample_ts):
+    g = ts2vg.NaturalVG(directed="left_to_right", weighted="h_distance").build(sample_ts)
+
+    np.testing.assert_allclose(g.strengths, [1.0, 4.0, 2.0, 3.0])
+    np.testing.assert_allclose(g.strengths_in, [0.0, 1.0, 1.0, 3.0])
+    np.testing.assert_allclose(g.strengths_out, [1.0, 3.0, 1.0, 0.0])
+
+
+def test_weights_min_max_mean(sample_ts):
+    g = ts2vg.NaturalVG(directed="left_to_right", weighted="h_distance").build(sample_ts)
+
+    np.testing.assert_allclose(g.weights_min, [1.0, 1.0, 1.0, 1.0])
+    np.testing.assert_allclose(g.weights_max, [1.0, 2.0, 1.0, 2.0])
+    np.testing.assert_allclose(g.weights_mean, [1.0, 4.0 / 3.0, 1.0, 1.5])
+
+
+def test_only_node_stats_no_edges(sample_ts):
+    g = ts2vg.NaturalVG(weighted="distance").build(sample_ts, only_node_stats=True)
+
+    with pytest.raises(ts2vg.graph.base.NotBuiltError):
+        g.edges
+
+    assert g.n_edges == 4
+
+
+def test_only_node_stats_isolated_nodes(sample_ts):
+    g = ts2vg.NaturalVG(weighted="h_distance", min_weight=1.5).build(sample_ts, only_node_stats=True)
+
+    np.testing.assert_array_equal(g.degrees, [0, 1, 0, 1])
+    np.testing.assert_allclose(g.strengths, [0.0, 2.0, 0.0, 2.0])
+    np.testing.assert_allclose(g.weights_min, [np.nan, 2.0, np.nan, 2.0])
+    np.testing.assert_allclose(g.weights_mean, [np.nan, 2.0, np.nan, 2.0])
+
+
+def test_only_node_stats_empty_ts(empty_ts):
+    g = ts2vg.NaturalVG(weighted="distance").build(empty_ts, only_node_stats=True)
+
+    assert g.strengths.size == 0
+    assert g.n_edges == 0
+
+
+@pytest.mark.parametrize("vg_class", [ts2vg.NaturalVG, ts2vg.HorizontalVG])
+@pytest.mark.parametrize("penetrable_limit", [0, 2])
+@pytest.mark.parametrize("weighted", ["distance", "v_distance", "slope", "num_penetrations"])
+@pytest.mark.parametrize("directed", [None, "top_to_bottom"])
+def test_only_node_stats_matches_full_build(brownian_motion_ts, vg_class, penetrable_limit, weighted, directed):
+    kwargs = dict(directed=directed, weighted=weighted, penetrable_limit=penetrable_limit)
+
+    full = vg_class(**kwargs).build(brownian_motion_ts)
+    stats = vg_class(**kwargs).build(brownian_motion_ts, only_node_stats=True)
+
+    np.testing.assert_array_equal(stats.degrees, full.degrees)
+    np.testing.assert_allclose(stats.strengths_in, full.strengths_in)
+    np.testing.assert_allclose(stats.strengths_out, full.strengths_out)
+    np.testing.assert_allclose(stats.weights_min, full.weights_min)
+    np.testing.assert_allclose(stats.weights_max, full.weights_max)
+    np.testing.assert_allclose(stats.weights_mean, full.weights_mean)
+
+
+def test_only_node_stats_unweighted(sample_ts):
+    with pytest.raises(ValueError):
+        ts2vg.NaturalVG().build(sample_ts, only_node_stats=True)
+
+
+def test_only_node_stats_and_only_degrees(sample_ts):
+    with pytest.raises(ValueError):
+        ts2vg.NaturalVG(weighted="distance").build(sample_ts, only_degrees=True, only_node_stats=True)
+
+
+def test_strengths_unweighted(sample_ts):
+    with pytest.raises(ValueError):
+        ts2vg.NaturalVG().build(sample_ts).strengths
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+import ts2vg
+from fixtures import empty_ts, sample_ts, brownian_motion_ts
+
+
+@pytest.fixture
+def memmap_ts(tmp_path, brownian_motion_ts):
+    path = tmp_path / "ts.npy"
+    np.save(path, np.asarray(brownian_motion_ts, dtype="float64"))
+
+    return np.load(path, mmap_mode="r")
+
+
+def test_read_only_memmap_no_copy(memmap_ts):
+    g = ts2vg.NaturalVG().build(memmap_ts)
+
+    assert np.shares_memory(g.ts, memmap_ts)
+
+
+@pytest.mark.parametrize("vg_class", [ts2vg.NaturalVG, ts2vg.HorizontalVG])
+@pytest.mark.parametrize("penetrable_limit", [0, 1])
+@pytest.mark.parametrize("weighted", [None, "distance"])
+def test_out_dir(tmp_path, memmap_ts, vg_class, penetrable_limit, weighted):
+    kwargs = dict(weighted=weighted, penetrable_limit=penetrable_limit)
+
+    g = vg_class(**kwargs).build(memmap_ts, out_dir=tmp_path / "out", chunk_size=100)
+    g_truth = vg_class(**kwargs).build(np.asarray(memmap_ts))
+
+    assert g.n_edges == g_truth.n_edges
+    assert g.edges == g_truth.edges
+    assert isinstance(g.degrees, np.memmap)
+    np.testing.assert_array_equal(g.degrees, g_truth.degrees)
+    np.testing.assert_array_equal(g.degrees_in, g_truth.degrees_in)
+    np.testing.assert_array_equal(g.degrees_out, g_truth.degrees_out)
+
+    if weighted is not None:
+        np.testing.assert_array_equal(g.weights, g_truth.weights)
+
+
+def test_out_dir_files(tmp_path, memmap_ts):
+    out_dir = tmp_path / "out"
+    g = ts2vg.NaturalVG(weighted="distance").build(memmap_ts, out_dir=out_dir)
+
+    assert sorted(p.name for p in out_dir.iterdir()) == [
+        "degrees.npy",
+        "degrees_in.npy",
+        "degrees_out.npy",
+        "sources.npy",
+        "targets.npy",
+        "weights.npy",
+    ]
+
+    np.testing.assert_array_equal(np.load(out_dir / "sources.npy"), g._edges_array[:, 0])
+    np.testing.assert_array_equal(g.xs, np.arange(len(memmap_ts)))
+
+    # float64 input is used directly, not written again
+    assert np.shares_memory(g.ts, memmap_ts)
+
+
+def test_out_dir_converted(tmp_path, brownian_motion_ts):
+    ts = np.asarray(np.asarray(brownian_motion_ts) * 100, dtype="int16")
+    xs = np.arange(len(ts), dtype="int32") * 2
+
+    g = ts2vg.NaturalVG().build(ts, xs, out_dir=tmp_path, chunk_size=64)
+
+    np.testing.assert_array_equal(np.load(tmp_path / "ts.npy"), ts.astype("int64"))
+    np.testing.assert_array_equal(np.load(tmp_path / "xs.npy"), xs.astype("float64"))
+    assert g.n_edges == ts2vg.NaturalVG().build(ts, xs).n_edges
+
+
+def test_out_dir_float32(tmp_path, brownian_motion_ts):
+    ts = np.asarray(brownian_motion_ts, dtype="float32")
+
+    g = ts2vg.NaturalVG().build(ts, out_dir=tmp_path, chunk_size=64)
+
+    # supported by the kernels, used directly
+    assert not (tmp_path / "ts.npy").exists()
+    assert g.ts is ts
+    assert g.n_edges == ts2vg.NaturalVG().build(ts).n_edges
+
+
+def test_out_dir_only_degrees(tmp_path, memmap_ts):
+    g = ts2vg.HorizontalVG().build(memmap_ts, out_dir=tmp_path, only_degrees=True)
+
+    assert not (tmp_path / "sources.npy").exists()
+    np.testing.assert_array_equal(g.degrees, ts2vg.HorizontalVG().build(memmap_ts).degrees)
+
+
+def test_out_dir_empty_ts(tmp_path, empty_ts):
+    g = ts2vg.NaturalVG().build(empty_ts, out_dir=tmp_path)
+
+    assert g.n_edges == 0
+    assert g.edges == []
+
+
+def test_out_dir_non_monotonic_xs(tmp_path, sample_ts):
+    with pytest.raises(ValueError):
+        ts2vg.NaturalVG().build(sample_ts, xs=[0.0, 1.0, 3.0, 2.0], out_dir=tmp_path, chunk_size=2)
@@ -0,0 +1,59 @@
+import pickle
+
+import numpy as np
+import pytest
+
+import ts2vg
+
+
+@pytest.mark.parametrize("graph", [
+    ts2vg.NaturalVG(),
+    ts2vg.NaturalVG(directed="left_to_right", weighted="distance"),
+    ts2vg.HorizontalVG(weighted="slope", penetrable_limit=1),
+])
+@pytest.mark.parametrize("protocol", [2, 4, 5])
+def test_pickle(graph, protocol):
+    ts = np.random.default_rng(0).random(300)
+    graph.build(ts)
+
+    g = pickle.loads(pickle.dumps(graph, protocol=protocol))
+
+    assert type(g) is type(graph)
+    assert (g.directed, g.weighted, g.penetrable_limit) == (graph.directed, graph.weighted, graph.penetrable_limit)
+    assert g.edges == graph.edges
+    np.testing.assert_array_equal(g.ts, graph.ts)
+    np.testing.assert_array_equal(g.degrees, graph.degrees)
+    np.testing.assert_array_equal(g.weights, graph.weights)
+
+
+def test_pickle_out_of_band():
+    ts = np.random.default_rng(1).random(1000)
+    graph = ts2vg.NaturalVG(weighted="distance").build(ts)
+
+    buffers = []
+    data = pickle.dumps(graph, protocol=5, buffer_callback=buffers.append)
+
+    assert len(data) < 2000  # all the arrays are out-of-band
+    assert sum(b.raw().nbytes for b in buffers) >= graph.n_edges * (4 + 4 + 8)
+
+    g = pickle.loads(data, buffers=buffers)
+
+    assert g.edges == graph.edges
+
+
+def test_pickle_not_built():
+    g = pickle.loads(pickle.dumps(ts2vg.HorizontalVG(directed="top_to_bottom")))
+
+    assert g.directed == "top_to_bottom"
+    assert g.build([1, 3, 2]).edges == ts2vg.HorizontalVG(directed="top_to_bottom").build([1, 3, 2]).edges
+
+
+def test_pickle_memmap(tmp_path):
+    ts = np.random.default_rng(2).random(100)
+    ts2vg.NaturalVG().build(ts).save(tmp_path)
+
+    graph = ts2vg.NaturalVG.load(tmp_path)
+    g = pickle.loads(pickle.dumps(graph, protocol=5))
+
+    assert not isinstance(g.ts, np.memmap)
+    assert sorted(g.edges) == sorted(graph.edges)
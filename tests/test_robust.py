@@ -0,0 +1,80 @@
+import pickle
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+import ts2vg
+from ts2vg.chunked import build_chunked
+from naive_implementations import natural_visibility_graph
+
+
+def random_ts(seed, n=150):
+    rng = np.random.default_rng(seed)
+    # values not exactly representable in binary, many of them nearly collinear
+    ts = np.round(rng.standard_normal(n), 1) * 0.1
+    xs = np.cumsum(rng.integers(1, 4, n)) * 0.1
+
+    return ts, xs
+
+
+def exact_edges(ts, xs, penetrable_limit=0):
+    return natural_visibility_graph([Fraction(y) for y in ts], [Fraction(x) for x in xs], penetrable_limit)
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("penetrable_limit", [0, 1, 3])
+def test_same_as_exact(seed, penetrable_limit):
+    ts, xs = random_ts(seed)
+
+    g = ts2vg.NaturalVG(robust=True, penetrable_limit=penetrable_limit).build(ts, xs)
+
+    assert sorted(g.edges) == sorted(exact_edges(ts, xs, penetrable_limit))
+
+
+@pytest.mark.parametrize("directed", [None, "left_to_right", "top_to_bottom"])
+def test_directed(directed):
+    ts, xs = random_ts(0)
+    expected = set(exact_edges(ts, xs))
+
+    g = ts2vg.NaturalVG(robust=True, directed=directed).build(ts, xs)
+
+    assert {(min(e), max(e)) for e in g.edges} == expected
+
+
+@pytest.mark.parametrize("scale", [2.0**-990, 2.0**-30, 1.0, 2.0**30, 2.0**500])  # exactly collinear values
+def test_collinear(scale):
+    ts = np.arange(50) * -scale
+
+    g = ts2vg.NaturalVG(robust=True).build(ts)
+
+    assert sorted(g.edges) == [(i, i + 1) for i in range(49)]
+
+
+def test_large_values():
+    ts = np.array([-1e18, -1e18 + 128, -1e18 + 512])
+
+    g = ts2vg.NaturalVG(robust=True).build(ts)
+
+    # the middle point is below the line joining its neighbours
+    assert sorted(g.edges) == [(0, 1), (0, 2), (1, 2)]
+
+
+def test_chunked():
+    ts, xs = random_ts(1, 500)
+
+    g = build_chunked(ts2vg.NaturalVG(robust=True), ts, xs, n_chunks=4)
+
+    assert sorted(g.edges) == sorted(ts2vg.NaturalVG(robust=True).build(ts, xs).edges)
+
+
+def test_parameter_kept(tmp_path):
+    g = ts2vg.NaturalVG(robust=True, weighted="slope").build([1.0, 3.0, 2.0, 4.0])
+
+    assert g._empty_copy().robust
+    assert pickle.loads(pickle.dumps(g)).robust
+
+    g.save(tmp_path / "g")
+    assert ts2vg.NaturalVG.load(tmp_path / "g").robust
+
+    assert not ts2vg.NaturalVG().robust
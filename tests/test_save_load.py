@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+import ts2vg
+from ts2vg.graph.base import VG
+
+
+def _sorted_edges(g):
+    e = np.asarray(g.edges, dtype=float).reshape(-1, 3 if g.is_weighted else 2)
+    return e[np.lexsort(e.T[::-1])]
+
+
+@pytest.mark.parametrize("graph", [
+    ts2vg.NaturalVG(),
+    ts2vg.NaturalVG(directed="top_to_bottom", weighted="distance", min_weight=1.5),
+    ts2vg.HorizontalVG(directed="left_to_right", weighted="slope"),
+    ts2vg.HorizontalVG(penetrable_limit=2),
+])
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_load(tmp_path, graph, mmap):
+    rng = np.random.default_rng(0)
+    ts = rng.random(300)
+    xs = np.cumsum(rng.random(300) + 0.1)
+    graph.build(ts, xs)
+
+    graph.save(tmp_path / "g")
+    g = VG.load(tmp_path / "g", mmap=mmap)
+
+    assert type(g) is type(graph)
+    assert (g.directed, g.weighted, g.min_weight, g.max_weight, g.penetrable_limit) == (
+        graph.directed, graph.weighted, graph.min_weight, graph.max_weight, graph.penetrable_limit
+    )
+    assert g.n_edges == graph.n_edges
+    np.testing.assert_array_equal(_sorted_edges(g), _sorted_edges(graph))
+    np.testing.assert_array_equal(g.ts, graph.ts)
+    np.testing.assert_array_equal(g.xs, graph.xs)
+    np.testing.assert_array_equal(g.degrees, graph.degrees)
+    np.testing.assert_array_equal(g.degrees_in, graph.degrees_in)
+    np.testing.assert_array_equal(g.degrees_out, graph.degrees_out)
+    assert isinstance(g.ts, np.memmap) == mmap
+    assert isinstance(g._sources, np.memmap) == mmap
+
+
+def test_load_without_sources(tmp_path):
+    graph = ts2vg.NaturalVG(weighted="distance").build(np.random.default_rng(3).random(100))
+    graph.save(tmp_path)
+    (tmp_path / "sources.npy").unlink()
+
+    g = ts2vg.NaturalVG.load(tmp_path)
+
+    np.testing.assert_array_equal(_sorted_edges(g), _sorted_edges(graph))
+
+
+def test_save_load_only_degrees(tmp_path):
+    ts = np.random.default_rng(1).random(100)
+    graph = ts2vg.NaturalVG().build(ts, only_degrees=True)
+
+    graph.save(tmp_path)
+    g = ts2vg.NaturalVG.load(tmp_path)
+
+    assert g.n_edges == graph.n_edges
+    np.testing.assert_array_equal(g.degrees, graph.degrees)
+
+    with pytest.raises(ts2vg.graph.base.NotBuiltError):
+        g.edges
+
+
+def test_save_overwrite_mmapped(tmp_path):
+    ts = np.random.default_rng(2).random(100)
+    ts2vg.NaturalVG().build(ts).save(tmp_path)
+
+    g = ts2vg.NaturalVG.load(tmp_path)
+    g.save(tmp_path)
+
+    np.testing.assert_array_equal(ts2vg.NaturalVG.load(tmp_path).ts, ts)
+
+
+def test_load_wrong_type(tmp_path):
+    ts2vg.NaturalVG().build([1, 2, 3]).save(tmp_path)
+
+    with pytest.raises(ValueError):
+        ts2vg.HorizontalVG.load(tmp_path)
+
+
+def test_save_not_built(tmp_path):
+    with pytest.raises(ts2vg.graph.base.NotBuiltError):
+        ts2vg.NaturalVG().save(tmp_path)
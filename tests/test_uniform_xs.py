@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+import ts2vg
+
+
+@pytest.mark.parametrize("graph", [
+    ts2vg.NaturalVG(weighted="distance"),
+    ts2vg.NaturalVG(directed="top_to_bottom", weighted="slope", penetrable_limit=2),
+    ts2vg.HorizontalVG(weighted="h_distance"),
+    ts2vg.HorizontalVG(directed="left_to_right", weighted="angle", penetrable_limit=1),
+])
+def test_default_xs_same_as_explicit(graph):
+    ts = np.random.default_rng(0).integers(0, 10, 500)  # ties and collinear points
+
+    g_default = graph._empty_copy().build(ts)
+    g_explicit = graph._empty_copy().build(ts, np.arange(len(ts)))
+
+    assert g_default.edges == g_explicit.edges
+
+
+def test_default_xs_not_allocated():
+    g = ts2vg.NaturalVG().build([1.0, 3.0, 2.0, 4.0])
+
+    assert g._xs is None
+    np.testing.assert_array_equal(g.xs, [0, 1, 2, 3])
+    assert g.xs.dtype == np.float64
+    assert g.node_positions() == {0: (0, 1.0), 1: (1, 3.0), 2: (2, 2.0), 3: (3, 4.0)}
+
+
+def test_xs_not_built():
+    assert ts2vg.NaturalVG().xs is None
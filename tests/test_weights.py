@@ -0,0 +1,65 @@
+import math
+
+import numpy as np
+import pytest
+
+import ts2vg
+
+WEIGHTS = {
+    "distance": lambda x_a, x_b, y_a, y_b: math.sqrt((x_b - x_a) ** 2 + (y_b - y_a) ** 2),
+    "sq_distance": lambda x_a, x_b, y_a, y_b: (x_b - x_a) ** 2 + (y_b - y_a) ** 2,
+    "v_distance": lambda x_a, x_b, y_a, y_b: y_b - y_a,
+    "abs_v_distance": lambda x_a, x_b, y_a, y_b: abs(y_b - y_a),
+    "h_distance": lambda x_a, x_b, y_a, y_b: x_b - x_a,
+    "abs_h_distance": lambda x_a, x_b, y_a, y_b: abs(x_b - x_a),
+    "slope": lambda x_a, x_b, y_a, y_b: (y_b - y_a) / (x_b - x_a),
+    "abs_slope": lambda x_a, x_b, y_a, y_b: abs((y_b - y_a) / (x_b - x_a)),
+    "angle": lambda x_a, x_b, y_a, y_b: math.atan((y_b - y_a) / (x_b - x_a)),
+    "abs_angle": lambda x_a, x_b, y_a, y_b: math.atan(abs((y_b - y_a) / (x_b - x_a))),
+}
+
+
+@pytest.fixture
+def long_ts():
+    rng = np.random.default_rng(0)
+    # enough edges to fill several blocks of weights
+    ts = np.cumsum(rng.standard_normal(5000))
+    xs = np.cumsum(rng.uniform(0.5, 1.5, 5000))
+
+    return ts, xs
+
+
+@pytest.mark.parametrize("graph_type", [ts2vg.NaturalVG, ts2vg.HorizontalVG])
+@pytest.mark.parametrize("directed", ["left_to_right", "top_to_bottom"])
+@pytest.mark.parametrize("weighted", list(WEIGHTS))
+@pytest.mark.parametrize("default_xs", [False, True])
+def test_weights(long_ts, graph_type, directed, weighted, default_xs):
+    ts, xs = long_ts
+    xs = np.arange(len(ts), dtype=np.float64) if default_xs else xs
+
+    g = graph_type(directed=directed, weighted=weighted).build(ts, None if default_xs else xs)
+    assert g.n_edges > 2 * 4096
+
+    expected = [WEIGHTS[weighted](xs[a], xs[b], ts[a], ts[b]) for a, b, _ in g.edges]
+
+    np.testing.assert_allclose([w for _, _, w in g.edges], expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("graph_type", [ts2vg.NaturalVG, ts2vg.HorizontalVG])
+def test_weight_limits(long_ts, graph_type):
+    ts, xs = long_ts
+
+    g_all = graph_type(weighted="v_distance").build(ts, xs)
+    g = graph_type(weighted="v_distance", min_weight=-1.0, max_weight=2.0).build(ts, xs)
+
+    assert g.edges == [e for e in g_all.edges if -1.0 < e[2] < 2.0]
+    np.testing.assert_array_equal(g.degrees, np.bincount(np.array(g.edges)[:, :2].astype(int).ravel(), minlength=len(ts)))
+
+
+def test_num_penetrations(long_ts):
+    ts, _ = long_ts
+
+    g = ts2vg.NaturalVG(weighted="num_penetrations", penetrable_limit=2).build(ts)
+
+    assert {w for _, _, w in g.edges} == {0.0, 1.0, 2.0}
+    assert {w for _, _, w in ts2vg.NaturalVG(weighted="num_penetrations").build(ts).edges} == {0.0}
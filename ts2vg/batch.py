@@ -0,0 +1,286 @@
+"""
+Building the visibility graphs of many time series in parallel.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional
+
+import numpy as np
+
+from ts2vg.graph.storage import EdgeArraysWriter
+
+
+def _output_layout(n: int, m: int, weighted: bool):
+    """Dtypes, lengths and byte offsets of the arrays stored in the shared memory block of a built graph."""
+    layout = []
+    offset = 0
+
+    fields = [
+        ("sources", np.uint32, m),
+        ("targets", np.uint32, m),
+        ("weights", np.float64, m if weighted else 0),
+        ("degrees_in", np.uint32, n),
+        ("degrees_out", np.uint32, n),
+    ]
+
+    for name, dtype, length in fields:
+        # keep every array aligned to 8 bytes
+        offset = (offset + 7) // 8 * 8
+        layout.append((name, dtype, length, offset))
+        offset += length * np.dtype(dtype).itemsize
+
+    return layout, max(offset, 1)
+
+
+def _input_layout(series):
+    """Byte offsets of the time series stored (in their kernel dtypes) in the input shared memory block, and its size."""
+    offsets = []
+    offset = 0
+
+    for ts in series:
+        # keep every array aligned to 8 bytes
+        offset = (offset + 7) // 8 * 8
+        offsets.append(offset)
+        offset += ts.nbytes
+
+    return offsets, max(offset, 1)
+
+
+def _build_shared(graph, input_name: str, offset: int, length: int, dtype):
+    """
+    Build the graph of the time series of ``length`` values of ``dtype`` stored at byte ``offset``
+    in the ``input_name`` shared memory block and write the result to a new shared memory block.
+    Return its name and the number of edges.
+    """
+    shm_in = SharedMemory(name=input_name)
+
+    try:
+        ts = np.ndarray(length, dtype=dtype, buffer=shm_in.buf, offset=offset)
+        ts, xs = graph._prepare_input(ts, None)
+
+        edges = EdgeArraysWriter(graph.is_weighted)
+        collector = graph._make_collector(ts, xs, store_edges=False, sink=edges)
+
+        if len(ts) > 0:
+            graph._compute_graph(ts, xs, collector)
+
+        collector.finish()
+
+        del ts, xs
+    finally:
+        shm_in.close()
+
+    sources, targets, weights = edges.arrays()
+    arrays = {
+        "sources": sources,
+        "targets": targets,
+        "weights": weights,
+        "degrees_in": collector.degrees_in,
+        "degrees_out": collector.degrees_out,
+    }
+
+    layout, size = _output_layout(length, len(sources), graph.is_weighted)
+    shm_out = SharedMemory(create=True, size=size)
+
+    try:
+        for name, dtype, length, offset in layout:
+            if length > 0:
+                np.ndarray(length, dtype=dtype, buffer=shm_out.buf, offset=offset)[:] = arrays[name]
+    except BaseException:
+        shm_out.close()
+        shm_out.unlink()
+        raise
+
+    shm_out.close()
+
+    return shm_out.name, len(sources)
+
+
+def _collect_shared(graph, ts, output_name: str, m: int):
+    """Set ``graph`` as built from the arrays in the ``output_name`` shared memory block, and release the block."""
+    shm = SharedMemory(name=output_name)
+
+    try:
+        layout, _ = _output_layout(len(ts), m, graph.is_weighted)
+        arrays = {
+            name: np.ndarray(length, dtype=dtype, buffer=shm.buf, offset=offset).copy()
+            for name, dtype, length, offset in layout
+        }
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return graph._set_columnar(
+        ts,
+        None,
+        arrays["sources"],
+        arrays["targets"],
+        arrays["weights"],
+        arrays["degrees_in"],
+        arrays["degrees_out"],
+    )
+
+
+def build_parallel(series_iterable, graph, processes: Optional[int] = None, mp_context=None) -> list:
+    """
+    Build the visibility graphs of many time series using a pool of processes.
+
+    The input time series and the resulting arrays are exchanged with the worker processes through shared memory
+    (:mod:`multiprocessing.shared_memory`), so neither of them is pickled.
+    Time series are stored in the dtype processed by the kernels (see :meth:`ts2vg.NaturalVG.build`),
+    so ``float32``, ``int32`` and ``int64`` series are not upcast.
+
+    Parameters
+    ----------
+    series_iterable : iterable of 1D array like
+        Input time series.
+
+    graph : VG
+        Graph instance defining the type of visibility graph and its parameters, e.g. ``NaturalVG(directed="left_to_right")``.
+        It is not modified, a new instance with the same parameters is built for each time series.
+
+    processes : int, optional
+        Number of worker processes.
+        If ``None``, the number of processors of the machine is used.
+
+    mp_context : multiprocessing context, optional
+        Context used to start the worker processes, see :class:`concurrent.futures.ProcessPoolExecutor`.
+
+    Returns
+    -------
+    list of VG
+        Built graphs, in the same order as the input time series.
+    """
+    series = []
+
+    for ts in series_iterable:
+        ts = np.asarray(ts)
+
+        if ts.ndim != 1:
+            raise ValueError("Input time series must be one-dimensional.")
+
+        series.append(ts.astype(graph._ts_dtype(ts.dtype), copy=False))
+
+    if not series:
+        return []
+
+    offsets, size = _input_layout(series)
+    shm_in = SharedMemory(create=True, size=size)
+
+    try:
+        for ts, offset in zip(series, offsets):
+            np.ndarray(len(ts), dtype=ts.dtype, buffer=shm_in.buf, offset=offset)[:] = ts
+
+        config = graph._empty_copy()
+
+        with ProcessPoolExecutor(max_workers=processes, mp_context=mp_context) as executor:
+            futures = [
+                executor.submit(_build_shared, config, shm_in.name, offset, len(ts), ts.dtype)
+                for ts, offset in zip(series, offsets)
+            ]
+
+            results = []
+            error = None
+
+            for ts, future in zip(series, futures):
+                try:
+                    output_name, m = future.result()
+                except BaseException as e:
+                    error = error or e
+                    continue
+
+                results.append(_collect_shared(graph._empty_copy(), ts, output_name, m))
+
+            if error is not None:
+                raise error
+    finally:
+        shm_in.close()
+        shm_in.unlink()
+
+    return results
+
+
+async def _aiter(iterable):
+    if hasattr(iterable, "__aiter__"):
+        async for item in iterable:
+            yield item
+    else:
+        for item in iterable:
+            yield item
+
+
+async def build_async_iter(series_iterable, graph, executor=None, max_concurrency: Optional[int] = None, **kwargs):
+    """
+    Build the visibility graphs of many time series from asyncio code, yielding them as soon as they are built.
+
+    At most ``max_concurrency`` builds are in flight at any time,
+    and the input series are only consumed as builds finish.
+
+    Parameters
+    ----------
+    series_iterable : iterable or async iterable of 1D array like
+        Input time series.
+
+    graph : VG
+        Graph instance defining the type of visibility graph and its parameters.
+        It is not modified, a new instance with the same parameters is built for each time series.
+
+    executor : concurrent.futures.Executor, optional
+        Executor used to run the builds, see :meth:`ts2vg.NaturalVG.build_async`.
+
+    max_concurrency : int, optional
+        Maximum number of concurrent builds.
+        If ``None``, the number of workers of ``executor`` (if available) or the number of processors of the machine is used.
+
+    **kwargs
+        Other parameters of :meth:`ts2vg.NaturalVG.build`.
+
+    Yields
+    ------
+    tuple of (int, VG)
+        Position of the time series in ``series_iterable`` and its built graph, in order of completion.
+
+    Examples
+    --------
+    .. code:: python
+
+        async for i, g in build_async_iter(series, NaturalVG(), max_concurrency=4):
+            ...
+    """
+    if max_concurrency is None:
+        max_concurrency = getattr(executor, "_max_workers", None) or os.cpu_count() or 1
+
+    if max_concurrency < 1:
+        raise ValueError(f"'max_concurrency' must be positive (got {max_concurrency}).")
+
+    pending = {}
+
+    async def wait_first():
+        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+        return sorted((pending.pop(task), task) for task in done)
+
+    try:
+        i = 0
+
+        async for ts in _aiter(series_iterable):
+            task = asyncio.ensure_future(graph._empty_copy().build_async(ts, executor=executor, **kwargs))
+            pending[task] = i
+            i += 1
+
+            if len(pending) >= max_concurrency:
+                for index, task in await wait_first():
+                    yield index, task.result()
+
+        while pending:
+            for index, task in await wait_first():
+                yield index, task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+        # wait for the cancellations, so that no task is left pending (and no exception is left unretrieved)
+        await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,323 @@
+"""
+Chunk-and-stitch builds of visibility graphs.
+
+The edges of a visibility graph between nodes of a contiguous segment of a time series depend only on the points of that segment.
+A long time series can therefore be split into chunks whose graphs are built independently (e.g. on separate processes or machines),
+and neighbouring chunks can then be merged by computing only the edges crossing the boundary between them.
+The result is identical to building the graph of the whole time series at once
+(except for the order of the edges).
+
+Only regular (non penetrable) natural and horizontal visibility graphs are supported.
+
+Examples
+--------
+.. code:: python
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    from ts2vg import NaturalVG
+    from ts2vg.chunked import build_chunked
+
+    with ProcessPoolExecutor() as executor:
+        g = build_chunked(NaturalVG(), ts, n_chunks=8, executor=executor)
+
+Or, distributing the chunks manually:
+
+.. code:: python
+
+    from ts2vg.chunked import build_chunk, merge_chunks
+
+    left = build_chunk(NaturalVG(), ts[:1000], start=0)  # e.g. on machine A
+    right = build_chunk(NaturalVG(), ts[1000:], start=1000)  # e.g. on machine B
+
+    g = merge_chunks(NaturalVG(), left, right).to_graph(NaturalVG())
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from ts2vg.graph.storage import EdgeArraysWriter
+
+
+class VGChunk:
+    """
+    Visibility graph of a contiguous segment of a time series, as built by :func:`build_chunk` or :func:`merge_chunks`.
+
+    Chunks only contain NumPy arrays and can be pickled and sent between processes.
+
+    Attributes
+    ----------
+    start : int
+        Index of the first node of the chunk in the whole time series.
+
+    ts : numpy.ndarray
+        Values of the time series in the chunk.
+
+    xs : numpy.ndarray, None
+        X coordinates of the time series in the chunk.
+        ``None`` if not provided, the X coordinates are then the indices of the nodes in the whole time series.
+
+    sources, targets : numpy.ndarray
+        Edges of the chunk, as indices of nodes in the whole time series.
+
+    weights : numpy.ndarray, None
+        Weights of the edges, ``None`` if the graph is unweighted.
+    """
+
+    def __init__(self, start: int, ts, xs, sources, targets, weights=None):
+        self.start = start
+        self.ts = ts
+        self.xs = xs
+        self.sources = sources
+        self.targets = targets
+        self.weights = weights
+
+    def __len__(self):
+        return len(self.ts)
+
+    @property
+    def stop(self) -> int:
+        """Index (in the whole time series) of the node following the last node of the chunk."""
+        return self.start + len(self.ts)
+
+    def to_graph(self, graph):
+        """
+        Set ``graph`` as built with the edges of this chunk.
+
+        The chunk must cover the whole time series (i.e. start at index ``0``).
+
+        Parameters
+        ----------
+        graph : VG
+            Not built graph with the same parameters used to build the chunk.
+
+        Returns
+        -------
+            ``graph``
+        """
+        if self.start != 0:
+            raise ValueError(f"Chunk must start at index 0 to be converted to a graph (starts at {self.start}).")
+
+        return graph._set_columnar(self.ts, self.xs, self.sources, self.targets, self.weights)
+
+
+def _prepare_chunk_input(graph, ts, xs, start: int):
+    if graph.penetrable_limit != 0:
+        raise ValueError("Chunked builds are not supported for penetrable visibility graphs.")
+
+    if start < 0:
+        raise ValueError(f"'start' cannot be negative (got {start}).")
+
+    ts, xs = graph._prepare_input(ts, xs)
+
+    if start + len(ts) >= 2**32:
+        raise ValueError("Time series is too long, maximum supported length is 2**32 - 1.")
+
+    return ts, xs
+
+
+def _compute_edges(graph, ts, xs, start: int, boundary: Optional[int] = None, **kwargs):
+    edges = EdgeArraysWriter(graph.is_weighted, offset=start)
+    # without xs, the x coordinates are the global indices of the nodes (the tolerance used to compare slopes depends
+    # on their magnitude), given as an integer origin so that integer time series keep the exact comparisons
+    collector = graph._make_collector(
+        ts, xs, store_edges=False, store_degrees=False, sink=edges, x_origin=start, **kwargs
+    )
+
+    if len(ts) > 0:
+        if boundary is None:
+            graph._compute_graph(ts, xs, collector)
+        else:
+            graph._compute_cross_edges(ts, xs, boundary, collector)
+
+    collector.finish()
+
+    return edges.arrays()
+
+
+def build_chunk(graph, ts, xs=None, start: int = 0, **kwargs) -> VGChunk:
+    """
+    Build the visibility graph of a chunk of a time series.
+
+    Parameters
+    ----------
+    graph : VG
+        Graph instance defining the type of visibility graph and its parameters.
+        It is not modified.
+
+    ts : 1D array like
+        Values of the time series in the chunk.
+
+    xs : 1D array like, optional
+        X coordinates for the time series in the chunk.
+        If not provided, ``[start, start + 1, start + 2...]`` will be used.
+
+    start : int
+        Index of the first node of the chunk in the whole time series.
+        Default ``0``.
+
+    **kwargs
+        ``progress``, ``progress_every``, ``timeout`` and ``cancel``, see :meth:`ts2vg.NaturalVG.build`.
+
+    Returns
+    -------
+    VGChunk
+        Graph of the chunk.
+    """
+    ts, xs = _prepare_chunk_input(graph, ts, xs, start)
+    sources, targets, weights = _compute_edges(graph, ts, xs, start, **kwargs)
+
+    return VGChunk(start, ts, xs, sources, targets, weights)
+
+
+def _cross_edges(graph, ts, xs, start: int, boundary: int, **kwargs):
+    """Compute the edges crossing ``boundary`` (relative to ``start``) of the graph of a segment of a time series."""
+    return _compute_edges(graph, ts, xs, start, boundary, **kwargs)
+
+
+def merge_chunks(graph, left: VGChunk, right: VGChunk, **kwargs) -> VGChunk:
+    """
+    Merge the graphs of two neighbouring chunks of a time series.
+
+    Only the edges between nodes of ``left`` and nodes of ``right`` are computed.
+
+    Parameters
+    ----------
+    graph : VG
+        Graph instance with the same parameters used to build the chunks.
+        It is not modified.
+
+    left, right : VGChunk
+        Neighbouring chunks, ``right`` must start right after the end of ``left``.
+
+    **kwargs
+        ``progress``, ``progress_every``, ``timeout`` and ``cancel``, see :meth:`ts2vg.NaturalVG.build`.
+
+    Returns
+    -------
+    VGChunk
+        Graph of the concatenation of both chunks.
+    """
+    if graph.penetrable_limit != 0:
+        raise ValueError("Chunked builds are not supported for penetrable visibility graphs.")
+
+    if left.stop != right.start:
+        raise ValueError(f"Chunks are not contiguous (left chunk ends at {left.stop}, right chunk starts at {right.start}).")
+
+    ts = np.concatenate([left.ts, right.ts])
+
+    if left.xs is None and right.xs is None:
+        xs = None
+    else:
+        left_xs = np.arange(left.start, left.stop, dtype=np.float64) if left.xs is None else left.xs
+        right_xs = np.arange(right.start, right.stop, dtype=np.float64) if right.xs is None else right.xs
+
+        if len(left) > 0 and len(right) > 0 and left_xs[-1] >= right_xs[0]:
+            raise ValueError("Input 'xs' series must be monotonically increasing.")
+
+        xs = np.concatenate([left_xs, right_xs])
+
+    sources, targets, weights = _cross_edges(graph, ts, xs, left.start, len(left), **kwargs)
+
+    sources = np.concatenate([left.sources, right.sources, sources])
+    targets = np.concatenate([left.targets, right.targets, targets])
+
+    if graph.is_weighted:
+        weights = np.concatenate([left.weights, right.weights, weights])
+
+    return VGChunk(left.start, ts, xs, sources, targets, weights)
+
+
+def _merge_jobs(bounds):
+    """Yield the ``(start, boundary, stop)`` triplets of all the merges needed to stitch the chunks defined by ``bounds``."""
+    if len(bounds) <= 2:
+        return
+
+    mid = len(bounds) // 2
+
+    yield bounds[0], bounds[mid], bounds[-1]
+    yield from _merge_jobs(bounds[: mid + 1])
+    yield from _merge_jobs(bounds[mid:])
+
+
+def build_chunked(graph, ts, xs=None, n_chunks: Optional[int] = None, chunk_size: Optional[int] = None, executor=None):
+    """
+    Build the visibility graph of a time series by splitting it into chunks.
+
+    The graphs of the chunks, and the edges crossing the boundaries between them, are computed independently.
+    If an ``executor`` is given, these computations are submitted to it and run in parallel.
+
+    The edges are the same as (but in a different order than) those obtained with ``graph.build(ts, xs)``.
+
+    Parameters
+    ----------
+    graph : VG
+        Graph instance to build.
+
+    ts : 1D array like
+        Input time series.
+
+    xs : 1D array like, optional
+        X coordinates for the time series.
+        Length of ``xs`` must match length of ``ts``.
+
+        If not provided, ``[0, 1, 2...]`` will be used.
+
+    n_chunks : int, optional
+        Number of chunks.
+        Only one of ``n_chunks`` and ``chunk_size`` can be provided.
+        If none is provided, ``executor._max_workers`` (if available) or ``1`` is used.
+
+    chunk_size : int, optional
+        Number of nodes per chunk.
+
+    executor : concurrent.futures.Executor, optional
+        Executor used to run the computations, e.g. a :class:`concurrent.futures.ProcessPoolExecutor`.
+        If ``None``, everything is computed sequentially in the current process.
+
+    Returns
+    -------
+        ``graph``
+    """
+    if graph.penetrable_limit != 0:
+        raise ValueError("Chunked builds are not supported for penetrable visibility graphs.")
+
+    if n_chunks is not None and chunk_size is not None:
+        raise ValueError("Only one of 'n_chunks' and 'chunk_size' can be provided.")
+
+    ts, xs = graph._prepare_input(ts, xs)
+    n = len(ts)
+
+    if chunk_size is not None:
+        if chunk_size < 1:
+            raise ValueError(f"'chunk_size' must be positive (got {chunk_size}).")
+
+        bounds = list(range(0, n, chunk_size)) + [n]
+    else:
+        if n_chunks is None:
+            n_chunks = getattr(executor, "_max_workers", 1)
+
+        if n_chunks < 1:
+            raise ValueError(f"'n_chunks' must be positive (got {n_chunks}).")
+
+        bounds = np.linspace(0, n, min(n_chunks, max(n, 1)) + 1).astype(int).tolist()
+
+    config = graph._empty_copy()
+
+    def segment(a, b):
+        return ts[a:b], None if xs is None else xs[a:b]
+
+    jobs = [(_compute_edges, config, *segment(a, b), a) for a, b in zip(bounds[:-1], bounds[1:])]
+    jobs += [(_cross_edges, config, *segment(a, c), a, b - a) for a, b, c in _merge_jobs(bounds)]
+
+    if executor is None:
+        results = [job[0](*job[1:]) for job in jobs]
+    else:
+        results = [f.result() for f in [executor.submit(*job) for job in jobs]]
+
+    sources = np.concatenate([r[0] for r in results])
+    targets = np.concatenate([r[1] for r in results])
+    weights = np.concatenate([r[2] for r in results]) if graph.is_weighted else None
+
+    return graph._set_columnar(ts, xs, sources, targets, weights)
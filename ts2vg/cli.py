@@ -5,6 +5,7 @@ import numpy as np
 
 from ts2vg import NaturalVG, HorizontalVG
 from ts2vg.graph.base import _DIRECTED_OPTIONS, _WEIGHTED_OPTIONS
+from ts2vg.graph.cache import GraphCache
 
 _OUTPUT_MODES = {
     "el": "edge list",
@@ -114,7 +115,25 @@ def main():
         "\n dc :           Degree counts. 1st column is a degree value (k) and 2nd column is the number of nodes with that degree k.",
     )
 
+    parser.add_argument(
+        "-c",
+        "--cache",
+        default=None,
+        help="Path to a directory used to cache built graphs. If the same graph was already built with this cache, it is loaded instead of built again.",
+    )
+
+    parser.add_argument(
+        "--cache_max_size",
+        type=int,
+        default=None,
+        help="Maximum size of the cache directory in bytes. When exceeded, the least recently used graphs are removed. Requires --cache.",
+    )
+
     args = parser.parse_args()
+
+    if args.cache_max_size is not None and args.cache is None:
+        parser.error("--cache_max_size requires --cache.")
+
     input_path = args.input
     output_path = args.output
     gtype = args.type
@@ -122,6 +141,8 @@ def main():
     weighted = args.weighted
     penetrable_limit = args.penetrable_limit
     output_mode = args.outputmode
+    cache_path = args.cache
+    cache_max_size = args.cache_max_size
 
     output_f = None
     if output_path is not None:
@@ -142,7 +163,9 @@ def main():
     ts = np.loadtxt(input_path_, dtype="float64")
 
     g = _GRAPH_TYPES[gtype](directed=directed, weighted=weighted, penetrable_limit=penetrable_limit)
-    g.build(ts, only_degrees=build_only_degrees)
+    cache = GraphCache(cache_path, max_size=cache_max_size) if cache_path is not None else None
+
+    g.build(ts, only_degrees=build_only_degrees, cache=cache)
 
     if output_mode == "el":
         es = g.edges
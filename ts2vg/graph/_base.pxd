@@ -1,14 +1,192 @@
 #cython: language_level=3
 
+cimport cython
 cimport numpy as np
 
 ctypedef unsigned int uint
-ctypedef double (*weight_func_type)(double x_a, double x_b, double y_a, double y_b, double slope)
+ctypedef double (*weight_func_type)(double x_a, double x_b, double y_a, double y_b, double slope) noexcept nogil
+
+# input time series types supported by the kernels (without conversion)
+ctypedef fused ts_t:
+    np.float32_t
+    np.float64_t
+    np.int32_t
+    np.int64_t
+
+# integer type wide enough for exact cross products of differences of 'int64' values and indices
+cdef extern from *:
+    """
+    #if defined(__SIZEOF_INT128__)
+    typedef __int128 ts2vg_wide_int;
+    #else
+    typedef long double ts2vg_wide_int;  /* not exact, for compilers without 128-bit integers */
+    #endif
+    """
+    ctypedef long long wide_int "ts2vg_wide_int"
+
+# robust orientation predicate (after J. R. Shewchuk, "Adaptive Precision Floating-Point Arithmetic
+# and Fast Robust Geometric Predicates", 1997): a floating-point filter with an exact fallback
+cdef extern from *:
+    """
+    #include <math.h>
+
+    /* x + y == a + b exactly */
+    static inline void ts2vg_two_sum(double a, double b, double *x, double *y) {
+        double bv, av;
+        *x = a + b;
+        bv = *x - a;
+        av = *x - bv;
+        *y = (a - av) + (b - bv);
+    }
+
+    /* adds 'b' to the expansion 'e' of length 'elen' (in place, components in increasing magnitude, zeros eliminated) */
+    static inline int ts2vg_grow_expansion(int elen, double *e, double b) {
+        double q = b, hh;
+        int i, hlen = 0;
+
+        for (i = 0; i < elen; i++) {
+            ts2vg_two_sum(q, e[i], &q, &hh);
+            if (hh != 0.0) e[hlen++] = hh;
+        }
+        if (q != 0.0 || hlen == 0) e[hlen++] = q;
+
+        return hlen;
+    }
+
+    static inline double ts2vg_orient2d_exact(double ax, double ay, double bx, double by, double cx, double cy) {
+        double e[12], p;
+        double terms[6][2] = {{ax, by}, {-ax, cy}, {-cx, by}, {-ay, bx}, {ay, cx}, {cy, bx}};
+        int i, elen = 0;
+
+        for (i = 0; i < 6; i++) {
+            /* exact product as the sum of two doubles */
+            p = terms[i][0] * terms[i][1];
+            elen = ts2vg_grow_expansion(elen, e, fma(terms[i][0], terms[i][1], -p));
+            elen = ts2vg_grow_expansion(elen, e, p);
+        }
+
+        /* the largest component has the sign of the expansion */
+        return e[elen - 1];
+    }
+
+    /*
+     * Positive if 'a', 'b' and 'c' are in counterclockwise order, negative if clockwise, zero if collinear.
+     * The sign is always exact (unless intermediate values overflow or underflow).
+     */
+    static inline double ts2vg_orient2d(double ax, double ay, double bx, double by, double cx, double cy) {
+        const double eps = 1.1102230246251565e-16;  /* 2**-53 */
+        const double err_bound = (3.0 + 16.0 * eps) * eps;
+        double det_left = (ax - cx) * (by - cy);
+        double det_right = (ay - cy) * (bx - cx);
+        double det = det_left - det_right;
+        double det_sum;
+
+        if (det_left > 0.0) {
+            if (det_right <= 0.0) return det;
+            det_sum = det_left + det_right;
+        } else if (det_left < 0.0) {
+            if (det_right >= 0.0) return det;
+            det_sum = -det_left - det_right;
+        } else {
+            return det;
+        }
+
+        if (det >= err_bound * det_sum || -det >= err_bound * det_sum) return det;
+
+        return ts2vg_orient2d_exact(ax, ay, bx, by, cx, cy);
+    }
+    """
+    double _orient2d "ts2vg_orient2d"(double ax, double ay, double bx, double by, double cx, double cy) noexcept nogil
+
 
 cdef bint _greater(double a, double b, double tolerance)
 
-cdef uint _argmax(np.float64_t[:] a, uint left, uint right)
 
-cdef uint _argmin(np.float64_t[:] a, uint left, uint right)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline uint _argmax(const ts_t[:] a, uint left, uint right) noexcept:
+    """Get the argmax of 'a', between indexes 'left' and 'right'."""
+    cdef uint i
+    cdef uint idx = left
+    cdef ts_t val = a[left]
+
+    for i in range(left+1, right):
+        if a[i] > val:
+            val = a[i]
+            idx = i
+    return idx
+
+
+cdef class _EdgeCollector:
+    cdef object ts
+    cdef object xs
+    cdef readonly unsigned long long x_origin
+    cdef uint weighted
+    cdef object weight_func
+    cdef weight_func_type weight_func_ptr
+    cdef double min_weight
+    cdef double max_weight
+    cdef bint store_edges
+    cdef bint store_degrees
+    cdef bint node_stats
+
+    cdef readonly unsigned long long n_edges
+    cdef readonly unsigned long long max_edges
+    cdef readonly unsigned long long n_processed
+
+    cdef unsigned long long n_total
+    cdef bint monitored
+    cdef object progress
+    cdef unsigned long long progress_every
+    cdef unsigned long long next_progress
+    cdef unsigned long long n_reported
+    cdef object cancel
+    cdef double deadline
+    cdef unsigned long long work
+
+    cdef Py_ssize_t block_len
+    cdef object block_sources
+    cdef object block_targets
+    cdef object block_slopes
+    cdef object block_penetrations
+    cdef np.uint32_t[:] _block_sources
+    cdef np.uint32_t[:] _block_targets
+    cdef np.float64_t[:] _block_slopes
+    cdef np.float64_t[:] _block_penetrations
+
+    cdef object sink
+    cdef Py_ssize_t chunk_size
+    cdef Py_ssize_t buffer_len
+    cdef object buffer_sources
+    cdef object buffer_targets
+    cdef object buffer_weights
+    cdef np.uint32_t[:] _buffer_sources
+    cdef np.uint32_t[:] _buffer_targets
+    cdef np.float64_t[:] _buffer_weights
+
+    cdef readonly list edges
+    cdef readonly object degrees_in
+    cdef readonly object degrees_out
+    cdef readonly object strengths_in
+    cdef readonly object strengths_out
+    cdef readonly object weights_min
+    cdef readonly object weights_max
+
+    cdef np.uint32_t[:] _degrees_in
+    cdef np.uint32_t[:] _degrees_out
+    cdef np.float64_t[:] _strengths_in
+    cdef np.float64_t[:] _strengths_out
+    cdef np.float64_t[:] _weights_min
+    cdef np.float64_t[:] _weights_max
+
+    cdef int add_edge(self, uint i1, uint i2, double slope, double penetrations) except -1
+
+    cdef int flush_weights(self) except -1
+
+    cdef int _add_edge(self, uint i1, uint i2, double w) except -1
+
+    cdef int step(self, unsigned long long work) except -1
+
+    cdef int _flush(self) except -1
 
-cdef weight_func_type _get_weight_func(uint weighted)
+    cdef int _check_interrupted(self) except -1
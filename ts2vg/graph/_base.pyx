@@ -1,159 +1,381 @@
 #cython: language_level=3
 
 cimport cython
+import numpy as np
 cimport numpy as np
 
-from libc.math cimport fabs, atan, sqrt, isnan, NAN
-
-from ts2vg.graph.base import _WEIGHTED_OPTIONS
-
-cdef uint _UNWEIGHTED = _WEIGHTED_OPTIONS[None]
-cdef uint _WEIGHTED_DISTANCE = _WEIGHTED_OPTIONS['distance']
-cdef uint _WEIGHTED_SQ_DISTANCE = _WEIGHTED_OPTIONS['sq_distance']
-cdef uint _WEIGHTED_V_DISTANCE = _WEIGHTED_OPTIONS['v_distance']
-cdef uint _WEIGHTED_ABS_V_DISTANCE = _WEIGHTED_OPTIONS['abs_v_distance']
-cdef uint _WEIGHTED_H_DISTANCE = _WEIGHTED_OPTIONS['h_distance']
-cdef uint _WEIGHTED_ABS_H_DISTANCE = _WEIGHTED_OPTIONS['abs_h_distance']
-cdef uint _WEIGHTED_SLOPE = _WEIGHTED_OPTIONS['slope']
-cdef uint _WEIGHTED_ABS_SLOPE = _WEIGHTED_OPTIONS['abs_slope']
-cdef uint _WEIGHTED_ANGLE = _WEIGHTED_OPTIONS['angle']
-cdef uint _WEIGHTED_ABS_ANGLE = _WEIGHTED_OPTIONS['abs_angle']
-cdef uint _WEIGHTED_NUM_PENETRATIONS = _WEIGHTED_OPTIONS['num_penetrations']
-
-
-cdef inline bint _greater(double a, double b, double tolerance):
-    return (a - b) > tolerance
-
-
-@cython.boundscheck(False)
-@cython.wraparound(False)
-cdef inline uint _argmax(np.float64_t[:] a, uint left, uint right):
-    """Get the argmax of 'a', between indexes 'left' and 'right'."""
-    cdef uint i
-    cdef uint idx = left
-    cdef double val = a[left]
-
-    for i in range(left+1, right):
-        if a[i] > val:
-            val = a[i]
-            idx = i
-    return idx
-
-
-@cython.boundscheck(False)
-@cython.wraparound(False)
-cdef inline uint _argmin(np.float64_t[:] a, uint left, uint right):
-    """Get the argmin of 'a', between indexes 'left' and 'right'."""
-    cdef uint i
-    cdef uint idx = left
-    cdef double val = a[left]
-
-    for i in range(left+1, right):
-        if a[i] < val:
-            val = a[i]
-            idx = i
-    return idx
+from libc.math cimport INFINITY
+from libc.limits cimport ULLONG_MAX
 
+from time import monotonic
 
+from ts2vg.graph.base import _WEIGHTED_OPTIONS, BudgetExceededError, BuildCancelledError, BuildTimeoutError
 
-cdef inline double _weight_0(double x_a, double x_b, double y_a, double y_b, double slope):
-    return 0
+cdef uint _WEIGHTED_NUM_PENETRATIONS = _WEIGHTED_OPTIONS['num_penetrations']
 
+# number of edges of the blocks whose weights are computed together
+cdef Py_ssize_t _WEIGHTS_BLOCK_SIZE = 1 << 12
 
-cdef inline double _weight_nan(double x_a, double x_b, double y_a, double y_b, double slope):
-    return NAN
+# approximate number of elementary operations (points visited by the sweeps)
+# between two consecutive checks for cancellation and timeout
+cdef unsigned long long _CHECK_INTERRUPTED_WORK = 1 << 20
 
 
-cdef inline double _weight_distance(double x_a, double x_b, double y_a, double y_b, double slope):
-    return sqrt(((x_b - x_a) * (x_b - x_a)) + ((y_b - y_a) * (y_b - y_a)))
+cdef inline bint _greater(double a, double b, double tolerance):
+    return (a - b) > tolerance
 
 
-cdef inline double _weight_sq_distance(double x_a, double x_b, double y_a, double y_b, double slope):
-    return ((x_b - x_a) * (x_b - x_a)) + ((y_b - y_a) * (y_b - y_a))
+cdef class _EdgeCollector:
+    """
+    Receives the edges found by the graph algorithms and accumulates the requested outputs.
+
+    Shared by all the graph algorithm implementations so that weight computation, parametric filtering
+    and the different build modes (full edge list, only degrees, only node statistics, only edge count)
+    live in a single place.
+
+    The algorithms only report the nodes of each edge, together with the values that fall out of the sweeps
+    (the slope between the nodes and, in penetrable graphs, the number of penetrations).
+    In weighted graphs the edges are buffered in blocks of `_WEIGHTS_BLOCK_SIZE` edges, and the weights of each block
+    are computed at once by `weight_func(x_a, x_b, y_a, y_b, slope)` over arrays gathered from `ts` and `xs`,
+    or by calling the compiled function at `weight_func_address` (if not 0) for each edge of the block.
+
+    If `xs` is None, the x coordinate of node `i` is `x_origin + i`, with an integer `x_origin`
+    (the index of the first node in the whole time series when building a chunk of it),
+    so that the algorithms can still use the exact comparisons for uniformly spaced integer time series.
+
+    Edges can either be stored in a Python list (`store_edges`) or handed off in fixed-size blocks
+    of `chunk_size` edges to a `sink` callable, as `sink(sources, targets, weights)`.
+    The arrays passed to the sink are reused for the following blocks, the sink must copy them if needed.
+
+    The algorithms also report every processed node with `step`,
+    used to invoke the progress callback and to check for cancellation and timeouts.
+    """
+
+    def __init__(
+        self,
+        ts,
+        xs,
+        uint weighted,
+        weight_func,
+        size_t weight_func_address,
+        double min_weight,
+        double max_weight,
+        bint store_edges=True,
+        bint store_degrees=True,
+        bint node_stats=False,
+        degrees_in=None,
+        degrees_out=None,
+        sink=None,
+        Py_ssize_t chunk_size=1 << 20,
+        max_edges=None,
+        progress=None,
+        progress_every=None,
+        timeout=None,
+        cancel=None,
+        unsigned long long x_origin=0,
+    ):
+        cdef uint n = len(ts)
+
+        self.ts = ts
+        self.xs = xs
+        self.x_origin = x_origin
+        self.weighted = weighted
+        self.weight_func = weight_func
+        self.weight_func_ptr = <weight_func_type> weight_func_address
+        self.min_weight = min_weight
+        self.max_weight = max_weight
+        self.store_edges = store_edges
+        self.store_degrees = store_degrees
+        self.node_stats = node_stats
+
+        self.n_edges = 0
+        self.max_edges = ULLONG_MAX if max_edges is None else max_edges
+
+        self.edges = [] if store_edges else None
+
+        self.sink = sink
+        self.chunk_size = chunk_size
+        self.buffer_len = 0
+
+        if sink is not None:
+            if chunk_size < 1:
+                raise ValueError(f"'chunk_size' must be positive (got {chunk_size}).")
+
+            self.buffer_sources = np.empty(chunk_size, dtype=np.uint32)
+            self.buffer_targets = np.empty(chunk_size, dtype=np.uint32)
+            self._buffer_sources = self.buffer_sources
+            self._buffer_targets = self.buffer_targets
+
+            if weighted > 0:
+                self.buffer_weights = np.empty(chunk_size, dtype=np.float64)
+                self._buffer_weights = self.buffer_weights
+
+        if weighted > 0:
+            self.block_len = 0
+            self.block_sources = np.empty(_WEIGHTS_BLOCK_SIZE, dtype=np.uint32)
+            self.block_targets = np.empty(_WEIGHTS_BLOCK_SIZE, dtype=np.uint32)
+            self.block_slopes = np.empty(_WEIGHTS_BLOCK_SIZE, dtype=np.float64)
+            self._block_sources = self.block_sources
+            self._block_targets = self.block_targets
+            self._block_slopes = self.block_slopes
+
+            if weighted == _WEIGHTED_NUM_PENETRATIONS:
+                self.block_penetrations = np.zeros(_WEIGHTS_BLOCK_SIZE, dtype=np.float64)
+                self._block_penetrations = self.block_penetrations
+
+        self.n_total = n
+        self.n_processed = 0
+        self.monitored = progress is not None or timeout is not None or cancel is not None
+
+        self.progress = progress
+        self.progress_every = max(n // 100, 1) if progress_every is None else progress_every
+        self.next_progress = self.progress_every
+        self.n_reported = ULLONG_MAX
+
+        self.cancel = cancel
+        self.deadline = INFINITY if timeout is None else monotonic() + timeout
+        self.work = _CHECK_INTERRUPTED_WORK  # so that the first step already checks
+
+        if store_degrees:
+            self.degrees_in = np.zeros(n, dtype=np.uint32) if degrees_in is None else degrees_in
+            self.degrees_out = np.zeros(n, dtype=np.uint32) if degrees_out is None else degrees_out
+            self._degrees_in = self.degrees_in
+            self._degrees_out = self.degrees_out
+
+        if node_stats:
+            self.strengths_in = np.zeros(n, dtype=np.float64)
+            self.strengths_out = np.zeros(n, dtype=np.float64)
+            self.weights_min = np.full(n, INFINITY, dtype=np.float64)
+            self.weights_max = np.full(n, -INFINITY, dtype=np.float64)
+            self._strengths_in = self.strengths_in
+            self._strengths_out = self.strengths_out
+            self._weights_min = self.weights_min
+            self._weights_max = self.weights_max
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef int add_edge(self, uint i1, uint i2, double slope, double penetrations) except -1:
+        """
+        Called by the algorithms for every edge found, from node `i1` to node `i2`.
+        `slope` can be NaN if not computed by the algorithm, `penetrations` is only used in penetrable graphs.
+        """
+        if self.weighted == 0:
+            return self._add_edge(i1, i2, 0)
+
+        self._block_sources[self.block_len] = i1
+        self._block_targets[self.block_len] = i2
+        self._block_slopes[self.block_len] = slope
+
+        if self.weighted == _WEIGHTED_NUM_PENETRATIONS:
+            self._block_penetrations[self.block_len] = penetrations
+
+        self.block_len += 1
+
+        if self.block_len == _WEIGHTS_BLOCK_SIZE:
+            self.flush_weights()
+
+        return 0
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef int flush_weights(self) except -1:
+        """Computes the weights of the buffered edges, and adds the ones within the weight limits."""
+        cdef Py_ssize_t k = self.block_len
+        cdef Py_ssize_t j
+        cdef const np.float64_t[:] weights
+        cdef const np.float64_t[:] _x_a, _x_b, _y_a, _y_b, _slopes
+        cdef np.float64_t[:] _w
+
+        if k == 0:
+            return 0
+
+        self.block_len = 0
+
+        sources = self.block_sources[:k]
+        targets = self.block_targets[:k]
+
+        if self.weighted == _WEIGHTED_NUM_PENETRATIONS:
+            w = self.block_penetrations[:k]
+        else:
+            if self.xs is None:
+                x_a = sources.astype(np.float64) + self.x_origin
+                x_b = targets.astype(np.float64) + self.x_origin
+            else:
+                x_a = self.xs[sources]
+                x_b = self.xs[targets]
+
+            y_a = np.asarray(self.ts[sources], dtype=np.float64)
+            y_b = np.asarray(self.ts[targets], dtype=np.float64)
+            slopes = self.block_slopes[:k]
+
+            with np.errstate(all="ignore"):
+                missing = np.isnan(slopes)
+
+                if missing.any():
+                    slopes = np.where(missing, (y_b - y_a) / (x_b - x_a), slopes)
+
+                if self.weight_func_ptr != NULL:
+                    _x_a, _x_b, _y_a, _y_b, _slopes = x_a, x_b, y_a, y_b, np.ascontiguousarray(slopes)
+                    w = np.empty(k, dtype=np.float64)
+                    _w = w
+
+                    for j in range(k):
+                        _w[j] = self.weight_func_ptr(_x_a[j], _x_b[j], _y_a[j], _y_b[j], _slopes[j])
+                else:
+                    w = self.weight_func(x_a, x_b, y_a, y_b, slopes)
+
+        try:
+            weights = np.ascontiguousarray(np.broadcast_to(np.asarray(w, dtype=np.float64), (k,)))
+        except ValueError:
+            raise ValueError(f"Weight function must return {k} weights (got an array of shape {np.shape(w)}).") from None
+
+        for j in range(k):
+            if weights[j] <= self.min_weight or weights[j] >= self.max_weight:
+                continue
+
+            self._add_edge(self._block_sources[j], self._block_targets[j], weights[j])
+
+        return 0
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef int _add_edge(self, uint i1, uint i2, double w) except -1:
+        if self.n_edges >= self.max_edges:
+            raise BudgetExceededError(
+                f"Graph exceeds the maximum number of edges allowed ({self.max_edges}).",
+                n_edges=self.n_edges,
+                max_edges=self.max_edges,
+                degrees_in=self.degrees_in,
+                degrees_out=self.degrees_out,
+            )
+
+        self.n_edges += 1
+
+        if self.store_degrees:
+            self._degrees_out[i1] += 1
+            self._degrees_in[i2] += 1
+
+        if self.node_stats:
+            self._strengths_out[i1] += w
+            self._strengths_in[i2] += w
 
+            if w < self._weights_min[i1]:
+                self._weights_min[i1] = w
+            if w > self._weights_max[i1]:
+                self._weights_max[i1] = w
+            if w < self._weights_min[i2]:
+                self._weights_min[i2] = w
+            if w > self._weights_max[i2]:
+                self._weights_max[i2] = w
 
-cdef inline double _weight_v_distance(double x_a, double x_b, double y_a, double y_b, double slope):
-    return y_b - y_a
+        if self.store_edges:
+            if self.weighted > 0:
+                self.edges.append((i1, i2, w))
+            else:
+                self.edges.append((i1, i2))
 
+        if self.sink is not None:
+            self._buffer_sources[self.buffer_len] = i1
+            self._buffer_targets[self.buffer_len] = i2
+
+            if self.weighted > 0:
+                self._buffer_weights[self.buffer_len] = w
+
+            self.buffer_len += 1
 
-cdef inline double _weight_abs_v_distance(double x_a, double x_b, double y_a, double y_b, double slope):
-    return fabs(y_b - y_a)
+            if self.buffer_len == self.chunk_size:
+                self._flush()
 
+        return 0
 
-cdef inline double _weight_h_distance(double x_a, double x_b, double y_a, double y_b, double slope):
-    return x_b - x_a
+    cdef int _flush(self) except -1:
+        cdef Py_ssize_t k = self.buffer_len
 
+        if k == 0:
+            return 0
 
-cdef inline double _weight_abs_h_distance(double x_a, double x_b, double y_a, double y_b, double slope):
-    return fabs(x_b - x_a)
+        self.buffer_len = 0
+        self.sink(
+            self.buffer_sources[:k],
+            self.buffer_targets[:k],
+            self.buffer_weights[:k] if self.weighted > 0 else None,
+        )
 
+        return 0
 
-@cython.cdivision(True)
-cdef inline double _weight_slope(double x_a, double x_b, double y_a, double y_b, double slope):
-    if isnan(slope):
-        slope = (y_b-y_a) / (x_b-x_a)
-    return slope
+    cdef int step(self, unsigned long long work) except -1:
+        """Called by the algorithms after processing each node, `work` being the number of points visited for it."""
+        self.n_processed += 1
 
+        if not self.monitored:
+            return 0
 
-@cython.cdivision(True)
-cdef inline double _weight_abs_slope(double x_a, double x_b, double y_a, double y_b, double slope):
-    if isnan(slope):
-        slope = (y_b-y_a) / (x_b-x_a)
-    return fabs(slope)
+        if self.progress is not None and self.n_processed >= self.next_progress:
+            self.next_progress = self.n_processed + self.progress_every
+            self.n_reported = self.n_processed
+            self.progress(self.n_processed, self.n_total)
 
+            # the progress callback might be the one cancelling the build
+            self.work = _CHECK_INTERRUPTED_WORK
 
-@cython.cdivision(True)
-cdef inline double _weight_angle(double x_a, double x_b, double y_a, double y_b, double slope):
-    if isnan(slope):
-        slope = (y_b-y_a) / (x_b-x_a)
-    return atan(slope)
+        self.work += work
 
+        if self.work >= _CHECK_INTERRUPTED_WORK:
+            self.work = 0
+            self._check_interrupted()
 
-@cython.cdivision(True)
-cdef inline double _weight_abs_angle(double x_a, double x_b, double y_a, double y_b, double slope):
-    if isnan(slope):
-        slope = (y_b-y_a) / (x_b-x_a)
-    return atan(fabs(slope))
+        return 0
 
+    cdef int _check_interrupted(self) except -1:
+        if self.cancel is not None and self.cancel.is_set():
+            raise BuildCancelledError(
+                "Build cancelled.",
+                n_processed=self.n_processed,
+                n_edges=self.n_edges,
+            )
 
-cdef weight_func_type _get_weight_func(uint weighted):
-    if weighted == _UNWEIGHTED:
-        return _weight_0
+        if monotonic() > self.deadline:
+            raise BuildTimeoutError(
+                "Build timed out.",
+                n_processed=self.n_processed,
+                n_edges=self.n_edges,
+            )
 
-    if weighted == _WEIGHTED_DISTANCE:
-        return _weight_distance
-    
-    elif weighted == _WEIGHTED_SQ_DISTANCE:
-        return _weight_sq_distance
-    
-    elif weighted == _WEIGHTED_V_DISTANCE:
-        return _weight_v_distance
+        return 0
 
-    elif weighted == _WEIGHTED_ABS_V_DISTANCE:
-        return _weight_abs_v_distance
-    
-    elif weighted == _WEIGHTED_H_DISTANCE:
-        return _weight_h_distance
+    def finish(self):
+        """Called once the algorithm has finished, hands off the last block of edges and reports the final progress."""
+        if self.weighted > 0:
+            self.flush_weights()
 
-    elif weighted == _WEIGHTED_ABS_H_DISTANCE:
-        return _weight_abs_h_distance
-    
-    elif weighted == _WEIGHTED_SLOPE:
-        return _weight_slope
+        if self.sink is not None:
+            self._flush()
 
-    elif weighted == _WEIGHTED_ABS_SLOPE:
-        return _weight_abs_slope
-    
-    elif weighted == _WEIGHTED_ANGLE:
-        return _weight_angle
+        if self.progress is not None and self.n_reported != self.n_total:
+            self.n_reported = self.n_total
+            self.progress(self.n_total, self.n_total)
 
-    elif weighted == _WEIGHTED_ABS_ANGLE:
-        return _weight_abs_angle
-    
-    elif weighted == _WEIGHTED_NUM_PENETRATIONS:
-        # In non-penetrable VGs, num. penetrations is always 0.
-        # In penetrable VGs, num. penetrations is calculated in the algorithm function.
-        return _weight_0
 
-    else:
-        return _weight_nan
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _edge_list_columns(list edges, bint weighted):
+    """Convert a list of edge tuples (as stored by `_EdgeCollector`) into `sources`, `targets` and `weights` arrays."""
+    cdef Py_ssize_t i, m = len(edges)
+    cdef tuple edge
+
+    sources = np.empty(m, dtype=np.uint32)
+    targets = np.empty(m, dtype=np.uint32)
+    weights = np.empty(m if weighted else 0, dtype=np.float64)
+
+    cdef np.uint32_t[:] _sources = sources
+    cdef np.uint32_t[:] _targets = targets
+    cdef np.float64_t[:] _weights = weights
+
+    for i in range(m):
+        edge = <tuple>edges[i]
+        _sources[i] = edge[0]
+        _targets[i] = edge[1]
+        if weighted:
+            _weights[i] = edge[2]
+
+    return sources, targets, (weights if weighted else None)
@@ -4,12 +4,12 @@
 cimport cython
 import numpy as np
 cimport numpy as np
-from libc.math cimport INFINITY, NAN
+from libc.math cimport NAN
 from libcpp.queue cimport queue as cqueue
 from libcpp.pair cimport pair as cpair
 
 from ts2vg.graph.base import _DIRECTED_OPTIONS
-from ts2vg.graph._base cimport _argmax, _get_weight_func, weight_func_type
+from ts2vg.graph._base cimport ts_t, _argmax, _EdgeCollector
 
 ctypedef unsigned int uint
 ctypedef cpair[uint, uint] uint_pair
@@ -20,79 +20,112 @@ cdef uint _DIRECTED_TOP_TO_BOTTOM = _DIRECTED_OPTIONS['top_to_bottom']
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
-@cython.cdivision(True)
-def _compute_graph(np.float64_t[:] ts, np.float64_t[:] xs, uint directed, uint weighted, bint only_degrees, double min_weight, double max_weight):
+cdef inline int _sweep_left(const ts_t[:] ts, const np.float64_t[:] xs, uint i, uint left, uint emit_below, uint directed, _EdgeCollector collector) except -1:
     """
-    Computes the horizontal visibility graph of a time series
-    using a divide-and-conquer strategy.
+    Sweeps from node `i` towards the left, down to node `left` (inclusive),
+    adding the edges to the visible nodes with an index lower than `emit_below`.
     """
-    cdef uint n = ts.size
-    cdef list edges = []
-    cdef np.uint32_t[:] degrees_in = np.zeros(n, dtype=np.uint32)
-    cdef np.uint32_t[:] degrees_out = np.zeros(n, dtype=np.uint32)
+    cdef uint d
+    cdef ts_t max_y = 0
+    cdef bint seen = False, visible
 
-    cdef uint left, right, i, d
-    cdef double x_a, x_b, y_a, y_b
-    cdef double max_y, w
+    for d in range(1, i-left+1):
+        # compared in the type of the time series, exact for integers
+        if seen:
+            visible = ts[i-d] > max_y
+        else:
+            visible = ts[i-d] == ts[i-d]  # the first node is always visible, unless NaN
 
-    cdef weight_func_type weight_func = _get_weight_func(weighted)
+        if visible:
+            if i-d < emit_below:
+                if directed == _DIRECTED_TOP_TO_BOTTOM:
+                    collector.add_edge(i, i-d, NAN, 0)
+                else:  # left_to_right
+                    collector.add_edge(i-d, i, NAN, 0)
 
-    cdef cqueue[uint_pair] queue
-    queue.push(uint_pair(0, n))
+            max_y = ts[i-d]
+            seen = True
+
+    return 0
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline int _sweep_right(const ts_t[:] ts, const np.float64_t[:] xs, uint i, uint right, uint emit_from, _EdgeCollector collector) except -1:
+    """
+    Sweeps from node `i` towards the right, up to node `right` (non inclusive),
+    adding the edges to the visible nodes with an index higher than or equal to `emit_from`.
+    """
+    cdef uint d
+    cdef ts_t max_y = 0
+    cdef bint seen = False, visible
+
+    for d in range(1, right-i):
+        # compared in the type of the time series, exact for integers
+        if seen:
+            visible = ts[i+d] > max_y
+        else:
+            visible = ts[i+d] == ts[i+d]  # the first node is always visible, unless NaN
+
+        if visible:
+            if i+d >= emit_from:
+                # note, single case works for both top_to_bottom and left_to_right orders
+                collector.add_edge(i, i+d, NAN, 0)
 
-    def add_edge(uint i1, uint i2, double x1, double x2, double y1, double y2):
-        w = weight_func(x1, x2, y1, y2, NAN)
+            max_y = ts[i+d]
+            seen = True
 
-        if w <= min_weight or w >= max_weight:
-            return
+    return 0
 
-        degrees_out[i1] += 1
-        degrees_in[i2] += 1
 
-        if not only_degrees:
-            if weighted > 0:
-                edges.append((i1, i2, w))
-            else:
-                edges.append((i1, i2))
+def _compute_graph(const ts_t[:] ts, const np.float64_t[:] xs, uint directed, _EdgeCollector collector):
+    """
+    Computes the horizontal visibility graph of a time series
+    using a divide-and-conquer strategy.
+    """
+    cdef uint n = ts.size
+    cdef uint left, right, i
 
+    cdef cqueue[uint_pair] queue
+    queue.push(uint_pair(0, n))
 
     while not queue.empty():
         pair = queue.front()
         left, right = pair.first, pair.second
         queue.pop()
 
+        if left < right:
+            collector.step(right-left)
+
         if left+1 < right:
             i = _argmax(ts, left, right)
-            x_a = xs[i]
-            y_a = ts[i]
 
-            # sweep from i towards the left
-            max_y = -INFINITY
-            for d in range(1, i-left+1):
-                x_b = xs[i-d]
-                y_b = ts[i-d]
+            _sweep_left(ts, xs, i, left, i, directed, collector)
+            _sweep_right(ts, xs, i, right, i+1, collector)
 
-                if y_b > max_y:
-                    if directed == _DIRECTED_TOP_TO_BOTTOM:
-                        add_edge(i, i-d, x_a, x_b, y_a, y_b)
-                    else:  # left_to_right
-                        add_edge(i-d, i, x_b, x_a, y_b, y_a)
+            queue.push(uint_pair(left, i))
+            queue.push(uint_pair(i+1, right))
 
-                    max_y = y_b
 
-            # sweep from i towards the right
-            max_y = -INFINITY
-            for d in range(1, right-i):
-                x_b = xs[i+d]
-                y_b = ts[i+d]
+def _compute_cross_edges(const ts_t[:] ts, const np.float64_t[:] xs, uint directed, uint boundary, _EdgeCollector collector):
+    """
+    Computes only the edges of the horizontal visibility graph of a time series that connect a node before `boundary`
+    with a node at or after `boundary`.
 
-                if y_b > max_y:
-                    # note, single case works for both top_to_bottom and left_to_right orders
-                    add_edge(i, i+d, x_a, x_b, y_a, y_b)
+    See `_compute_cross_edges` in _natural.pyx.
+    """
+    cdef uint left = 0
+    cdef uint right = ts.size
+    cdef uint i
 
-                    max_y = y_b
+    while left < boundary < right:
+        collector.step(right-left)
 
-            queue.push(uint_pair(left, i))
-            queue.push(uint_pair(i+1, right))
+        i = _argmax(ts, left, right)
 
-    return edges, np.asarray(degrees_in, dtype=np.uint32), np.asarray(degrees_out, dtype=np.uint32)
+        if i < boundary:
+            _sweep_right(ts, xs, i, right, boundary, collector)
+            left = i+1
+        else:
+            _sweep_left(ts, xs, i, left, boundary, directed, collector)
+            right = i
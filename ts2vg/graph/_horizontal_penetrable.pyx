@@ -4,9 +4,10 @@ cimport cython
 import numpy as np
 cimport numpy as np
 from libc.math cimport INFINITY, NAN, isnan
+from libc.stdlib cimport malloc, free
 
 from ts2vg.graph.base import _DIRECTED_OPTIONS, _WEIGHTED_OPTIONS
-from ts2vg.graph._base cimport _argmax, _argmin, _get_weight_func, weight_func_type
+from ts2vg.graph._base cimport ts_t, _EdgeCollector
 
 ctypedef unsigned int uint
 
@@ -17,85 +18,115 @@ cdef uint _WEIGHTED_NUM_PENETRATIONS = _WEIGHTED_OPTIONS['num_penetrations']
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
-@cython.cdivision(True)
-def _compute_graph(np.float64_t[:] ts, np.float64_t[:] xs, uint directed, uint weighted, bint only_degrees, double min_weight, double max_weight, uint penetrable_limit):
+cdef long long _sweep(const ts_t[:] ts, const np.float64_t[:] xs, uint i_a, uint stop, uint directed, uint weighted, uint penetrable_limit, ts_t* max_ys, _EdgeCollector collector) except -1:
     """
-    Computes the limited penetrable horizontal visibility graph of a time series.
+    Adds the edges between node `i_a` and the nodes to its right, up to node `stop` (non inclusive).
+    Returns the number of nodes visited.
     """
 
     # Algorithm implementation comments:
     # See comments in _natural_penetrable.pyx.
     # Horizontal case is analogous, replacing slope with height (y),
     # and with the additional benefit than sweeps can be stopped earlier.
+    # Heights are compared in the type of the time series, so comparisons are exact for integers.
 
-    cdef uint n = ts.size
-    cdef list edges = []
-    cdef np.uint32_t[:] degrees_in = np.zeros(n, dtype=np.uint32)
-    cdef np.uint32_t[:] degrees_out = np.zeros(n, dtype=np.uint32)
-
-    cdef uint i_a, i_b
-    cdef double x_a, x_b, y_a, y_b
+    cdef uint i_b = i_a, j
+    cdef uint S = penetrable_limit + 1
+    cdef uint n_ys = 0
     cdef double w
-    cdef np.float64_t[:] max_ys = np.full(penetrable_limit+1, -INFINITY, dtype=np.float64)
     cdef uint threshold_y_idx = 0
-    cdef double threshold_y = -INFINITY
-
-    cdef weight_func_type weight_func = _get_weight_func(weighted)
-
-    def add_edge(uint i1, uint i2, double x1, double x2, double y1, double y2, double known_w):
-        if isnan(known_w):
-            w = weight_func(x1, x2, y1, y2, NAN)
-        else:
-            w = known_w
+    cdef ts_t y_a, y_b, threshold_y = 0
+    cdef bint visible
 
-        if w <= min_weight or w >= max_weight:
-            return
+    y_a = ts[i_a]
 
-        degrees_out[i1] += 1
-        degrees_in[i2] += 1
+    # sweep from i towards the right
+    for i_b in range(i_a+1, stop):
+        y_b = ts[i_b]
 
-        if not only_degrees:
-            if weighted > 0:
-                edges.append((i1, i2, w))
+        if n_ys < S:
+            visible = y_a == y_a and y_b == y_b  # not NaN
+        else:
+            visible = y_a > threshold_y and y_b > threshold_y
+
+        if visible:
+            w = 0.0
+            if weighted == _WEIGHTED_NUM_PENETRATIONS:
+                # count number of penetrations (other weights are computed later by the collector)
+                for j in range(n_ys):
+                    if y_a <= max_ys[j] or y_b <= max_ys[j]:
+                        w += 1.0
+
+            if directed == _DIRECTED_TOP_TO_BOTTOM and (y_b > y_a):
+                collector.add_edge(i_b, i_a, NAN, w)
+            else:  # left_to_right
+                collector.add_edge(i_a, i_b, NAN, w)
+
+            if n_ys < S:
+                max_ys[n_ys] = y_b
+                n_ys += 1
             else:
-                edges.append((i1, i2))
-
-    for i_a in range(n-1):
-        x_a = xs[i_a]
-        y_a = ts[i_a]
-
-        # sweep from i towards the right
-        threshold_y = -INFINITY
-        max_ys[:] = -INFINITY
-        for i_b in range(i_a+1, n):
-            x_b = xs[i_b]
-            y_b = ts[i_b]
-
-            if (y_a > threshold_y and y_b > threshold_y):
-                if weighted == _WEIGHTED_NUM_PENETRATIONS:
-                    # count number of penetrations
-                    w = 0.0
-                    for j in range(penetrable_limit+1):
-                        if y_a <= max_ys[j] or y_b <= max_ys[j]:
-                            w += 1.0
-                else:
-                    # weight will be computed later by weight_func
-                    w = NAN
-
-                if directed == _DIRECTED_TOP_TO_BOTTOM and (y_b > y_a):
-                    add_edge(i_b, i_a, x_b, x_a, y_b, y_a, w)
-                else:  # left_to_right
-                    add_edge(i_a, i_b, x_a, x_b, y_a, y_b, w)
-
                 # drop the old smallest value in `max_ys` and replace it with the new y.
                 max_ys[threshold_y_idx] = y_b
 
+            if n_ys == S:
                 # new threshold y is the new smallest value in `max_ys`.
-                threshold_y_idx = _argmin(max_ys, 0, penetrable_limit+1)
+                threshold_y_idx = 0
+                for j in range(1, S):
+                    if max_ys[j] < max_ys[threshold_y_idx]:
+                        threshold_y_idx = j
                 threshold_y = max_ys[threshold_y_idx]
 
                 if threshold_y > y_a:
                     # earlier condition will never be satisfied anymore in this sweep
                     break
 
-    return edges, np.asarray(degrees_in, dtype=np.uint32), np.asarray(degrees_out, dtype=np.uint32)
+    return i_b - i_a
+
+
+def _compute_graph(const ts_t[:] ts, const np.float64_t[:] xs, uint directed, uint weighted, uint penetrable_limit, _EdgeCollector collector):
+    """
+    Computes the limited penetrable horizontal visibility graph of a time series.
+    """
+    cdef uint n = ts.size
+    cdef uint i_a
+    cdef ts_t* max_ys = <ts_t*> malloc((penetrable_limit+1) * sizeof(ts_t))
+
+    if max_ys == NULL:
+        raise MemoryError()
+
+    try:
+        for i_a in range(n-1):
+            collector.step(_sweep(ts, xs, i_a, n, directed, weighted, penetrable_limit, max_ys, collector))
+    finally:
+        free(max_ys)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _count_sweeps(const ts_t[:] ts, const np.float64_t[:] xs, uint directed, uint weighted, uint penetrable_limit, np.uint32_t[:] sources, uint horizon, _EdgeCollector collector):
+    """
+    Counts the edges between each of the `sources` nodes and the (at most `horizon`) nodes to their right.
+
+    With `penetrable_limit` 0 this is also a valid (quadratic) algorithm for the regular horizontal visibility graph,
+    used to estimate graph sizes from a sample of nodes.
+    """
+    cdef uint n = ts.size
+    cdef Py_ssize_t k
+    cdef unsigned long long before
+    cdef np.uint64_t[:] counts = np.zeros(sources.shape[0], dtype=np.uint64)
+    cdef ts_t* max_ys = <ts_t*> malloc((penetrable_limit+1) * sizeof(ts_t))
+
+    if max_ys == NULL:
+        raise MemoryError()
+
+    try:
+        for k in range(sources.shape[0]):
+            before = collector.n_edges
+            _sweep(ts, xs, sources[k], min(<unsigned long long>sources[k] + horizon + 1, n), directed, weighted, penetrable_limit, max_ys, collector)
+            collector.flush_weights()
+            counts[k] = collector.n_edges - before
+    finally:
+        free(max_ys)
+
+    return np.asarray(counts)
@@ -0,0 +1,495 @@
+#cython: language_level=3
+
+cimport cython
+import numpy as np
+cimport numpy as np
+
+ctypedef unsigned int uint
+
+# ratio of the lengths of two sorted lists of nodes above which their intersection
+# is found by searching the longer one instead of merging them
+cdef Py_ssize_t _GALLOP_RATIO = 256
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _csr(const np.uint32_t[:] sources, const np.uint32_t[:] targets, Py_ssize_t n):
+    """
+    CSR arrays `indptr` and `indices` of the undirected graph with `n` nodes and the given edges,
+    with the neighbours of each node sorted in increasing order,
+    and the array `forward` with the position in `indices` of the first neighbour of each node with a greater index.
+
+    Built in O(n + m) time with counting passes instead of sorting the edges:
+    the edges are bucketed by their last node, scanning the buckets in order fills the forward neighbours of each node
+    in increasing order, and scanning these in order fills the backward neighbours in increasing order.
+    """
+    cdef Py_ssize_t m = sources.shape[0]
+    cdef Py_ssize_t e, a, u
+    cdef uint lo, hi, w
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    forward = np.empty(n, dtype=np.int64)
+    indices = np.empty(2 * m, dtype=np.uint32)
+
+    # first nodes of the edges, bucketed by their last node
+    lows_indptr = np.zeros(n + 1, dtype=np.int64)
+    lows = np.empty(m, dtype=np.uint32)
+
+    positions = np.empty(n, dtype=np.int64)
+
+    cdef np.int64_t[:] _indptr = indptr
+    cdef np.int64_t[:] _forward = forward
+    cdef np.uint32_t[:] _indices = indices
+    cdef np.int64_t[:] _lows_indptr = lows_indptr
+    cdef np.uint32_t[:] _lows = lows
+    cdef np.int64_t[:] _positions = positions
+
+    with nogil:
+        for e in range(m):
+            lo = min(sources[e], targets[e])
+            hi = max(sources[e], targets[e])
+
+            _indptr[lo+1] += 1
+            _indptr[hi+1] += 1
+            _lows_indptr[hi+1] += 1
+
+        for u in range(n):
+            _indptr[u+1] += _indptr[u]
+            _lows_indptr[u+1] += _lows_indptr[u]
+
+            # after the backward neighbours
+            _forward[u] = _indptr[u] + (_lows_indptr[u+1] - _lows_indptr[u])
+            _positions[u] = _lows_indptr[u]
+
+        for e in range(m):
+            lo = min(sources[e], targets[e])
+            hi = max(sources[e], targets[e])
+
+            _lows[_positions[hi]] = lo
+            _positions[hi] += 1
+
+        # forward neighbours
+        for u in range(n):
+            _positions[u] = _forward[u]
+
+        for hi in range(n):
+            for e in range(_lows_indptr[hi], _lows_indptr[hi+1]):
+                lo = _lows[e]
+                _indices[_positions[lo]] = hi
+                _positions[lo] += 1
+
+        # backward neighbours
+        for u in range(n):
+            _positions[u] = _indptr[u]
+
+        for u in range(n):
+            for a in range(_forward[u], _indptr[u+1]):
+                w = _indices[a]
+                _indices[_positions[w]] = u
+                _positions[w] += 1
+
+    return indptr, indices, forward
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline Py_ssize_t _search(const np.uint32_t[:] a, Py_ssize_t left, Py_ssize_t right, uint value) noexcept nogil:
+    """Get the first index between `left` and `right` where `value` could be inserted keeping `a` sorted (exponential search)."""
+    cdef Py_ssize_t step = 1, mid
+
+    # find a range of increasing size containing the index, then bisect it
+    while left + step < right and a[left + step] < value:
+        left += step
+        step *= 2
+
+    if left + step < right:
+        right = left + step + 1
+
+    while left < right:
+        mid = (left + right) // 2
+        if a[mid] < value:
+            left = mid + 1
+        else:
+            right = mid
+
+    return left
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline void _count_common(const np.uint32_t[:] indices, Py_ssize_t i, Py_ssize_t end_i, Py_ssize_t j, Py_ssize_t end_j, uint u, uint v, np.int64_t[:] triangles) noexcept nogil:
+    """Add a triangle to `u`, `v` and `w` for each node `w` in both sorted ranges `indices[i:end_i]` and `indices[j:end_j]`."""
+    cdef uint x, y
+
+    if end_i - i > _GALLOP_RATIO * (end_j - j):
+        i, end_i, j, end_j = j, end_j, i, end_i
+
+    if end_j - j > _GALLOP_RATIO * (end_i - i):
+        # much longer second range, search each node of the first one in it
+        while i < end_i and j < end_j:
+            x = indices[i]
+            j = _search(indices, j, end_j, x)
+
+            if j < end_j and indices[j] == x:
+                triangles[u] += 1
+                triangles[v] += 1
+                triangles[x] += 1
+                j += 1
+            i += 1
+    else:
+        while i < end_i and j < end_j:
+            x = indices[i]
+            y = indices[j]
+
+            if x < y:
+                i += 1
+            elif y < x:
+                j += 1
+            else:
+                triangles[u] += 1
+                triangles[v] += 1
+                triangles[x] += 1
+                i += 1
+                j += 1
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _triangles(const np.int64_t[:] indptr, const np.uint32_t[:] indices, const np.int64_t[:] forward):
+    """
+    Number of triangles through each node of the undirected graph given by the CSR arrays `indptr`, `indices` and `forward`
+    (see `_csr`).
+
+    Each triangle `u < v < w` is found once, from its edge `(u, v)`, by intersecting the forward neighbours of `u`
+    greater than `v` with the forward neighbours of `v`.
+    Nodes are ordered by time, so in visibility graphs most forward neighbour lists are short and close in memory
+    and are intersected by merging them.
+    Long lists (e.g. of hubs) are instead searched for the nodes of the shorter list,
+    so that they are not scanned again for each of their neighbours.
+    """
+    cdef Py_ssize_t n = indptr.shape[0] - 1
+    cdef Py_ssize_t u, a
+
+    triangles = np.zeros(n, dtype=np.int64)
+    cdef np.int64_t[:] _triangles = triangles
+
+    with nogil:
+        for u in range(n):
+            for a in range(forward[u], indptr[u+1]):
+                _count_common(indices, a + 1, indptr[u+1], forward[indices[a]], indptr[indices[a]+1], u, indices[a], _triangles)
+
+    return triangles
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _motif_codes(const np.int64_t[:] indptr, const np.uint32_t[:] indices, const np.int64_t[:] forward, Py_ssize_t size):
+    """
+    Code of the subgraph induced by each window of `size` consecutive nodes of the undirected graph given by the CSR arrays
+    `indptr`, `indices` and `forward` (see `_csr`).
+
+    The code has one bit for each pair of positions `(p, q)` in the window (`0 <= p < q < size`, in lexicographic order),
+    set if the nodes at these positions are connected.
+    Each edge between nodes closer than `size` sets its bit in the (at most `size - 1`) windows containing it,
+    so the codes of all the windows are found in O(n * size^2) time.
+    """
+    cdef Py_ssize_t n = indptr.shape[0] - 1
+    cdef Py_ssize_t n_windows = max(n - size + 1, 0)
+    cdef Py_ssize_t i, j, a, s, p, q, k = 0
+
+    codes = np.zeros(n_windows, dtype=np.uint16)
+    pair_bits = np.zeros((size, size), dtype=np.uint16)
+
+    cdef np.uint16_t[:] _codes = codes
+    cdef np.uint16_t[:, :] _pair_bits = pair_bits
+
+    for p in range(size):
+        for q in range(p + 1, size):
+            _pair_bits[p, q] = 1 << k
+            k += 1
+
+    with nogil:
+        for i in range(n):
+            for a in range(forward[i], indptr[i+1]):
+                j = indices[a]
+                if j >= i + size:
+                    break
+
+                for s in range(max(j - size + 1, 0), min(i + 1, n_windows)):
+                    _codes[s] |= _pair_bits[i - s, j - s]
+
+    return codes
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _sliding_counts(const np.uint16_t[:] codes, Py_ssize_t n_codes, Py_ssize_t window, Py_ssize_t step):
+    """
+    Number of occurrences of each of the `n_codes` codes in the windows `codes[k*step : k*step + window]`,
+    sliding a single array of counts over `codes`.
+    """
+    cdef Py_ssize_t n = codes.shape[0]
+    cdef Py_ssize_t n_windows = (n - window) // step + 1 if n >= window else 0
+    cdef Py_ssize_t w, c, i, start = 0, stop = 0
+
+    result = np.zeros((n_windows, n_codes), dtype=np.int64)
+    counts = np.zeros(n_codes, dtype=np.int64)
+
+    cdef np.int64_t[:, :] _result = result
+    cdef np.int64_t[:] _counts = counts
+
+    with nogil:
+        for w in range(n_windows):
+            # codes leaving and entering the window
+            for i in range(start, min(w * step, stop)):
+                _counts[codes[i]] -= 1
+            for i in range(max(w * step, stop), w * step + window):
+                _counts[codes[i]] += 1
+
+            start = w * step
+            stop = w * step + window
+
+            for c in range(n_codes):
+                _result[w, c] = _counts[c]
+
+    return result
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _window_degrees(const np.int64_t[:] indptr, const np.uint32_t[:] indices, const np.int64_t[:] forward, Py_ssize_t window, Py_ssize_t step, Py_ssize_t first, Py_ssize_t n_windows):
+    """
+    Number of backward and forward neighbours of each node in the subgraphs induced by the windows of `window` consecutive nodes
+    (starting every `step` nodes) of the undirected graph given by the CSR arrays `indptr`, `indices` and `forward` (see `_csr`).
+
+    Return two 2D arrays with a row for each of the `n_windows` windows starting from window number `first`
+    (called on blocks of windows, to bound the memory used).
+    The neighbours of each node inside the window are found with an exponential search in its (sorted) neighbours.
+    """
+    cdef Py_ssize_t w, i, start, stop
+
+    backward = np.empty((n_windows, window), dtype=np.int64)
+    forward_ = np.empty((n_windows, window), dtype=np.int64)
+
+    cdef np.int64_t[:, :] _backward = backward
+    cdef np.int64_t[:, :] _forward = forward_
+
+    with nogil:
+        for w in range(n_windows):
+            start = (first + w) * step
+            stop = start + window
+
+            for i in range(start, stop):
+                _backward[w, i - start] = forward[i] - _search(indices, indptr[i], forward[i], start)
+                _forward[w, i - start] = _search(indices, forward[i], indptr[i+1], stop) - forward[i]
+
+    return backward, forward_
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _add_product(
+    const np.uint32_t[:] sources,
+    const np.uint32_t[:] targets,
+    const np.float64_t[:] weights,
+    const np.float64_t[:] x,
+    np.float64_t[:] out,
+):
+    """
+    Add to `out` the product of the (symmetric) adjacency matrix of the undirected graph with the given edges by `x`,
+    with the edges weighted by `weights` (if not None) or by 1.
+
+    Works directly on the edge arrays, in a single pass over the edges.
+    """
+    cdef Py_ssize_t e, m = sources.shape[0]
+    cdef uint a, b
+    cdef bint weighted = weights is not None
+
+    with nogil:
+        if weighted:
+            for e in range(m):
+                a = sources[e]
+                b = targets[e]
+                out[a] += weights[e] * x[b]
+                out[b] += weights[e] * x[a]
+        else:
+            for e in range(m):
+                a = sources[e]
+                b = targets[e]
+                out[a] += x[b]
+                out[b] += x[a]
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _core_numbers(const np.int64_t[:] indptr, const np.uint32_t[:] indices):
+    """
+    Core number of each node of the undirected graph given by the CSR arrays `indptr` and `indices`.
+
+    Uses the O(m) bucket algorithm by V. Batagelj and M. Zaversnik, "An O(m) Algorithm for Cores Decomposition of Networks", 2003.
+    """
+    cdef Py_ssize_t n = indptr.shape[0] - 1
+    cdef Py_ssize_t i, a, u, v, w, d, start, pu, pw, max_degree = 0
+
+    degrees = np.empty(n, dtype=np.int64)
+    cdef np.int64_t[:] deg = degrees
+
+    for i in range(n):
+        deg[i] = indptr[i+1] - indptr[i]
+        if deg[i] > max_degree:
+            max_degree = deg[i]
+
+    bin_starts = np.zeros(max_degree + 1, dtype=np.int64)
+    order = np.empty(n, dtype=np.int64)
+    positions = np.empty(n, dtype=np.int64)
+
+    cdef np.int64_t[:] bins = bin_starts
+    cdef np.int64_t[:] vert = order
+    cdef np.int64_t[:] pos = positions
+
+    with nogil:
+        # sort the nodes by degree (bucket sort)
+        for i in range(n):
+            bins[deg[i]] += 1
+
+        start = 0
+        for d in range(max_degree + 1):
+            i = bins[d]
+            bins[d] = start
+            start += i
+
+        for i in range(n):
+            pos[i] = bins[deg[i]]
+            vert[pos[i]] = i
+            bins[deg[i]] += 1
+
+        for d in range(max_degree, 0, -1):
+            bins[d] = bins[d-1]
+        bins[0] = 0
+
+        # remove the nodes in order of (current) degree, keeping the node array sorted
+        for i in range(n):
+            v = vert[i]
+
+            for a in range(indptr[v], indptr[v+1]):
+                u = indices[a]
+
+                if deg[u] > deg[v]:
+                    # swap 'u' with the first node with the same degree, then move the start of its bucket
+                    pu = pos[u]
+                    pw = bins[deg[u]]
+                    w = vert[pw]
+
+                    if u != w:
+                        pos[u] = pw
+                        vert[pu] = w
+                        pos[w] = pu
+                        vert[pw] = u
+
+                    bins[deg[u]] += 1
+                    deg[u] -= 1
+
+    return degrees
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef Py_ssize_t _bfs(const np.int64_t[:] indptr, const np.uint32_t[:] indices, uint source, np.int64_t[:] dist, np.uint32_t[:] queue) noexcept nogil:
+    """
+    Breadth-first search from `source`, filling `dist` (which must be initialized to -1) with the distance to each node.
+    Return the number of nodes reached (including `source`), which are left in `queue[:n_reached]` in order of distance.
+    """
+    cdef Py_ssize_t head = 0, tail = 1, a
+    cdef uint u, v
+
+    queue[0] = source
+    dist[source] = 0
+
+    while head < tail:
+        u = queue[head]
+        head += 1
+
+        for a in range(indptr[u], indptr[u+1]):
+            v = indices[a]
+            if dist[v] < 0:
+                dist[v] = dist[u] + 1
+                queue[tail] = v
+                tail += 1
+
+    return tail
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _shortest_path_lengths(const np.int64_t[:] indptr, const np.uint32_t[:] indices, uint source):
+    """
+    Distance from node `source` to every node of the undirected graph given by the CSR arrays `indptr` and `indices`
+    (-1 for unreachable nodes).
+    """
+    cdef Py_ssize_t n = indptr.shape[0] - 1
+
+    dist = np.full(n, -1, dtype=np.int64)
+    queue = np.empty(n, dtype=np.uint32)
+
+    cdef np.int64_t[:] _dist = dist
+    cdef np.uint32_t[:] _queue = queue
+
+    with nogil:
+        _bfs(indptr, indices, source, _dist, _queue)
+
+    return dist
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _bfs_stats(
+    const np.int64_t[:] indptr,
+    const np.uint32_t[:] indices,
+    const np.uint32_t[:] sources,
+    np.int64_t[:] totals,
+    np.int64_t[:] reached,
+    np.int64_t[:] eccentricities,
+    np.int64_t[:] node_totals = None,
+    np.int64_t[:] node_max = None,
+):
+    """
+    Run a breadth-first search from each of the `sources` of the undirected graph given by the CSR arrays `indptr` and `indices`.
+
+    For each source, store in `totals`, `reached` and `eccentricities` the sum of the distances to the nodes reached,
+    the number of nodes reached (including the source) and the largest distance found.
+    If provided, the distances from the sources are also added to `node_totals`,
+    and their maximum is kept in `node_max`, for every node.
+
+    The GIL is released, so that several threads can run this on different sources
+    (with different `node_totals` and `node_max` arrays).
+    """
+    cdef Py_ssize_t n = indptr.shape[0] - 1
+    cdef Py_ssize_t k, r, n_reached
+    cdef uint i
+    cdef bint per_node = node_totals is not None
+
+    dist = np.full(n, -1, dtype=np.int64)
+    queue = np.empty(n, dtype=np.uint32)
+
+    cdef np.int64_t[:] _dist = dist
+    cdef np.uint32_t[:] _queue = queue
+
+    with nogil:
+        for k in range(sources.shape[0]):
+            n_reached = _bfs(indptr, indices, sources[k], _dist, _queue)
+
+            reached[k] = n_reached
+            # the last node reached is the farthest one
+            eccentricities[k] = _dist[_queue[n_reached - 1]]
+            totals[k] = 0
+
+            for r in range(n_reached):
+                i = _queue[r]
+                totals[k] += _dist[i]
+
+                if per_node:
+                    node_totals[i] += _dist[i]
+                    if _dist[i] > node_max[i]:
+                        node_max[i] = _dist[i]
+
+                _dist[i] = -1  # reset only the nodes reached
@@ -4,12 +4,12 @@
 cimport cython
 import numpy as np
 cimport numpy as np
-from libc.math cimport fabs, INFINITY
+from libc.math cimport fabs, INFINITY, NAN
 from libcpp.queue cimport queue as cqueue
 from libcpp.pair cimport pair as cpair
 
 from ts2vg.graph.base import _DIRECTED_OPTIONS
-from ts2vg.graph._base cimport _greater, _argmax, _get_weight_func, weight_func_type
+from ts2vg.graph._base cimport ts_t, wide_int, _greater, _orient2d, _argmax, _EdgeCollector
 
 ctypedef unsigned int uint
 ctypedef cpair[uint, uint] uint_pair
@@ -23,83 +23,175 @@ cdef uint _DIRECTED_TOP_TO_BOTTOM = _DIRECTED_OPTIONS['top_to_bottom']
 @cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.cdivision(True)
-def _compute_graph(np.float64_t[:] ts, np.float64_t[:] xs, uint directed, uint weighted, bint only_degrees, double min_weight, double max_weight):
+cdef inline int _sweep_left(const ts_t[:] ts, const np.float64_t[:] xs, uint i, uint left, uint emit_below, uint directed, bint robust, _EdgeCollector collector) except -1:
     """
-    Computes the visibility graph of a time series
-    using a divide-and-conquer strategy.
+    Sweeps from node `i` towards the left, down to node `left` (inclusive),
+    adding the edges to the visible nodes with an index lower than `emit_below`.
     """
-    cdef uint n = ts.size
-    cdef list edges = []
-    cdef np.uint32_t[:] degrees_in = np.zeros(n, dtype=np.uint32)
-    cdef np.uint32_t[:] degrees_out = np.zeros(n, dtype=np.uint32)
+    cdef uint d
+    cdef double x_a, x_b, y_a, y_b, x_m = 0, y_m = 0
+    cdef double slope, max_slope, tol
+    cdef wide_int dy = 0, max_dy = 0, max_dx = 0
+    cdef bint visible
+
+    # if xs is not provided, the x coordinates are the indices (uniform spacing), starting at the origin of the collector
+    cdef bint uniform = xs is None
+    cdef double x0 = collector.x_origin
+
+    # integer time series with uniform spacing: slopes are compared exactly, using cross products
+    cdef bint exact = False
+    if ts_t is np.int32_t or ts_t is np.int64_t:
+        exact = uniform
+
+    x_a = x0 + i if uniform else xs[i]
+    y_a = ts[i]
+
+    max_slope = -INFINITY
+    for d in range(1, i-left+1):
+        x_b = x0 + (i-d) if uniform else xs[i-d]
+        y_b = ts[i-d]
+        slope = NAN  # if not needed for the comparisons, computed later by the collector
+
+        if exact:
+            dy = <wide_int> ts[i-d] - <wide_int> ts[i]
+            visible = max_dx == 0 or dy * max_dx > max_dy * d
+        elif robust:
+            # orientation of the last visible node, this node and node `i`
+            if max_dx == 0:
+                visible = (y_b-y_a) == (y_b-y_a)  # not NaN
+            else:
+                visible = _orient2d(x_m, y_m, x_b, y_b, x_a, y_a) < 0
+        else:
+            slope = (y_b-y_a) / -(x_b-x_a)  # note: x-axis reversed because sweeping from left to right
+            tol = max(ABS_TOL, REL_TOL * max(fabs(x_a), fabs(x_b), fabs(y_a), fabs(y_b)))
+            visible = _greater(slope, max_slope, tol)
 
-    cdef uint left, right, i, d
-    cdef double x_a, x_b, y_a, y_b
-    cdef double slope, max_slope, w
+        if visible:
+            if i-d < emit_below:
+                if directed == _DIRECTED_TOP_TO_BOTTOM:
+                    collector.add_edge(i, i-d, -slope, 0)
+                else:  # left_to_right
+                    collector.add_edge(i-d, i, -slope, 0)
 
-    cdef weight_func_type weight_func = _get_weight_func(weighted)
+            max_slope = slope
+            max_dy = dy
+            max_dx = d
+            x_m = x_b
+            y_m = y_b
 
-    cdef cqueue[uint_pair] queue
-    queue.push(uint_pair(0, n))
+    return 0
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cdef inline int _sweep_right(const ts_t[:] ts, const np.float64_t[:] xs, uint i, uint right, uint emit_from, bint robust, _EdgeCollector collector) except -1:
+    """
+    Sweeps from node `i` towards the right, up to node `right` (non inclusive),
+    adding the edges to the visible nodes with an index higher than or equal to `emit_from`.
+    """
+    cdef uint d
+    cdef double x_a, x_b, y_a, y_b, x_m = 0, y_m = 0
+    cdef double slope, max_slope, tol
+    cdef wide_int dy = 0, max_dy = 0, max_dx = 0
+    cdef bint visible
+
+    # if xs is not provided, the x coordinates are the indices (uniform spacing), starting at the origin of the collector
+    cdef bint uniform = xs is None
+    cdef double x0 = collector.x_origin
+
+    # integer time series with uniform spacing: slopes are compared exactly, using cross products
+    cdef bint exact = False
+    if ts_t is np.int32_t or ts_t is np.int64_t:
+        exact = uniform
+
+    x_a = x0 + i if uniform else xs[i]
+    y_a = ts[i]
+
+    max_slope = -INFINITY
+    for d in range(1, right-i):
+        x_b = x0 + (i+d) if uniform else xs[i+d]
+        y_b = ts[i+d]
+        slope = NAN  # if not needed for the comparisons, computed later by the collector
+
+        if exact:
+            dy = <wide_int> ts[i+d] - <wide_int> ts[i]
+            visible = max_dx == 0 or dy * max_dx > max_dy * d
+        elif robust:
+            # orientation of the last visible node, this node and node `i`
+            if max_dx == 0:
+                visible = (y_b-y_a) == (y_b-y_a)  # not NaN
+            else:
+                visible = _orient2d(x_m, y_m, x_b, y_b, x_a, y_a) > 0
+        else:
+            slope = (y_b-y_a) / (x_b-x_a)
+            tol = max(ABS_TOL, REL_TOL * max(fabs(x_a), fabs(x_b), fabs(y_a), fabs(y_b)))
+            visible = _greater(slope, max_slope, tol)
 
-    def add_edge(uint i1, uint i2, double x1, double x2, double y1, double y2, double slope):
-        w = weight_func(x1, x2, y1, y2, slope)
+        if visible:
+            if i+d >= emit_from:
+                # note, single case works for both top_to_bottom and left_to_right orders
+                collector.add_edge(i, i+d, slope, 0)
 
-        if w <= min_weight or w >= max_weight:
-            return
+            max_slope = slope
+            max_dy = dy
+            max_dx = d
+            x_m = x_b
+            y_m = y_b
 
-        degrees_out[i1] += 1
-        degrees_in[i2] += 1
+    return 0
 
-        if not only_degrees:
-            if weighted > 0:
-                edges.append((i1, i2, w))
-            else:
-                edges.append((i1, i2))
 
+def _compute_graph(const ts_t[:] ts, const np.float64_t[:] xs, uint directed, bint robust, _EdgeCollector collector):
+    """
+    Computes the visibility graph of a time series
+    using a divide-and-conquer strategy.
+    """
+    cdef uint n = ts.size
+    cdef uint left, right, i
+
+    cdef cqueue[uint_pair] queue
+    queue.push(uint_pair(0, n))
 
     while not queue.empty():
         pair = queue.front()
         left, right = pair.first, pair.second
         queue.pop()
 
+        if left < right:
+            collector.step(right-left)
+
         if left+1 < right:
             i = _argmax(ts, left, right)
-            x_a = xs[i]
-            y_a = ts[i]
-
-            # sweep from i towards the left
-            max_slope = -INFINITY
-            for d in range(1, i-left+1):
-                x_b = xs[i-d]
-                y_b = ts[i-d]
-                slope = (y_b-y_a) / -(x_b-x_a)  # note: x-axis reversed because sweeping from left to right
-                tol = max(ABS_TOL, REL_TOL * max(fabs(x_a), fabs(x_b), fabs(y_a), fabs(y_b)))
-
-                if _greater(slope, max_slope, tol):
-                    if directed == _DIRECTED_TOP_TO_BOTTOM:
-                        add_edge(i, i-d, x_a, x_b, y_a, y_b, -slope)
-                    else:  # left_to_right
-                        add_edge(i-d, i, x_b, x_a, y_b, y_a, -slope)
-                    
-                    max_slope = slope
-                    
-
-            # sweep from i towards the right
-            max_slope = -INFINITY
-            for d in range(1, right-i):
-                x_b = xs[i+d]
-                y_b = ts[i+d]
-                slope = (y_b-y_a) / (x_b-x_a)
-                tol = max(ABS_TOL, REL_TOL * max(fabs(x_a), fabs(x_b), fabs(y_a), fabs(y_b)))
-
-                if _greater(slope, max_slope, tol):
-                    # note, single case works for both top_to_bottom and left_to_right orders
-                    add_edge(i, i+d, x_a, x_b, y_a, y_b, slope)
-
-                    max_slope = slope
+
+            _sweep_left(ts, xs, i, left, i, directed, robust, collector)
+            _sweep_right(ts, xs, i, right, i+1, robust, collector)
 
             queue.push(uint_pair(left, i))
             queue.push(uint_pair(i+1, right))
 
-    return edges, np.asarray(degrees_in, dtype=np.uint32), np.asarray(degrees_out, dtype=np.uint32)
+
+def _compute_cross_edges(const ts_t[:] ts, const np.float64_t[:] xs, uint directed, bint robust, uint boundary, _EdgeCollector collector):
+    """
+    Computes only the edges of the visibility graph of a time series that connect a node before `boundary`
+    with a node at or after `boundary`.
+
+    Follows the same divide-and-conquer strategy as `_compute_graph`, but only the intervals containing nodes
+    from both sides of the boundary are visited. These form a single chain (only one of the two sub-intervals
+    of a crossing interval can cross the boundary) and only one of the two sweeps of each of them can find crossing edges.
+    """
+    cdef uint left = 0
+    cdef uint right = ts.size
+    cdef uint i
+
+    while left < boundary < right:
+        collector.step(right-left)
+
+        i = _argmax(ts, left, right)
+
+        if i < boundary:
+            _sweep_right(ts, xs, i, right, boundary, robust, collector)
+            left = i+1
+        else:
+            _sweep_left(ts, xs, i, left, boundary, directed, robust, collector)
+            right = i
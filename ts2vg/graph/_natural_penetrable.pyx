@@ -4,9 +4,10 @@ cimport cython
 import numpy as np
 cimport numpy as np
 from libc.math cimport fabs, INFINITY, NAN, isnan
+from libc.stdlib cimport malloc, free
 
 from ts2vg.graph.base import _DIRECTED_OPTIONS, _WEIGHTED_OPTIONS
-from ts2vg.graph._base cimport _greater, _argmax, _argmin, _get_weight_func, weight_func_type
+from ts2vg.graph._base cimport ts_t, wide_int, _greater, _orient2d, _EdgeCollector
 
 ctypedef unsigned int uint
 
@@ -17,90 +18,260 @@ cdef uint _DIRECTED_TOP_TO_BOTTOM = _DIRECTED_OPTIONS['top_to_bottom']
 cdef uint _WEIGHTED_NUM_PENETRATIONS = _WEIGHTED_OPTIONS['num_penetrations']
 
 
+cdef struct _Fraction:
+    # slope as an exact fraction `dy / dx` (for integer time series with uniform spacing), `dx` is always positive
+    wide_int dy
+    wide_int dx
+
+
+cdef struct _Point:
+    # end point of the segment from the sweeping node (in robust mode)
+    double x
+    double y
+
+
+# Algorithm implementation comments (for the three `_sweep_*` functions below):
+# Let S be `penetrable_limit + 1`, we use an array of length S (`max_slopes`) to store
+# the S largest slopes seen so far (for each iteration of the outer loop).
+# If a new slope is larger than the current smallest slope in `max_slopes`, then the two nodes have visibility
+# with at most `penetrable_limit` obstructions between them and an edge should be added,
+# and `max_slopes` should be updated to include the new slope and to drop the new smallest slope of `max_slopes`.
+# Until S slopes have been seen (`n_slopes < S`), the smallest slope is minus infinity and every node is visible.
+#
+# We assume `penetrable_limit` is very small, so linear search to find the smallest value in `max_slopes`
+# is probably faster than using other advanced data structures like priority queues.
+#
+# The sweep is written once per way of comparing slopes (with a tolerance, exactly as fractions, or with the
+# orientation predicate), so that the innermost loop of each of them has no branches on the comparison mode.
+
+
 @cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.cdivision(True)
-def _compute_graph(np.float64_t[:] ts, np.float64_t[:] xs, uint directed, uint weighted, bint only_degrees, double min_weight, double max_weight, uint penetrable_limit):
-    """
-    Computes the limited penetrable visibility graph of a time series.
-    """
-
-    # Algorithm implementation comments:
-    # Let S be `penetrable_limit + 1`, we use an array of length S (`max_slopes`) to store
-    # the S largest slopes seen so far (for each iteration of the outer loop).
-    # If a new slope is larger than the current smallest slope in `max_slopes`, then the two nodes have visibility
-    # with at most `penetrable_limit` obstructions between them and an edge should be added,
-    # and `max_slopes` should be updated to include the new slope and to drop the new smallest slope of `max_slopes`.
-    #
-    # We assume `penetrable_limit` is very small, so linear search to find the smallest value in `max_slopes`
-    # is probably faster than using other advanced data structures like priority queues.
-
-    cdef uint n = ts.size
-    cdef list edges = []
-    cdef np.uint32_t[:] degrees_in = np.zeros(n, dtype=np.uint32)
-    cdef np.uint32_t[:] degrees_out = np.zeros(n, dtype=np.uint32)
-
-    cdef uint i_a, i_b
-    cdef double x_a, x_b, y_a, y_b
-    cdef double slope, w
-    cdef np.float64_t[:] max_slopes = np.full(penetrable_limit+1, -INFINITY, dtype=np.float64)
+cdef inline int _sweep_tolerance(const ts_t[:] ts, const np.float64_t[:] xs, uint i_a, uint stop, uint directed, uint weighted, uint S, double* max_slopes, _EdgeCollector collector) except -1:
+    """Sweep of `_sweep`, comparing the slopes (as floats) with a relative tolerance."""
+    cdef uint i_b, j
+    cdef uint n_slopes = 0
     cdef uint threshold_slope_idx = 0
-    cdef double threshold_slope = -INFINITY
+    cdef double x_a, x_b, y_a, y_b, x0 = collector.x_origin
+    cdef double slope, w, tol
+    cdef bint uniform = xs is None
+    cdef bint visible
+
+    x_a = x0 + i_a if uniform else xs[i_a]
+    y_a = ts[i_a]
 
-    cdef weight_func_type weight_func = _get_weight_func(weighted)
+    for i_b in range(i_a+1, stop):
+        x_b = x0 + i_b if uniform else xs[i_b]
+        y_b = ts[i_b]
+        slope = (y_b-y_a) / (x_b-x_a)
+        tol = max(ABS_TOL, REL_TOL * max(fabs(x_a), fabs(x_b), fabs(y_a), fabs(y_b)))
 
-    def add_edge(uint i1, uint i2, double x1, double x2, double y1, double y2, double slope, double known_w):
-        if isnan(known_w):
-            w = weight_func(x1, x2, y1, y2, slope)
+        if n_slopes < S:
+            visible = slope == slope  # not NaN
         else:
-            w = known_w
+            visible = _greater(slope, max_slopes[threshold_slope_idx], tol)
 
-        if w <= min_weight or w >= max_weight:
-            return
+        if visible:
+            w = 0.0
+            if weighted == _WEIGHTED_NUM_PENETRATIONS:
+                # count number of penetrations (other weights are computed later by the collector)
+                for j in range(n_slopes):
+                    if not _greater(slope, max_slopes[j], tol):
+                        w += 1.0
 
-        degrees_out[i1] += 1
-        degrees_in[i2] += 1
+            if directed == _DIRECTED_TOP_TO_BOTTOM and (y_b > y_a):
+                collector.add_edge(i_b, i_a, slope, w)
+            else:  # left_to_right
+                collector.add_edge(i_a, i_b, slope, w)
 
-        if not only_degrees:
-            if weighted > 0:
-                edges.append((i1, i2, w))
+            if n_slopes < S:
+                max_slopes[n_slopes] = slope
+                n_slopes += 1
             else:
-                edges.append((i1, i2))
-
-    for i_a in range(n-1):
-        x_a = xs[i_a]
-        y_a = ts[i_a]
-
-        # sweep from i towards the right
-        threshold_slope = -INFINITY
-        max_slopes[:] = -INFINITY
-        for i_b in range(i_a+1, n):
-            x_b = xs[i_b]
-            y_b = ts[i_b]
-            slope = (y_b-y_a) / (x_b-x_a)
-            tol = max(ABS_TOL, REL_TOL * max(fabs(x_a), fabs(x_b), fabs(y_a), fabs(y_b)))
-
-            if _greater(slope, threshold_slope, tol):
-                if weighted == _WEIGHTED_NUM_PENETRATIONS:
-                    # count number of penetrations
-                    w = 0.0
-                    for j in range(penetrable_limit+1):
-                        if not _greater(slope, max_slopes[j], tol):
-                            w += 1.0
-                else:
-                    # weight will be computed later by weight_func
-                    w = NAN
-
-                if directed == _DIRECTED_TOP_TO_BOTTOM and (y_b > y_a):
-                    add_edge(i_b, i_a, x_b, x_a, y_b, y_a, slope, w)
-                else:  # left_to_right
-                    add_edge(i_a, i_b, x_a, x_b, y_a, y_b, slope, w)
-
                 # drop the old smallest value in `max_slopes` and replace it with the new slope.
                 max_slopes[threshold_slope_idx] = slope
 
+            if n_slopes == S:
                 # new threshold slope is the new smallest value in `max_slopes`.
-                threshold_slope_idx = _argmin(max_slopes, 0, penetrable_limit+1)
-                threshold_slope = max_slopes[threshold_slope_idx]
+                threshold_slope_idx = 0
+                for j in range(1, S):
+                    if max_slopes[j] < max_slopes[threshold_slope_idx]:
+                        threshold_slope_idx = j
+
+    return 0
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline int _sweep_exact(const ts_t[:] ts, uint i_a, uint stop, uint directed, uint weighted, uint S, _Fraction* max_slopes, _EdgeCollector collector) except -1:
+    """Sweep of `_sweep` for integer time series with uniform spacing, comparing the slopes exactly with cross products."""
+    cdef uint i_b, j
+    cdef uint n_slopes = 0
+    cdef uint threshold_slope_idx = 0
+    cdef double w
+    cdef _Fraction slope
+    cdef bint visible
+
+    for i_b in range(i_a+1, stop):
+        slope.dy = <wide_int> ts[i_b] - <wide_int> ts[i_a]
+        slope.dx = i_b - i_a
+
+        if n_slopes < S:
+            visible = True
+        else:
+            visible = slope.dy * max_slopes[threshold_slope_idx].dx > max_slopes[threshold_slope_idx].dy * slope.dx
+
+        if visible:
+            w = 0.0
+            if weighted == _WEIGHTED_NUM_PENETRATIONS:
+                for j in range(n_slopes):
+                    if not slope.dy * max_slopes[j].dx > max_slopes[j].dy * slope.dx:
+                        w += 1.0
+
+            # the slopes of the edges are computed later by the collector, if needed
+            if directed == _DIRECTED_TOP_TO_BOTTOM and (ts[i_b] > ts[i_a]):
+                collector.add_edge(i_b, i_a, NAN, w)
+            else:  # left_to_right
+                collector.add_edge(i_a, i_b, NAN, w)
+
+            if n_slopes < S:
+                max_slopes[n_slopes] = slope
+                n_slopes += 1
+            else:
+                max_slopes[threshold_slope_idx] = slope
+
+            if n_slopes == S:
+                threshold_slope_idx = 0
+                for j in range(1, S):
+                    if max_slopes[j].dy * max_slopes[threshold_slope_idx].dx < max_slopes[threshold_slope_idx].dy * max_slopes[j].dx:
+                        threshold_slope_idx = j
+
+    return 0
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline int _sweep_robust(const ts_t[:] ts, const np.float64_t[:] xs, uint i_a, uint stop, uint directed, uint weighted, uint S, _Point* max_slopes, _EdgeCollector collector) except -1:
+    """
+    Sweep of `_sweep`, comparing the slopes with the orientation predicate:
+    the slope to `b` is greater than the slope to `m` if `m`, `b` and node `i_a` (on their left) are counterclockwise.
+    """
+    cdef uint i_b, j
+    cdef uint n_slopes = 0
+    cdef uint threshold_slope_idx = 0
+    cdef double x_a, y_a, x0 = collector.x_origin
+    cdef double w
+    cdef _Point b
+    cdef bint uniform = xs is None
+    cdef bint visible
+
+    x_a = x0 + i_a if uniform else xs[i_a]
+    y_a = ts[i_a]
+
+    for i_b in range(i_a+1, stop):
+        b.x = x0 + i_b if uniform else xs[i_b]
+        b.y = ts[i_b]
+
+        if n_slopes < S:
+            visible = (b.y-y_a) == (b.y-y_a)  # not NaN
+        else:
+            visible = _orient2d(max_slopes[threshold_slope_idx].x, max_slopes[threshold_slope_idx].y, b.x, b.y, x_a, y_a) > 0
+
+        if visible:
+            w = 0.0
+            if weighted == _WEIGHTED_NUM_PENETRATIONS:
+                for j in range(n_slopes):
+                    if not _orient2d(max_slopes[j].x, max_slopes[j].y, b.x, b.y, x_a, y_a) > 0:
+                        w += 1.0
+
+            # the slopes of the edges are computed later by the collector, if needed
+            if directed == _DIRECTED_TOP_TO_BOTTOM and (b.y > y_a):
+                collector.add_edge(i_b, i_a, NAN, w)
+            else:  # left_to_right
+                collector.add_edge(i_a, i_b, NAN, w)
+
+            if n_slopes < S:
+                max_slopes[n_slopes] = b
+                n_slopes += 1
+            else:
+                max_slopes[threshold_slope_idx] = b
+
+            if n_slopes == S:
+                threshold_slope_idx = 0
+                for j in range(1, S):
+                    if _orient2d(max_slopes[threshold_slope_idx].x, max_slopes[threshold_slope_idx].y, max_slopes[j].x, max_slopes[j].y, x_a, y_a) < 0:
+                        threshold_slope_idx = j
+
+    return 0
+
+
+cdef long long _sweep(const ts_t[:] ts, const np.float64_t[:] xs, uint i_a, uint stop, uint directed, uint weighted, uint penetrable_limit, bint robust, void* max_slopes, _EdgeCollector collector) except -1:
+    """
+    Adds the edges between node `i_a` and the nodes to its right, up to node `stop` (non inclusive).
+    `max_slopes` is a buffer for `penetrable_limit + 1` slopes (see `_slopes_buffer`).
+    Returns the number of nodes visited.
+    """
+    cdef uint S = penetrable_limit + 1
+
+    if (ts_t is np.int32_t or ts_t is np.int64_t) and xs is None:
+        # integer time series with uniform spacing: slopes are compared exactly, using cross products
+        _sweep_exact(ts, i_a, stop, directed, weighted, S, <_Fraction*> max_slopes, collector)
+    elif robust:
+        _sweep_robust(ts, xs, i_a, stop, directed, weighted, S, <_Point*> max_slopes, collector)
+    else:
+        _sweep_tolerance(ts, xs, i_a, stop, directed, weighted, S, <double*> max_slopes, collector)
+
+    return <long long> max(stop, i_a + 1) - i_a - 1
+
+
+cdef void* _slopes_buffer(uint penetrable_limit) except NULL:
+    """Allocates a buffer for the `penetrable_limit + 1` slopes of `_sweep`, in any of the representations."""
+    cdef void* buffer = malloc((penetrable_limit+1) * max(sizeof(_Fraction), sizeof(_Point), sizeof(double)))
+
+    if buffer == NULL:
+        raise MemoryError()
+
+    return buffer
+
+
+def _compute_graph(const ts_t[:] ts, const np.float64_t[:] xs, uint directed, uint weighted, uint penetrable_limit, bint robust, _EdgeCollector collector):
+    """
+    Computes the limited penetrable visibility graph of a time series.
+    """
+    cdef uint n = ts.size
+    cdef uint i_a
+    cdef void* max_slopes = _slopes_buffer(penetrable_limit)
+
+    try:
+        for i_a in range(n-1):
+            collector.step(_sweep(ts, xs, i_a, n, directed, weighted, penetrable_limit, robust, max_slopes, collector))
+    finally:
+        free(max_slopes)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _count_sweeps(const ts_t[:] ts, const np.float64_t[:] xs, uint directed, uint weighted, uint penetrable_limit, bint robust, np.uint32_t[:] sources, uint horizon, _EdgeCollector collector):
+    """
+    Counts the edges between each of the `sources` nodes and the (at most `horizon`) nodes to their right.
+
+    With `penetrable_limit` 0 this is also a valid (quadratic) algorithm for the regular visibility graph,
+    used to estimate graph sizes from a sample of nodes.
+    """
+    cdef uint n = ts.size
+    cdef Py_ssize_t k
+    cdef unsigned long long before
+    cdef np.uint64_t[:] counts = np.zeros(sources.shape[0], dtype=np.uint64)
+    cdef void* max_slopes = _slopes_buffer(penetrable_limit)
+
+    try:
+        for k in range(sources.shape[0]):
+            before = collector.n_edges
+            _sweep(ts, xs, sources[k], min(<unsigned long long>sources[k] + horizon + 1, n), directed, weighted, penetrable_limit, robust, max_slopes, collector)
+            collector.flush_weights()
+            counts[k] = collector.n_edges - before
+    finally:
+        free(max_slopes)
 
-    return edges, np.asarray(degrees_in, dtype=np.uint32), np.asarray(degrees_out, dtype=np.uint32)
+    return np.asarray(counts)
@@ -1,6 +1,19 @@
+import asyncio
+import ctypes
+import json
+import queue
+import threading
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
 import numpy as np
-from typing import Optional
+from pathlib import Path
+from typing import Callable, Optional
 
+from ts2vg.graph._metrics import _csr
+from ts2vg.graph.cache import GraphCache, content_key
+from ts2vg.graph.storage import EdgeFilesWriter, create_npy, open_npy, save_npy, write_npy_chunked
 from ts2vg.graph.summary import simple_summary
 
 _DIRECTED_OPTIONS = {
@@ -24,6 +37,88 @@ _WEIGHTED_OPTIONS = {
     "num_penetrations": 11,
 }
 
+# functions computing the weights of the edges, vectorized over arrays of edges,
+# from the coordinates of their nodes (x_a, y_a) and (x_b, y_b) and the slope between them.
+# 'num_penetrations' weights are counted by the algorithms and not listed here
+_WEIGHT_FUNCS = {
+    "distance": lambda x_a, x_b, y_a, y_b, slope: np.sqrt((x_b - x_a) * (x_b - x_a) + (y_b - y_a) * (y_b - y_a)),
+    "sq_distance": lambda x_a, x_b, y_a, y_b, slope: (x_b - x_a) * (x_b - x_a) + (y_b - y_a) * (y_b - y_a),
+    "v_distance": lambda x_a, x_b, y_a, y_b, slope: y_b - y_a,
+    "abs_v_distance": lambda x_a, x_b, y_a, y_b, slope: np.abs(y_b - y_a),
+    "h_distance": lambda x_a, x_b, y_a, y_b, slope: x_b - x_a,
+    "abs_h_distance": lambda x_a, x_b, y_a, y_b, slope: np.abs(x_b - x_a),
+    "slope": lambda x_a, x_b, y_a, y_b, slope: slope,
+    "abs_slope": lambda x_a, x_b, y_a, y_b, slope: np.abs(slope),
+    "angle": lambda x_a, x_b, y_a, y_b, slope: np.arctan(slope),
+    "abs_angle": lambda x_a, x_b, y_a, y_b, slope: np.arctan(np.abs(slope)),
+}
+
+# internal 'weighted' value of graphs with a user-defined weight function
+_WEIGHTED_CUSTOM = max(_WEIGHTED_OPTIONS.values()) + 1
+
+_WEIGHT_FUNC_SIGNATURE = "double (double, double, double, double, double)"
+
+# ctypes type of the compiled weight functions
+_WEIGHT_FUNC_TYPE = ctypes.CFUNCTYPE(ctypes.c_double, *[ctypes.c_double] * 5)
+
+
+def _function_pointer_address(func) -> int:
+    """
+    Return the address of a compiled weight function given as a ctypes function pointer of type
+    ``ctypes.CFUNCTYPE(ctypes.c_double, *[ctypes.c_double] * 5)`` or as a PyCapsule named with the signature of the
+    function (e.g. from the ``__pyx_capi__`` of a Cython module). Return ``0`` if ``func`` is a Python callable.
+    Raise ``TypeError`` for any other object, including function pointers of other types.
+    """
+    if isinstance(func, _WEIGHT_FUNC_TYPE):
+        # `restype` and `argtypes` can still be overridden in the instance
+        if func.restype is not ctypes.c_double or tuple(func.argtypes) != (ctypes.c_double,) * 5:
+            raise TypeError(f"Weight function pointer must have signature '{_WEIGHT_FUNC_SIGNATURE}'.")
+
+        address = ctypes.cast(func, ctypes.c_void_p).value
+
+        if not address:
+            raise TypeError("Weight function pointer is null.")
+
+        return address
+
+    if hasattr(func, "restype") and hasattr(func, "argtypes"):
+        # any other ctypes function pointer (with another signature, calling convention or flags)
+        raise TypeError(
+            f"Weight function pointer must have signature '{_WEIGHT_FUNC_SIGNATURE}' "
+            "and be created with 'ctypes.CFUNCTYPE(ctypes.c_double, *[ctypes.c_double] * 5)'."
+        )
+
+    if type(func).__name__ == "PyCapsule":
+        get_name = ctypes.pythonapi.PyCapsule_GetName
+        get_name.restype = ctypes.c_char_p
+        get_name.argtypes = [ctypes.py_object]
+
+        get_pointer = ctypes.pythonapi.PyCapsule_GetPointer
+        get_pointer.restype = ctypes.c_void_p
+        get_pointer.argtypes = [ctypes.py_object, ctypes.c_char_p]
+
+        name = get_name(func)
+
+        if name is None or name.decode() != _WEIGHT_FUNC_SIGNATURE:
+            raise TypeError(
+                f"Weight function capsule must be named with its signature '{_WEIGHT_FUNC_SIGNATURE}' "
+                f"(got {name.decode() if name is not None else None!r})."
+            )
+
+        return get_pointer(func, name)
+
+    if not callable(func):
+        raise TypeError(
+            f"Invalid 'weighted' parameter: {func!r}. Must be a string, a callable or a compiled function pointer."
+        )
+
+    return 0
+
+
+# dtypes of the time series supported by the kernels without conversion,
+# other integer types are converted to 'int64' and anything else to 'float64'
+_TS_DTYPES = (np.dtype(np.float32), np.dtype(np.float64), np.dtype(np.int32), np.dtype(np.int64))
+
 
 class NotBuiltError(Exception):
     """
@@ -32,6 +127,63 @@ class NotBuiltError(Exception):
     """
 
 
+class BudgetExceededError(Exception):
+    """
+    Exception class to raise when building a graph exceeds the ``max_edges`` or ``max_memory`` budget
+    passed to :meth:`VG.build`.
+
+    The build is aborted as soon as the budget is exceeded,
+    the partial statistics gathered up to that point are available as attributes of the exception.
+    """
+
+    def __init__(self, message, n_edges, max_edges, degrees_in=None, degrees_out=None, memory=None, max_memory=None):
+        super().__init__(message)
+
+        self.n_edges = n_edges
+        """Number of edges found before aborting the build."""
+
+        self.max_edges = max_edges
+        """Maximum number of edges allowed by the ``max_edges`` budget (``None`` if not set)."""
+
+        self.memory = memory
+        """Estimated memory (in bytes) of the graph when aborting the build (``None`` if ``max_memory`` was not set)."""
+
+        self.max_memory = max_memory
+        """Maximum memory (in bytes) allowed by the ``max_memory`` budget (``None`` if not set)."""
+
+        self.degrees_in = degrees_in
+        """Partial in-degrees of the nodes before aborting the build (``None`` if degrees were not being computed)."""
+
+        self.degrees_out = degrees_out
+        """Partial out-degrees of the nodes before aborting the build (``None`` if degrees were not being computed)."""
+
+
+class BuildCancelledError(Exception):
+    """
+    Exception class to raise when a graph build is cancelled through the ``cancel`` parameter of :meth:`VG.build`.
+    """
+
+    def __init__(self, message, n_processed, n_edges):
+        super().__init__(message)
+
+        self.n_processed = n_processed
+        """Number of nodes processed before aborting the build."""
+
+        self.n_edges = n_edges
+        """Number of edges found before aborting the build."""
+
+
+class BuildTimeoutError(BuildCancelledError, TimeoutError):
+    """
+    Exception class to raise when a graph build exceeds the ``timeout`` passed to :meth:`VG.build`.
+    """
+
+
+def _build(graph, ts, xs, kwargs):
+    # module level function, so that it can be sent to a process pool
+    return graph.build(ts, xs, **kwargs)
+
+
 class VG:
     """
     Abstract class for a visibility graph (VG).
@@ -43,6 +195,9 @@ class VG:
 
     _general_type_name = "Visibility Graph"
 
+    # names of the parameters of the constructor, see `_params`
+    _PARAM_NAMES = ("directed", "weighted", "min_weight", "max_weight", "penetrable_limit")
+
     def __init__(
         self,
         *,
@@ -55,14 +210,21 @@ class VG:
         self.ts = None
         """1D array of the time series. ``None`` if the graph has not been built yet."""
 
-        self.xs = None
-        """1D array of the X coordinates of the time series. ``None`` if the graph has not been built yet."""
-
+        self._xs = None
         self._m = None
         self._edges = None
+        self._sources = None
+        self._targets = None
+        self._weights = None
         self._degrees = None
         self._degrees_in = None
         self._degrees_out = None
+        self._strengths_in = None
+        self._strengths_out = None
+        self._weights_min = None
+        self._weights_max = None
+        self._csr = None
+        self._degree_counts = None
 
         if directed not in _DIRECTED_OPTIONS:
             raise ValueError(
@@ -73,14 +235,19 @@ class VG:
         """`str` indicating the strategy used for the edge directions (same as passed to the constructor). ``None`` if the graph is undirected."""
         self._directed = _DIRECTED_OPTIONS[directed]
 
-        if weighted not in _WEIGHTED_OPTIONS:
+        if weighted is not None and not isinstance(weighted, str):
+            # validates compiled function pointers and raises for anything else that is not callable
+            _function_pointer_address(weighted)
+            self._weighted = _WEIGHTED_CUSTOM
+        elif weighted in _WEIGHTED_OPTIONS:
+            self._weighted = _WEIGHTED_OPTIONS[weighted]
+        else:
             raise ValueError(
-                f"Invalid 'weighted' parameter: {weighted}. Must be one of {list(_WEIGHTED_OPTIONS.keys())}."
+                f"Invalid 'weighted' parameter: {weighted}. Must be one of {list(_WEIGHTED_OPTIONS.keys())} or a function."
             )
 
         self.weighted = weighted
-        """`str` indicating the strategy used for the edge weights (same as passed to the constructor). ``None`` if the graph is unweighted."""
-        self._weighted = _WEIGHTED_OPTIONS[weighted]
+        """`str` or function indicating the strategy used for the edge weights (same as passed to the constructor). ``None`` if the graph is unweighted."""
 
         if weighted is None and min_weight is not None:
             raise ValueError("'min_weight' can only be used in weighted graphs.")
@@ -97,11 +264,169 @@ class VG:
 
         self.penetrable_limit = penetrable_limit
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+
+        # store the edges as contiguous arrays instead of a list of tuples,
+        # these (and the other arrays) are pickled as out-of-band buffers with pickle protocol 5
+        if self._edges is not None or self._sources is not None:
+            sources, targets, weights = self._edge_columns()
+
+            state["_edges"] = None
+            state["_sources"] = np.ascontiguousarray(sources, dtype=np.uint32)
+            state["_targets"] = np.ascontiguousarray(targets, dtype=np.uint32)
+            state["_weights"] = None if weights is None else np.ascontiguousarray(weights, dtype=np.float64)
+
+        # derived from the edges, recomputed when needed
+        state["_csr"] = None
+
+        for key, value in state.items():
+            if isinstance(value, np.memmap):
+                # pickled as a regular array, but without copying
+                state[key] = np.asarray(value)
+
+        return state
+
+    def __setstate__(self, state):
+        type(self).__init__(self, **{name: state[name] for name in self._PARAM_NAMES if name in state})
+
+        if "xs" in state:
+            # pickled by a version where 'xs' was a plain attribute
+            state = dict(state, _xs=state["xs"])
+            del state["xs"]
+
+        self.__dict__.update(state)
+
+    @staticmethod
+    def _ts_dtype(dtype):
+        """Dtype in which the kernels process a time series of the given dtype."""
+        if dtype in _TS_DTYPES:
+            return dtype
+
+        if dtype.kind in "biu" and np.can_cast(dtype, np.int64):
+            return np.dtype(np.int64)
+
+        return np.dtype(np.float64)
+
+    @staticmethod
+    def _as_dtype(arr, dtype, path=None, chunk_size: int = 1 << 20):
+        if arr.dtype == dtype:
+            return arr
+
+        if path is None:
+            return arr.astype(dtype)
+
+        return write_npy_chunked(path, len(arr), dtype, lambda start, stop: arr[start:stop], chunk_size)
+
+    @staticmethod
+    def _prepare_input(ts, xs, out_dir=None, chunk_size: int = 1 << 20):
+        ts = np.asarray(ts)
+
+        if ts.ndim != 1:
+            raise ValueError("Input time series must be one-dimensional.")
+
+        if len(ts) >= 2**32:
+            raise ValueError(f"Input time series is too long ({len(ts)}), at most 2**32 - 1 values are supported.")
+
+        ts = VG._as_dtype(ts, VG._ts_dtype(ts.dtype), None if out_dir is None else out_dir / "ts.npy", chunk_size)
+
+        if xs is not None:
+            if len(xs) != len(ts):
+                raise ValueError(f"Length of 'xs' ({len(xs)}) does not match length of 'ts' ({len(ts)}).")
+
+            xs = np.asarray(xs)
+
+            if xs.ndim != 1:
+                raise ValueError("Input 'xs' series must be one-dimensional.")
+
+            xs = VG._as_dtype(xs, np.dtype(np.float64), None if out_dir is None else out_dir / "xs.npy", chunk_size)
+
+            for start in range(0, len(xs), chunk_size):
+                if np.any(np.diff(xs[start : start + chunk_size + 1]) <= 0):
+                    raise ValueError("Input 'xs' series must be monotonically increasing.")
+
+        return ts, xs
+
+    def _params(self) -> dict:
+        """Return the parameters of the graph, as passed to the constructor."""
+        return {name: getattr(self, name) for name in self._PARAM_NAMES}
+
+    def _empty_copy(self):
+        """Return a new (not built) graph instance with the same parameters."""
+        return type(self)(**self._params())
+
+    def _make_collector(self, ts, xs, **kwargs):
+        # imported here to avoid a circular import, the compiled module depends on the options defined above
+        from ts2vg.graph._base import _EdgeCollector
+
+        if self._weighted == _WEIGHTED_CUSTOM:
+            weight_func_address = _function_pointer_address(self.weighted)
+            weight_func = None if weight_func_address else self.weighted
+        else:
+            weight_func_address = 0
+            weight_func = _WEIGHT_FUNCS.get(self.weighted)
+
+        return _EdgeCollector(
+            ts,
+            xs,
+            self._weighted,
+            weight_func,
+            weight_func_address,
+            self.min_weight if self.min_weight is not None else float("-inf"),
+            self.max_weight if self.max_weight is not None else float("inf"),
+            **kwargs,
+        )
+
+    def _set_columnar(self, ts, xs, sources, targets, weights=None, degrees_in=None, degrees_out=None):
+        """Set the graph as built from columnar edge arrays, computing the degrees if not provided."""
+        n = len(ts)
+
+        if degrees_in is None:
+            degrees_in = np.bincount(targets, minlength=n).astype(np.uint32)
+
+        if degrees_out is None:
+            degrees_out = np.bincount(sources, minlength=n).astype(np.uint32)
+
+        self.ts = ts
+        self.xs = xs
+        self._m = None
+        self._edges = None
+        self._sources = sources
+        self._targets = targets
+        self._weights = weights if self.is_weighted else None
+        self._degrees_in = degrees_in
+        self._degrees_out = degrees_out
+        self._degrees = degrees_in + degrees_out
+        self._strengths_in = None
+        self._strengths_out = None
+        self._weights_min = None
+        self._weights_max = None
+        self._csr = None
+        self._degree_counts = None
+
+        return self
+
     def _validate_is_built(self):
-        if self._edges is None:
+        if self._edges is None and self._sources is None:
             raise NotBuiltError("Cannot access graph edges, use 'build' first.")
 
-    def build(self, ts, xs=None, only_degrees: bool = False):
+    def build(
+        self,
+        ts,
+        xs=None,
+        only_degrees: bool = False,
+        only_node_stats: bool = False,
+        max_edges: Optional[int] = None,
+        max_memory: Optional[int] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+        progress_every: Optional[int] = None,
+        timeout: Optional[float] = None,
+        cancel=None,
+        out_dir=None,
+        sink: Optional[Callable] = None,
+        cache=None,
+        chunk_size: int = 1 << 20,
+    ):
         """
         Compute and build the visibility graph for the given time series.
 
@@ -110,6 +435,11 @@ class VG:
         ts : 1D array like
             Input time series.
 
+            ``float32``, ``float64``, ``int32`` and ``int64`` arrays are processed in their own type, without copies.
+            Other integer types are converted to ``int64`` and anything else to ``float64``.
+            For integer time series without ``xs``, visibility is decided exactly (with integer cross products)
+            instead of comparing floating point slopes with a small tolerance.
+
         xs : 1D array like, optional
             X coordinates for the time series.
             Length of ``xs`` must match length of ``ts``.
@@ -120,47 +450,653 @@ class VG:
             If ``True`` only compute the graph degrees, otherwise compute the whole graph.
             Default ``False``.
 
+        only_node_stats : bool
+            If ``True`` only compute the graph degrees and the per-node weight statistics
+            (:attr:`strengths`, :attr:`weights_min`, :attr:`weights_max`, :attr:`weights_mean`),
+            otherwise compute the whole graph.
+            The edges are never stored, so memory usage is linear in the length of the time series.
+            Only supported for weighted graphs.
+            Default ``False``.
+
+        max_edges : int, optional
+            If provided, abort the build by raising :class:`BudgetExceededError`
+            as soon as the graph would have more than ``max_edges`` edges.
+
+        max_memory : int, optional
+            If provided, abort the build by raising :class:`BudgetExceededError`
+            as soon as the memory used by the graph would exceed approximately ``max_memory`` bytes
+            (see :meth:`estimate_memory`).
+            The estimated memory at that point is reported in the ``memory`` attribute of the exception.
+
+        progress : callable, optional
+            If provided, called periodically during the build as ``progress(n_processed, n_total)``
+            with the number of nodes processed so far and the total number of nodes.
+            It is always called a last time once the build finishes.
+            Exceptions raised by the callback abort the build.
+
+        progress_every : int, optional
+            Number of processed nodes between consecutive calls to ``progress``.
+            Default is 1% of the nodes.
+
+        timeout : float, optional
+            If provided, abort the build by raising :class:`BuildTimeoutError`
+            if it takes longer than ``timeout`` seconds.
+
+        cancel : threading.Event, optional
+            If provided, abort the build by raising :class:`BuildCancelledError`
+            as soon as ``cancel.is_set()`` returns ``True`` (e.g. after calling ``cancel.set()`` from another thread).
+            Any object with an ``is_set()`` method can be used.
+
+        out_dir : str or Path, optional
+            If provided, build the graph out-of-core, for time series (and graphs) larger than the available memory.
+            The edges are written to disk in blocks of ``chunk_size`` edges as they are found,
+            and the degrees are computed directly on disk.
+            Inputs that need to be converted (see ``ts``) are also written to disk, in chunks.
+            After the build, all these arrays are memory-mapped from ``.npy`` files in ``out_dir``
+            (``ts.npy``, ``xs.npy``, ``sources.npy``, ``targets.npy``, ``weights.npy``,
+            ``degrees.npy``, ``degrees_in.npy``, ``degrees_out.npy``).
+
+            Inputs given as arrays of a supported type (for example a read-only ``numpy.memmap``) are used directly, without copies.
+
+        sink : callable, optional
+            If provided, the edges are not stored in the graph, but passed in blocks of up to ``chunk_size`` edges
+            to ``sink(sources, targets, weights)`` as they are found,
+            where ``sources`` and ``targets`` are ``uint32`` arrays and ``weights`` a ``float64`` array (``None`` if unweighted).
+            The arrays are reused between calls, ``sink`` must copy them if needed.
+            Only the degrees are kept in the graph (as with ``only_degrees``), so memory usage is linear in the length of the time series.
+            See also :meth:`iter_edges`.
+
+        cache : GraphCache, str or Path, optional
+            If provided, a :class:`ts2vg.graph.cache.GraphCache` (or the directory of one) where the graph is looked up
+            by a hash of the input time series and the graph parameters before building it, and stored after building it.
+            Graphs found in the cache are loaded memory-mapped (see :meth:`load`).
+            Cannot be used with ``only_node_stats``, ``out_dir`` or ``sink``, nor with custom weight functions.
+
+        chunk_size : int
+            Number of values per chunk when building with ``out_dir`` or ``sink``.
+            Default ``2**20``.
+
         Returns
         -------
             self
         """
-        self.ts = np.asarray(ts, dtype=np.float64)
+        if only_degrees and self.is_weighted:
+            raise ValueError("Building with 'only_degrees' is only supported for unweighted graphs.")
 
-        if self.ts.ndim != 1:
-            raise ValueError("Input time series must be one-dimensional.")
+        if only_node_stats and not self.is_weighted:
+            raise ValueError("Building with 'only_node_stats' is only supported for weighted graphs.")
+
+        if only_degrees and only_node_stats:
+            raise ValueError("'only_degrees' and 'only_node_stats' cannot be used at the same time.")
+
+        if sink is not None and out_dir is not None:
+            raise ValueError("'sink' and 'out_dir' cannot be used at the same time.")
+
+        if cache is not None and (only_node_stats or out_dir is not None or sink is not None):
+            raise ValueError("'cache' cannot be used with 'only_node_stats', 'out_dir' or 'sink'.")
+
+        if cache is not None and self._weighted == _WEIGHTED_CUSTOM:
+            raise ValueError("'cache' cannot be used with custom weight functions.")
 
-        if xs is None:
-            self.xs = np.arange(len(ts), dtype=np.float64)
+        if max_edges is not None and max_edges < 0:
+            raise ValueError(f"'max_edges' cannot be negative (got {max_edges}).")
+
+        if out_dir is not None:
+            out_dir = Path(out_dir)
+            out_dir.mkdir(parents=True, exist_ok=True)
+
+        ts_in, xs_in = ts, xs
+        ts, xs = self._prepare_input(ts, xs, out_dir, chunk_size)
+
+        if cache is not None:
+            if not isinstance(cache, GraphCache):
+                cache = GraphCache(cache)
+
+            cache_key = self._cache_key(ts, xs, only_degrees)
+            cache_path = cache.get(cache_key)
+
+            if cache_path is not None:
+                self.__dict__.update(type(self).load(cache_path).__dict__)
+                return self
+
+        if max_memory is not None:
+            bytes_per_node, bytes_per_edge = self._memory_model(
+                ts_in, xs_in, only_degrees or sink is not None, only_node_stats, out_dir is not None
+            )
+            nodes_memory = len(ts) * bytes_per_node
+
+            if nodes_memory > max_memory:
+                raise BudgetExceededError(
+                    f"Memory needed for {len(ts)} nodes ({nodes_memory} bytes) exceeds 'max_memory' ({max_memory} bytes).",
+                    n_edges=0,
+                    max_edges=max_edges,
+                    memory=nodes_memory,
+                    max_memory=max_memory,
+                )
+
+        # the memory budget is enforced as a number of edges, the tighter of the two limits is given to the collector
+        collector_max_edges = max_edges
+        memory_bound = False
+
+        if max_memory is not None and bytes_per_edge > 0:
+            memory_max_edges = (max_memory - nodes_memory) // bytes_per_edge
+
+            if max_edges is None or memory_max_edges < max_edges:
+                collector_max_edges = memory_max_edges
+                memory_bound = True
+
+        edges_writer = sink
+        degrees_in = None
+        degrees_out = None
+
+        if out_dir is not None:
+            if not (only_degrees or only_node_stats):
+                edges_writer = EdgeFilesWriter(out_dir, self.is_weighted)
+
+            degrees_in = create_npy(out_dir / "degrees_in.npy", np.uint32, len(ts))
+            degrees_out = create_npy(out_dir / "degrees_out.npy", np.uint32, len(ts))
+
+        collector = self._make_collector(
+            ts,
+            xs,
+            store_edges=not (only_degrees or only_node_stats or edges_writer is not None),
+            node_stats=only_node_stats,
+            degrees_in=degrees_in,
+            degrees_out=degrees_out,
+            sink=edges_writer,
+            chunk_size=chunk_size,
+            max_edges=collector_max_edges,
+            progress=progress,
+            progress_every=progress_every,
+            timeout=timeout,
+            cancel=cancel,
+        )
+
+        try:
+            if len(ts) > 0:
+                self._compute_graph(ts, xs, collector)
+
+            collector.finish()
+        except BudgetExceededError as e:
+            if not memory_bound:
+                if max_memory is not None:
+                    e.memory = nodes_memory + e.n_edges * bytes_per_edge
+                    e.max_memory = max_memory
+
+                raise
+
+            memory = nodes_memory + (e.n_edges + 1) * bytes_per_edge
+
+            raise BudgetExceededError(
+                f"Memory needed for the graph (at least {memory} bytes) exceeds 'max_memory' ({max_memory} bytes).",
+                n_edges=e.n_edges,
+                max_edges=max_edges,
+                degrees_in=e.degrees_in,
+                degrees_out=e.degrees_out,
+                memory=memory,
+                max_memory=max_memory,
+            ) from None
+        finally:
+            if out_dir is not None and edges_writer is not None:
+                edges_writer.close()
+
+        self.ts = ts
+        self.xs = xs
+        self._m = None
+        self._edges = collector.edges
+        self._sources = None
+        self._targets = None
+        self._weights = None
+
+        if out_dir is None:
+            self._degrees_in = collector.degrees_in
+            self._degrees_out = collector.degrees_out
+            self._degrees = self._degrees_in + self._degrees_out
         else:
-            if len(xs) != len(self.ts):
-                raise ValueError(f"Length of 'xs' ({len(xs)}) does not match length of 'ts' ({len(self.ts)}).")
+            degrees_in.flush()
+            degrees_out.flush()
 
-            self.xs = np.asarray(xs, dtype=np.float64)
+            self._degrees_in = open_npy(out_dir / "degrees_in.npy")
+            self._degrees_out = open_npy(out_dir / "degrees_out.npy")
 
-            if self.xs.ndim != 1:
-                raise ValueError("Input 'xs' series must be one-dimensional.")
+            degrees = create_npy(out_dir / "degrees.npy", np.uint32, len(ts))
+            np.add(self._degrees_in, self._degrees_out, out=degrees)
+            degrees.flush()
+            del degrees
 
-            if np.any(np.diff(self.xs) <= 0):
-                raise ValueError("Input 'xs' series must be monotonically increasing.")
+            self._degrees = open_npy(out_dir / "degrees.npy")
 
-        if only_degrees and self.is_weighted:
-            raise ValueError("Building with 'only_degrees' is only supported for unweighted graphs.")
+            if edges_writer is not None:
+                self._sources = open_npy(out_dir / "sources.npy")
+                self._targets = open_npy(out_dir / "targets.npy")
+                self._weights = open_npy(out_dir / "weights.npy") if self.is_weighted else None
+        self._strengths_in = collector.strengths_in
+        self._strengths_out = collector.strengths_out
+        self._weights_min = collector.weights_min
+        self._weights_max = collector.weights_max
+        self._csr = None
+        self._degree_counts = None
+
+        if cache is not None:
+            cache.put(cache_key, self)
+
+        return self
+
+    def _cache_key(self, ts, xs, only_degrees: bool) -> str:
+        params = {
+            "format_version": self._FILE_FORMAT_VERSION,
+            "type": type(self).__name__,
+            **self._params(),
+            "only_degrees": only_degrees,
+        }
+
+        return content_key(params, ts, "default" if xs is None else xs)
+
+    async def build_async(self, ts, xs=None, executor=None, **kwargs):
+        """
+        Compute and build the visibility graph for the given time series without blocking the event loop.
+
+        The build runs in ``executor`` (see :meth:`asyncio.loop.run_in_executor`).
+        With a :class:`concurrent.futures.ProcessPoolExecutor`, the graph is built in a worker process and sent back.
+
+        If the awaiting task is cancelled, the build is cancelled too
+        (unless running in a process pool, or a ``cancel`` event is given).
+        The ``progress`` and ``cancel`` parameters are not supported in a process pool,
+        as they would only reach a copy of them in the worker process.
+
+        Parameters
+        ----------
+        ts : 1D array like
+            Input time series.
+
+        xs : 1D array like, optional
+            X coordinates for the time series.
+            Length of ``xs`` must match length of ``ts``.
+
+            If not provided, ``[0, 1, 2...]`` will be used.
+
+        executor : concurrent.futures.Executor, optional
+            Executor used to run the build.
+            If ``None``, the default executor of the event loop is used.
+
+        **kwargs
+            Other parameters of :meth:`build`.
+
+        Returns
+        -------
+            self
+        """
+        loop = asyncio.get_running_loop()
+
+        if isinstance(executor, ProcessPoolExecutor):
+            unsupported = [name for name in ("progress", "cancel") if kwargs.get(name) is not None]
+
+            if unsupported:
+                raise ValueError(
+                    f"{', '.join(repr(name) for name in unsupported)} cannot be used with a ProcessPoolExecutor, "
+                    f"use a thread executor instead."
+                )
+
+            built = await loop.run_in_executor(executor, _build, self._empty_copy(), ts, xs, kwargs)
+            self.__dict__.update(built.__dict__)
 
-        if len(ts) == 0:
-            # empty time series results in an empty graph
-            self._edges = None if only_degrees else []
-            self._degrees_in = np.zeros(0, dtype=np.uint32)
-            self._degrees_out = np.zeros(0, dtype=np.uint32)
-            self._degrees = np.zeros(0, dtype=np.uint32)
             return self
 
-        self._edges, self._degrees_in, self._degrees_out = self._compute_graph(only_degrees)
-        self._degrees = self._degrees_in + self._degrees_out
+        cancel = kwargs.pop("cancel", None)
+        own_cancel = cancel is None
 
-        if only_degrees:  # `_compute_graph` doesn't return valid edges when only_degrees=True
-            self._edges = None
+        if own_cancel:
+            cancel = threading.Event()
 
-        return self
+        try:
+            return await loop.run_in_executor(executor, partial(self.build, ts, xs, cancel=cancel, **kwargs))
+        except asyncio.CancelledError:
+            if own_cancel:
+                cancel.set()
+
+            raise
+
+    def iter_edges(self, ts, xs=None, chunk_size: int = 1 << 16, **kwargs):
+        """
+        Compute the edges of the visibility graph for the given time series, yielding them in blocks as they are found.
+
+        The build runs in a background thread, and it is paused while the last block has not been consumed,
+        so memory usage is linear in the length of the time series plus ``chunk_size``.
+        Closing the generator early stops the build.
+        The graph instance is not modified.
+
+        Parameters
+        ----------
+        ts : 1D array like
+            Input time series.
+
+        xs : 1D array like, optional
+            X coordinates for the time series.
+            Length of ``xs`` must match length of ``ts``.
+
+            If not provided, ``[0, 1, 2...]`` will be used.
+
+        chunk_size : int
+            Maximum number of edges per block.
+            Default ``2**16``.
+
+        **kwargs
+            ``max_edges``, ``progress``, ``progress_every``, ``timeout`` and ``cancel``, see :meth:`build`.
+
+        Yields
+        ------
+        tuple of (numpy.ndarray, numpy.ndarray, numpy.ndarray or None)
+            ``sources``, ``targets`` and ``weights`` (``None`` if unweighted) of the edges in a block.
+
+        Examples
+        --------
+        .. code:: python
+
+            for sources, targets, weights in g.iter_edges(ts):
+                ...
+        """
+        ts, xs = self._prepare_input(ts, xs)
+
+        blocks = queue.Queue(maxsize=1)
+        stopped = threading.Event()
+        done = object()
+
+        class _Stopped(Exception):
+            pass
+
+        def put(item):
+            while not stopped.is_set():
+                try:
+                    blocks.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+            raise _Stopped()
+
+        def sink(sources, targets, weights):
+            put((sources.copy(), targets.copy(), None if weights is None else weights.copy()))
+
+        def run():
+            try:
+                collector = self._make_collector(
+                    ts, xs, store_edges=False, store_degrees=False, sink=sink, chunk_size=chunk_size, **kwargs
+                )
+
+                if len(ts) > 0:
+                    self._compute_graph(ts, xs, collector)
+
+                collector.finish()
+                put(done)
+            except _Stopped:
+                pass
+            except BaseException as e:
+                try:
+                    put(e)
+                except _Stopped:
+                    pass
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+
+        try:
+            while True:
+                item = blocks.get()
+
+                if item is done:
+                    return
+
+                if isinstance(item, BaseException):
+                    raise item
+
+                yield item
+        finally:
+            stopped.set()
+            thread.join()
+
+    def count_edges(self, ts, xs=None, **kwargs) -> int:
+        """
+        Compute the exact number of edges of the visibility graph for the given time series, without building it.
+
+        This is the cheapest way of obtaining the graph size:
+        no edges and no per-node arrays are stored, and the graph instance is not modified.
+
+        Parameters
+        ----------
+        ts : 1D array like
+            Input time series.
+
+        xs : 1D array like, optional
+            X coordinates for the time series.
+            Length of ``xs`` must match length of ``ts``.
+
+            If not provided, ``[0, 1, 2...]`` will be used.
+
+        **kwargs
+            ``progress``, ``progress_every``, ``timeout`` and ``cancel``, see :meth:`build`.
+
+        Returns
+        -------
+        int
+            Number of edges of the graph.
+        """
+        ts, xs = self._prepare_input(ts, xs)
+
+        collector = self._make_collector(ts, xs, store_edges=False, store_degrees=False, **kwargs)
+
+        if len(ts) > 0:
+            self._compute_graph(ts, xs, collector)
+
+        collector.finish()
+
+        return collector.n_edges
+
+    def estimate_edges(
+        self,
+        ts,
+        xs=None,
+        *,
+        n_samples: int = 1000,
+        horizon: Optional[int] = 100_000,
+        confidence: Optional[float] = 0.99,
+        seed=None,
+    ) -> int:
+        """
+        Estimate the number of edges of the visibility graph for the given time series, without building it.
+
+        A random sample of nodes is drawn and, for each of them, the edges to the nodes on their right are counted exactly
+        (up to ``horizon`` nodes away).
+        The total number of edges is then extrapolated from the sample.
+        The cost is roughly ``n_samples * horizon`` operations, independent of the length of the time series.
+
+        Sampled sweeps that reach the ``horizon`` while still finding visible nodes are extrapolated to the end of the series,
+        assuming the same density of visible nodes as in the last half of the inspected range (a ``RuntimeWarning`` is issued).
+        This is exact for series where all the nodes are visible (e.g. convex series) and overestimates the edges
+        beyond the horizon when visibility becomes rarer with distance, as usual.
+
+        Parameters
+        ----------
+        ts : 1D array like
+            Input time series.
+
+        xs : 1D array like, optional
+            X coordinates for the time series.
+            Length of ``xs`` must match length of ``ts``.
+
+            If not provided, ``[0, 1, 2...]`` will be used.
+
+        n_samples : int
+            Number of nodes to sample.
+            If larger than or equal to the number of nodes, all of them are used.
+            Default ``1000``.
+
+        horizon : int, None
+            Maximum number of nodes to the right of each sampled node that are inspected.
+            Edges spanning more than ``horizon`` nodes are extrapolated, see above.
+            If ``None``, no limit is used and the sampled sweeps are counted exactly.
+            Default ``100_000``.
+
+        confidence : float, None
+            If provided, return the upper bound of a one-sided confidence interval at this level
+            instead of the point estimate.
+            Default ``0.99``.
+
+        seed : int, numpy.random.Generator, optional
+            Seed or random generator used to draw the sample.
+
+        Returns
+        -------
+        int
+            Estimated number of edges of the graph.
+        """
+        ts, xs = self._prepare_input(ts, xs)
+        n = len(ts)
+
+        if n < 2:
+            return 0
+
+        if n_samples < 1:
+            raise ValueError(f"'n_samples' must be positive (got {n_samples}).")
+
+        if horizon is not None and horizon < 1:
+            raise ValueError(f"'horizon' must be positive (got {horizon}).")
+
+        n_sources = n - 1  # the last node has no nodes to its right
+
+        if n_samples >= n_sources:
+            sources = np.arange(n_sources, dtype=np.uint32)
+        else:
+            rng = np.random.default_rng(seed)
+            sources = np.sort(rng.choice(n_sources, size=n_samples, replace=False)).astype(np.uint32)
+
+        horizon = n if horizon is None else min(horizon, n)
+
+        collector = self._make_collector(ts, xs, store_edges=False, store_degrees=False)
+        counts = self._count_sweeps(ts, xs, sources, horizon, collector).astype(np.float64)
+
+        # sweeps cut off by the horizon: extrapolate the density of visible nodes in the last half of the inspected range
+        remaining = (n - 1 - sources.astype(np.int64)) - horizon
+        truncated = np.flatnonzero(remaining > 0)
+
+        if len(truncated) > 0:
+            half = horizon // 2
+            tail = counts[truncated] - self._count_sweeps(ts, xs, np.ascontiguousarray(sources[truncated]), half, collector)
+            extrapolated = tail > 0
+
+            if np.any(extrapolated):
+                counts[truncated] += tail / (horizon - half) * remaining[truncated]
+
+                warnings.warn(
+                    f"{np.count_nonzero(extrapolated)} of the {len(sources)} sampled sweeps reached the horizon "
+                    f"({horizon} nodes) while still finding visible nodes, the edges beyond it were extrapolated. "
+                    f"Use a larger 'horizon' (or None) for a more accurate estimate.",
+                    RuntimeWarning,
+                    stacklevel=2,
+                )
+
+        estimate = n_sources * counts.mean()
+
+        if confidence is not None and 1 < len(sources) < n_sources:
+            from statistics import NormalDist
+
+            z = NormalDist().inv_cdf(confidence)
+            fpc = np.sqrt((n_sources - len(sources)) / (n_sources - 1))
+            estimate += z * n_sources * counts.std(ddof=1) / np.sqrt(len(sources)) * fpc
+
+        return int(min(np.ceil(estimate), n * (n - 1) // 2))
+
+    @staticmethod
+    def _input_itemsize(arr, dtype_of) -> int:
+        """Bytes per node of the copy of an input array made by the build, 0 if it is used as is (e.g. a caller-owned or memory-mapped array)."""
+        if arr is None:
+            return 0
+
+        if not isinstance(arr, np.ndarray):
+            return 8
+
+        dtype = dtype_of(arr.dtype)
+
+        return 0 if arr.dtype == dtype else dtype.itemsize
+
+    def _memory_model(
+        self, ts, xs=None, only_degrees: bool = False, only_node_stats: bool = False, out_of_core: bool = False
+    ):
+        """
+        Approximate number of bytes of memory used by a built graph, per node and per edge.
+
+        ``ts`` and ``xs`` are the input arrays as given by the caller, only counted if the build has to copy them.
+        """
+        bytes_per_node = 0
+
+        if not out_of_core:
+            bytes_per_node += self._input_itemsize(ts, VG._ts_dtype)
+            bytes_per_node += self._input_itemsize(xs, lambda _: np.dtype(np.float64))
+            bytes_per_node += 3 * 4  # degrees, degrees_in, degrees_out
+
+        if only_node_stats:
+            bytes_per_node += 4 * 8  # strengths_in, strengths_out, weights_min, weights_max
+
+        if only_degrees or only_node_stats or out_of_core:
+            bytes_per_edge = 0
+        elif self.is_weighted:
+            bytes_per_edge = 8 + 64 + 2 * 28 + 24  # list slot, 3-tuple, 2 int, float
+        else:
+            bytes_per_edge = 8 + 56 + 2 * 28  # list slot, 2-tuple, 2 int
+
+        return bytes_per_node, bytes_per_edge
+
+    def estimate_memory(self, ts, xs=None, only_degrees: bool = False, only_node_stats: bool = False, **kwargs) -> int:
+        """
+        Estimate the memory (in bytes) needed to build the visibility graph for the given time series.
+
+        The number of edges is estimated with :meth:`estimate_edges`
+        (all keyword arguments are passed on to it), the result is an approximation.
+        The input arrays are only counted if the build needs to copy them
+        (i.e. not for NumPy arrays, including memory-mapped ones, that are already of a supported dtype).
+
+        Parameters
+        ----------
+        ts : 1D array like
+            Input time series.
+
+        xs : 1D array like, optional
+            X coordinates for the time series.
+
+        only_degrees : bool
+            Estimate the memory for a build with ``only_degrees=True``.
+            Default ``False``.
+
+        only_node_stats : bool
+            Estimate the memory for a build with ``only_node_stats=True``.
+            Default ``False``.
+
+        Returns
+        -------
+        int
+            Estimated number of bytes.
+        """
+        bytes_per_node, bytes_per_edge = self._memory_model(ts, xs, only_degrees, only_node_stats)
+
+        n = len(ts)
+        m = self.estimate_edges(ts, xs, **kwargs) if bytes_per_edge > 0 else 0
+
+        return n * bytes_per_node + m * bytes_per_edge
+
+    @property
+    def xs(self):
+        """
+        1D array of the X coordinates of the time series. ``None`` if the graph has not been built yet.
+
+        If no X coordinates were given, ``[0, 1, 2...]`` is only allocated the first time this attribute is accessed.
+        """
+        if self._xs is None and self.ts is not None:
+            self._xs = np.arange(len(self.ts), dtype=np.float64)
+
+        return self._xs
+
+    @xs.setter
+    def xs(self, xs):
+        self._xs = xs
 
     @property
     def is_directed(self) -> bool:
@@ -185,7 +1121,9 @@ class VG:
         Number of edges (links) in the graph.
         """
         if self._m is None:
-            if self._edges is not None:
+            if self._sources is not None:
+                self._m = len(self._sources)
+            elif self._edges is not None:
                 self._m = len(self._edges)
             elif self._degrees is not None:
                 self._m = np.sum(self._degrees, dtype=int) // 2
@@ -206,6 +1144,12 @@ class VG:
         """
         self._validate_is_built()
 
+        if self._edges is None:
+            if self.is_weighted:
+                self._edges = list(zip(self._sources.tolist(), self._targets.tolist(), self._weights.tolist()))
+            else:
+                self._edges = list(zip(self._sources.tolist(), self._targets.tolist()))
+
         return self._edges
 
     @property
@@ -223,17 +1167,51 @@ class VG:
         if not self.is_weighted:
             return self.edges
 
+        if self._sources is not None:
+            return list(zip(self._sources.tolist(), self._targets.tolist()))
+
         return [(source_node, target_node) for (source_node, target_node, _) in self.edges]
 
     @property
     def _edges_array(self):
+        if self._sources is not None:
+            return np.column_stack((self._sources, self._targets)).astype("int64")
+
         arr = np.asarray(self._edges, dtype="int64")  # could be 'uint64' but then it breaks np.bincount
+        arr = arr.reshape(-1, 3 if self.is_weighted else 2)
 
         if self.is_weighted:
             return arr[:, :2]
 
         return arr
 
+    def _edge_columns(self):
+        """Return the ``sources``, ``targets`` (``uint32``) and ``weights`` (``None`` if unweighted) arrays of the edges."""
+        self._validate_is_built()
+
+        if self._sources is not None:
+            return self._sources, self._targets, self._weights
+
+        # imported here to avoid a circular import (see `_make_collector`)
+        from ts2vg.graph._base import _edge_list_columns
+
+        return _edge_list_columns(self._edges, self.is_weighted)
+
+    def _undirected_csr(self):
+        """
+        Return the ``indptr`` (``int64``) and ``indices`` (``uint32``) CSR arrays of the graph as undirected,
+        with the neighbours of each node sorted in increasing order,
+        and the ``forward`` (``int64``) array with the position in ``indices`` of the first neighbour of each node
+        that comes after it in the time series.
+        Computed once (in linear time) and cached.
+        """
+        if self._csr is None:
+            sources, targets, _ = self._edge_columns()
+
+            self._csr = _csr(sources, targets, self.n_vertices)
+
+        return self._csr
+
     @property
     def weights(self):
         """
@@ -247,6 +1225,9 @@ class VG:
         if self.weighted is None:
             return None
 
+        if self._weights is not None:
+            return self._weights
+
         return np.fromiter((w for (_, _, w) in self.edges), dtype="float64", count=self.n_edges)
 
     @property
@@ -273,6 +1254,106 @@ class VG:
     def degrees_out(self):
         return self._degrees_out
 
+    def _compute_node_stats(self):
+        if self._strengths_in is not None:
+            return
+
+        if self.weighted is None:
+            raise ValueError("Node weight statistics are only available for weighted graphs.")
+
+        self._validate_is_built()
+
+        e = self._edges_array
+        w = self.weights
+        n = self.n_vertices
+
+        self._strengths_out = np.bincount(e[:, 0], weights=w, minlength=n)
+        self._strengths_in = np.bincount(e[:, 1], weights=w, minlength=n)
+
+        self._weights_min = np.full(n, np.inf, dtype="float64")
+        np.minimum.at(self._weights_min, e[:, 0], w)
+        np.minimum.at(self._weights_min, e[:, 1], w)
+
+        self._weights_max = np.full(n, -np.inf, dtype="float64")
+        np.maximum.at(self._weights_max, e[:, 0], w)
+        np.maximum.at(self._weights_max, e[:, 1], w)
+
+    @property
+    def strengths(self):
+        """
+        Strength sequence of the graph (sum of the weights of the edges incident to each node).
+
+        Return a 1D array of strength values for each node in the graph, in the same order as the input time series.
+        Only available for weighted graphs.
+        """
+        self._compute_node_stats()
+
+        return self._strengths_in + self._strengths_out
+
+    @property
+    def strengths_in(self):
+        """
+        Sum of the weights of the incoming edges of each node.
+        Only available for weighted graphs.
+        """
+        self._compute_node_stats()
+
+        return self._strengths_in
+
+    @property
+    def strengths_out(self):
+        """
+        Sum of the weights of the outgoing edges of each node.
+        Only available for weighted graphs.
+        """
+        self._compute_node_stats()
+
+        return self._strengths_out
+
+    @property
+    def weights_min(self):
+        """
+        Minimum weight of the edges incident to each node.
+
+        Return a 1D array in the same order as the input time series, ``nan`` for nodes without edges.
+        Only available for weighted graphs.
+        """
+        self._compute_node_stats()
+
+        return np.where(self.degrees > 0, self._weights_min, np.nan)
+
+    @property
+    def weights_max(self):
+        """
+        Maximum weight of the edges incident to each node.
+
+        Return a 1D array in the same order as the input time series, ``nan`` for nodes without edges.
+        Only available for weighted graphs.
+        """
+        self._compute_node_stats()
+
+        return np.where(self.degrees > 0, self._weights_max, np.nan)
+
+    @property
+    def weights_mean(self):
+        """
+        Mean weight of the edges incident to each node.
+
+        Return a 1D array in the same order as the input time series, ``nan`` for nodes without edges.
+        Only available for weighted graphs.
+        """
+        degrees = self.degrees
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(degrees > 0, self.strengths / degrees, np.nan)
+
+    def _degree_histogram(self):
+        """Number of nodes with each degree from 0 to the maximum degree, computed once (in a single pass) and cached."""
+        if self._degree_counts is None:
+            self._degree_counts = np.bincount(self.degrees)
+
+        return self._degree_counts
+
     @property
     def degree_counts(self):
         """
@@ -283,8 +1364,9 @@ class VG:
 
         The count of any other degree value not listed in `ks` is 0.
         """
-        ks, counts = np.unique(self.degrees, return_counts=True)
-        cs = counts
+        counts = self._degree_histogram()
+        ks = np.flatnonzero(counts)
+        cs = counts[ks]
 
         return ks, cs
 
@@ -303,6 +1385,122 @@ class VG:
 
         return ks, ps
 
+    @property
+    def degree_ccdf(self):
+        """
+        Complementary cumulative degree distribution of the graph.
+
+        Two lists `ks`, `ps` are returned.
+        `ps[i]` is the empirical probability that a node in the graph has degree greater than or equal to `ks[i]`.
+
+        Only the degree values of the nodes in the graph are listed in `ks`.
+        """
+        counts = self._degree_histogram()
+        ks = np.flatnonzero(counts)
+        ps = np.cumsum(counts[::-1])[::-1][ks] / self.n_vertices
+
+        return ks, ps
+
+    def log_binned_degree_distribution(self, base: float = 2.0):
+        """
+        Degree distribution of the graph, in logarithmic bins.
+
+        Bin *i* contains the degrees in the range ``[base**i, base**(i+1))`` (nodes with degree 0 are left out).
+        Useful to plot heavy-tailed degree distributions, which are too sparse in the tail otherwise.
+
+        Parameters
+        ----------
+        base : float
+            Ratio between the edges of consecutive bins, must be greater than 1.
+            Default ``2.0``.
+
+        Returns
+        -------
+        ks, ps : numpy.ndarray
+            Geometric centers of the bins (`ks`) and empirical probability density in each bin (`ps`),
+            i.e. the probability that a node has a degree in the bin divided by the number of integer degrees in the bin.
+            Empty bins are not listed.
+        """
+        if base <= 1:
+            raise ValueError(f"'base' must be greater than 1 (got {base}).")
+
+        counts = self._degree_histogram()
+
+        if len(counts) < 2:
+            return np.zeros(0), np.zeros(0)
+
+        n_bins = int(np.floor(np.log(len(counts) - 1) / np.log(base) + 1e-9)) + 1
+        edges = np.unique(np.ceil(base ** np.arange(n_bins + 1) - 1e-9).astype(np.int64))
+
+        # number of nodes and of integer degrees in each bin
+        cumulative = np.concatenate(([0], np.cumsum(counts)))
+        bin_counts = cumulative[np.minimum(edges[1:], len(counts))] - cumulative[edges[:-1]]
+        widths = np.diff(edges)
+
+        ks = np.sqrt(edges[:-1] * (edges[1:] - 1))
+        ps = bin_counts / widths / self.n_vertices
+        nonempty = bin_counts > 0
+
+        return ks[nonempty], ps[nonempty]
+
+    def degree_exponent(self, model: str = "exponential", k_min: Optional[int] = None) -> float:
+        """
+        Maximum likelihood estimate of the exponent of the tail of the degree distribution.
+
+        ``'exponential'`` :
+            :math:`P(k) \\sim e^{-\\lambda k}` (for :math:`k \\geq k_{min}`), returns :math:`\\lambda`.
+            Horizontal visibility graphs of uncorrelated random series have
+            :math:`\\lambda = \\ln(3/2)` (see B. Luque et al., "Horizontal visibility graphs: exact results for random time series", 2009),
+            and deviations from this value characterize correlated (:math:`\\lambda > \\ln(3/2)`) and chaotic
+            (:math:`\\lambda < \\ln(3/2)`) series.
+
+        ``'power_law'`` :
+            :math:`P(k) \\sim k^{-\\gamma}` (for :math:`k \\geq k_{min}`), returns :math:`\\gamma`,
+            using the approximation for discrete data in A. Clauset et al., "Power-law distributions in empirical data", 2009.
+
+        Computed from the (cached) degree counts, without sorting the degrees.
+
+        Parameters
+        ----------
+        model : str
+            One of ``'exponential'`` or ``'power_law'``.
+            Default ``'exponential'``.
+
+        k_min : int, None
+            Smallest degree considered part of the tail.
+            If ``None``, the smallest degree in the graph (and at least 1) is used.
+            Default ``None``.
+
+        Returns
+        -------
+        float
+            The estimated exponent, ``nan`` if there are not enough nodes in the tail.
+        """
+        if model not in ("exponential", "power_law"):
+            raise ValueError(f"Invalid 'model' parameter: {model}. Must be one of ['exponential', 'power_law']")
+
+        counts = self._degree_histogram()
+
+        if k_min is None:
+            k_min = max(int(np.argmax(counts > 0)), 1) if len(counts) > 0 else 1
+
+        if k_min < 1:
+            raise ValueError(f"'k_min' must be positive (got {k_min}).")
+
+        ks = np.arange(k_min, max(len(counts), k_min))
+        counts = counts[k_min:]
+        n = np.sum(counts)
+
+        if n == 0:
+            return float("nan")
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if model == "exponential":
+                # geometric distribution of k - k_min
+                return float(np.log1p(n / np.dot(counts, ks - k_min)))
+
+            return float(1 + n / np.dot(counts, np.log(ks / (k_min - 0.5))))
+
     def adjacency_matrix(self, triangle="both", use_weights=False, no_weight_value=np.nan):
         """
         Adjacency matrix of the graph.
@@ -475,5 +1673,143 @@ class VG:
         else:
             return text
 
+    _FILE_FORMAT_VERSION = 1
+
+    def save(self, path):
+        """
+        Save the graph to the directory ``path``, in a compact columnar format that can be memory-mapped by :meth:`load`.
+
+        The directory contains a ``config.json`` file with the graph parameters
+        and one ``.npy`` file per array: ``ts.npy``, ``xs.npy`` (only if X coordinates were given),
+        ``degrees.npy``, ``degrees_in.npy``, ``degrees_out.npy``
+        and the edges in compressed sparse row (CSR) format,
+        i.e. sorted by source node: ``indptr.npy`` (edges of node ``i`` are ``indptr[i]:indptr[i+1]``),
+        ``targets.npy`` and ``weights.npy`` (only for weighted graphs),
+        along with the (expanded) source node of each edge in ``sources.npy``, so that the edges can be memory-mapped too.
+        The edges are not saved for graphs built with ``only_degrees``, ``only_node_stats`` or ``sink``.
+        Graphs with custom weight functions cannot be saved.
+
+        Parameters
+        ----------
+        path : str or Path
+            Directory where the graph is saved, created if it does not exist.
+            Files of a previously saved graph are overwritten.
+        """
+        if self.ts is None:
+            raise NotBuiltError("Cannot save graph, use 'build' first.")
+
+        if self._weighted == _WEIGHTED_CUSTOM:
+            raise ValueError("Cannot save graph with a custom weight function.")
+
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+
+        n = len(self.ts)
+        has_edges = self._edges is not None or self._sources is not None
+
+        if has_edges:
+            sources, targets, weights = self._edge_columns()
+
+            order = np.argsort(sources, kind="stable")
+            indptr = np.zeros(n + 1, dtype=np.uint64)
+            np.cumsum(np.bincount(sources, minlength=n), out=indptr[1:])
+
+            save_npy(path / "indptr.npy", indptr)
+            save_npy(path / "sources.npy", np.asarray(sources)[order])
+            save_npy(path / "targets.npy", np.asarray(targets)[order])
+
+            if self.is_weighted:
+                save_npy(path / "weights.npy", np.asarray(weights)[order])
+
+        save_npy(path / "ts.npy", self.ts)
+
+        if self._xs is not None:
+            save_npy(path / "xs.npy", self._xs)
+        else:
+            (path / "xs.npy").unlink(missing_ok=True)
+
+        save_npy(path / "degrees.npy", self.degrees)
+        save_npy(path / "degrees_in.npy", self.degrees_in)
+        save_npy(path / "degrees_out.npy", self.degrees_out)
+
+        config = {
+            "format_version": self._FILE_FORMAT_VERSION,
+            "type": type(self).__name__,
+            **self._params(),
+            "n_vertices": n,
+            "n_edges": int(self.n_edges),
+            "has_edges": has_edges,
+        }
+
+        with open(path / "config.json", "w") as f:
+            json.dump(config, f, indent=2)
+
+    @classmethod
+    def load(cls, path, mmap: bool = True):
+        """
+        Load a graph saved with :meth:`save`.
+
+        Parameters
+        ----------
+        path : str or Path
+            Directory where the graph was saved.
+
+        mmap : bool
+            If ``True``, the arrays are memory-mapped (read-only) instead of read into memory.
+            Default ``True``.
+
+        Returns
+        -------
+        VG
+            The loaded graph.
+            Can be called on :class:`VG` to load any type of graph, or on a subclass to also check the type.
+        """
+        path = Path(path)
+
+        with open(path / "config.json") as f:
+            config = json.load(f)
+
+        if config["format_version"] > cls._FILE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported file format version: {config['format_version']}.")
+
+        graph_classes = {c.__name__: c for c in VG.__subclasses__()}
+        graph_class = graph_classes.get(config["type"])
+
+        if graph_class is None or not issubclass(graph_class, cls):
+            raise ValueError(f"Cannot load a '{config['type']}' graph as '{cls.__name__}'.")
+
+        graph = graph_class(**{name: config[name] for name in graph_class._PARAM_NAMES if name in config})
+
+        def load_array(name):
+            return np.load(path / name, mmap_mode="r" if mmap else None)
+
+        ts = load_array("ts.npy")
+        xs = load_array("xs.npy") if (path / "xs.npy").exists() else None
+        degrees_in = load_array("degrees_in.npy")
+        degrees_out = load_array("degrees_out.npy")
+
+        if config["has_edges"]:
+            if (path / "sources.npy").exists():
+                sources = load_array("sources.npy")
+            else:
+                # saved without the expanded sources, expand them from the CSR offsets
+                indptr = load_array("indptr.npy")
+                sources = np.repeat(np.arange(len(ts), dtype=np.uint32), np.diff(indptr).astype(np.intp))
+
+            targets = load_array("targets.npy")
+            weights = load_array("weights.npy") if graph.is_weighted else None
+
+            graph._set_columnar(ts, xs, sources, targets, weights, degrees_in, degrees_out)
+        else:
+            graph.ts = ts
+            graph.xs = xs
+            graph._degrees_in = degrees_in
+            graph._degrees_out = degrees_out
+
+        graph._degrees = load_array("degrees.npy")
+        graph._m = config["n_edges"]
+
+        return graph
+
     # def _compute_graph(self):
     #     raise NotImplementedError()
@@ -0,0 +1,163 @@
+"""
+Content-addressed on-disk cache of built visibility graphs.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+_HASH_BLOCK_SIZE = 1 << 24
+
+
+def content_key(*parts) -> str:
+    """
+    Compute a hex digest identifying the given parts.
+    Parts can be NumPy arrays (hashed by dtype, shape and contents, in blocks) or JSON serializable values.
+    """
+    h = hashlib.blake2b(digest_size=20)
+
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            h.update(f"ndarray:{part.dtype.str}:{part.shape}".encode())
+
+            flat = part.reshape(-1)
+            step = max(_HASH_BLOCK_SIZE // max(flat.itemsize, 1), 1)
+
+            for start in range(0, len(flat), step):
+                h.update(np.ascontiguousarray(flat[start : start + step]).data)
+        else:
+            h.update(("json:" + json.dumps(part, sort_keys=True)).encode())
+
+    return h.hexdigest()
+
+
+class GraphCache:
+    """
+    Content-addressed on-disk cache of built visibility graphs.
+
+    Each entry is a graph saved with :meth:`VG.save` in a subdirectory of ``directory`` named after its key
+    (a hash of the input time series and of the graph and build parameters).
+    When the total size of the entries exceeds ``max_size`` bytes, the least recently used entries are evicted
+    (except the entry just stored, which is kept even if it is larger than ``max_size`` on its own).
+
+    The cache can be shared between processes: entries are written to a temporary directory and then renamed.
+
+    Parameters
+    ----------
+    directory : str or Path
+        Directory of the cache, created if it does not exist.
+
+    max_size : int, optional
+        Maximum total size of the cache, in bytes.
+        If ``None``, entries are never evicted.
+
+    Examples
+    --------
+    .. code:: python
+
+        from ts2vg import NaturalVG
+        from ts2vg.graph.cache import GraphCache
+
+        cache = GraphCache("~/.cache/ts2vg", max_size=10 * 2**30)
+
+        g = NaturalVG().build(ts, cache=cache)  # built and stored
+        g = NaturalVG().build(ts, cache=cache)  # loaded from the cache
+    """
+
+    def __init__(self, directory, max_size: Optional[int] = None):
+        if max_size is not None and max_size < 0:
+            raise ValueError(f"'max_size' cannot be negative (got {max_size}).")
+
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / key
+
+    def get(self, key: str) -> Optional[Path]:
+        """Return the path of the entry for ``key`` (marking it as recently used), or ``None`` if not cached."""
+        path = self._entry_path(key)
+
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+
+        return path
+
+    def put(self, key: str, graph) -> Path:
+        """Save ``graph`` as the entry for ``key``, evict entries if needed, and return its path."""
+        path = self._entry_path(key)
+        tmp_path = self.directory / f".tmp-{key}-{uuid.uuid4().hex}"
+
+        try:
+            graph.save(tmp_path)
+            os.rename(tmp_path, path)
+        except OSError:
+            # entry already stored (e.g. by another process)
+            if not path.is_dir():
+                raise
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+        os.utime(path)
+        self.evict(keep=key)
+
+        return path
+
+    def entries(self) -> list:
+        """Return the ``(key, size, last_used)`` tuples of all the entries, from least to most recently used."""
+        entries = []
+
+        for path in self.directory.iterdir():
+            if path.name.startswith(".") or not path.is_dir():
+                continue
+
+            try:
+                size = sum(f.stat().st_size for f in path.iterdir())
+                last_used = path.stat().st_mtime
+            except FileNotFoundError:
+                continue  # evicted concurrently
+
+            entries.append((path.name, size, last_used))
+
+        return sorted(entries, key=lambda e: e[2])
+
+    @property
+    def size(self) -> int:
+        """Total size of the entries, in bytes."""
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, max_size: Optional[int] = None, keep: Optional[str] = None):
+        """
+        Evict the least recently used entries until the total size is at most ``max_size`` (default ``self.max_size``),
+        or until only the entry for ``keep`` (if given) is left.
+        """
+        max_size = self.max_size if max_size is None else max_size
+
+        if max_size is None:
+            return
+
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+
+        for key, size, _ in entries:
+            if total <= max_size:
+                break
+
+            if key == keep:
+                continue
+
+            shutil.rmtree(self._entry_path(key), ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        """Remove all the entries."""
+        self.evict(0)
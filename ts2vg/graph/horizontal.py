@@ -1,7 +1,9 @@
 from typing import Optional
 
+from ts2vg.graph._horizontal import _compute_cross_edges as _compute_cross_edges_dc
 from ts2vg.graph._horizontal import _compute_graph as _compute_graph_dc
 from ts2vg.graph._horizontal_penetrable import _compute_graph as _compute_graph_pn
+from ts2vg.graph._horizontal_penetrable import _count_sweeps
 from ts2vg.graph.base import VG
 
 
@@ -24,6 +26,14 @@ class HorizontalVG(VG):
         ``'distance'``, ``'sq_distance'``, ``'v_distance'``, ``'abs_v_distance'``, ``'h_distance'``, ``'abs_h_distance'``,
         ``'slope'``, ``'abs_slope'``, ``'angle'``, ``'abs_angle'``, ``'num_penetrations'``.
         See :ref:`Weighted graphs` for more information.
+
+        A custom weight function ``weighted(x_a, x_b, y_a, y_b, slope)`` can also be given.
+        It is called with NumPy arrays of the coordinates of the nodes of the edges (from ``a`` to ``b``)
+        and of the slopes between them (over blocks of edges), and must return an array with the weights.
+        It can also be a compiled function with C signature ``double (double, double, double, double, double)``,
+        called for each edge: a :mod:`ctypes` function pointer of type
+        ``ctypes.CFUNCTYPE(ctypes.c_double, *[ctypes.c_double] * 5)`` (e.g. the ``ctypes`` attribute of a numba ``cfunc``)
+        or a PyCapsule named with the signature of the function (e.g. from a Cython module ``__pyx_capi__``).
         Default ``None``.
 
     min_weight : float, None
@@ -69,27 +79,17 @@ class HorizontalVG(VG):
     # def __init__(self, *args, **kwargs):
     #     super().__init__(*args, **kwargs)
 
-    def _compute_graph(self, only_degrees: bool):
+    def _compute_graph(self, ts, xs, collector):
         if self.penetrable_limit == 0:
-            return _compute_graph_dc(
-                self.ts,
-                self.xs,
-                self._directed,
-                self._weighted,
-                only_degrees,
-                self.min_weight if self.min_weight is not None else float("-inf"),
-                self.max_weight if self.max_weight is not None else float("inf"),
-            )
+            _compute_graph_dc(ts, xs, self._directed, collector)
         else:
-            return _compute_graph_pn(
-                self.ts,
-                self.xs,
-                self._directed,
-                self._weighted,
-                only_degrees,
-                self.min_weight if self.min_weight is not None else float("-inf"),
-                self.max_weight if self.max_weight is not None else float("inf"),
-                self.penetrable_limit,
-            )
-
-        return
+            _compute_graph_pn(ts, xs, self._directed, self._weighted, self.penetrable_limit, collector)
+
+    def _count_sweeps(self, ts, xs, sources, horizon, collector):
+        return _count_sweeps(ts, xs, self._directed, self._weighted, self.penetrable_limit, sources, horizon, collector)
+
+    def _compute_cross_edges(self, ts, xs, boundary, collector):
+        if self.penetrable_limit != 0:
+            raise ValueError("Chunked builds are not supported for penetrable visibility graphs.")
+
+        _compute_cross_edges_dc(ts, xs, self._directed, boundary, collector)
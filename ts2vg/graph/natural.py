@@ -1,7 +1,9 @@
 from typing import Optional
 
+from ts2vg.graph._natural import _compute_cross_edges as _compute_cross_edges_dc
 from ts2vg.graph._natural import _compute_graph as _compute_graph_dc
 from ts2vg.graph._natural_penetrable import _compute_graph as _compute_graph_pn
+from ts2vg.graph._natural_penetrable import _count_sweeps
 from ts2vg.graph.base import VG
 
 
@@ -24,6 +26,14 @@ class NaturalVG(VG):
         ``'distance'``, ``'sq_distance'``, ``'v_distance'``, ``'abs_v_distance'``, ``'h_distance'``, ``'abs_h_distance'``,
         ``'slope'``, ``'abs_slope'``, ``'angle'``, ``'abs_angle'``, ``'num_penetrations'``.
         See :ref:`Weighted graphs` for more information.
+
+        A custom weight function ``weighted(x_a, x_b, y_a, y_b, slope)`` can also be given.
+        It is called with NumPy arrays of the coordinates of the nodes of the edges (from ``a`` to ``b``)
+        and of the slopes between them (over blocks of edges), and must return an array with the weights.
+        It can also be a compiled function with C signature ``double (double, double, double, double, double)``,
+        called for each edge: a :mod:`ctypes` function pointer of type
+        ``ctypes.CFUNCTYPE(ctypes.c_double, *[ctypes.c_double] * 5)`` (e.g. the ``ctypes`` attribute of a numba ``cfunc``)
+        or a PyCapsule named with the signature of the function (e.g. from a Cython module ``__pyx_capi__``).
         Default ``None``.
 
     min_weight : float, None
@@ -44,10 +54,19 @@ class NaturalVG(VG):
         between two nodes that can still be connected in the final graph.
         Default ``0`` (regular non-penetrable visibility graph).
 
+    robust : bool
+        If ``True``, decide the visibility between nodes with exact orientation predicates
+        (cross products evaluated with a floating-point filter and an exact fallback, after Shewchuk).
+        Collinear points never see each other, regardless of the magnitude of the values.
+        If ``False``, slopes are compared with a small tolerance (relative to the magnitude of the values).
+        Integer time series without ``xs`` are always compared exactly.
+        Default ``False``.
+
     References
     ----------
         - Lucas Lacasa et al., "*From time series to complex networks: The visibility graph*", 2008.
         - Xin Lan et al., "*Fast transformation from time series to visibility graphs*", 2015.
+        - Jonathan R. Shewchuk, "*Adaptive Precision Floating-Point Arithmetic and Fast Robust Geometric Predicates*", 1997.
 
     Examples
     --------
@@ -65,28 +84,27 @@ class NaturalVG(VG):
 
     _general_type_name = "Natural Visibility Graph"
 
-    # def __init__(self, *args, **kwargs):
-    #     super().__init__(*args, **kwargs)
+    _PARAM_NAMES = VG._PARAM_NAMES + ("robust",)
+
+    def __init__(self, *, robust: bool = False, **kwargs):
+        super().__init__(**kwargs)
+
+        self.robust = robust
+        """`bool` indicating whether exact orientation predicates are used (same as passed to the constructor)."""
 
-    def _compute_graph(self, only_degrees: bool):
+    def _compute_graph(self, ts, xs, collector):
         if self.penetrable_limit == 0:
-            return _compute_graph_dc(
-                self.ts,
-                self.xs,
-                self._directed,
-                self._weighted,
-                only_degrees,
-                self.min_weight if self.min_weight is not None else float("-inf"),
-                self.max_weight if self.max_weight is not None else float("inf"),
-            )
+            _compute_graph_dc(ts, xs, self._directed, self.robust, collector)
         else:
-            return _compute_graph_pn(
-                self.ts,
-                self.xs,
-                self._directed,
-                self._weighted,
-                only_degrees,
-                self.min_weight if self.min_weight is not None else float("-inf"),
-                self.max_weight if self.max_weight is not None else float("inf"),
-                self.penetrable_limit,
-            )
+            _compute_graph_pn(ts, xs, self._directed, self._weighted, self.penetrable_limit, self.robust, collector)
+
+    def _count_sweeps(self, ts, xs, sources, horizon, collector):
+        return _count_sweeps(
+            ts, xs, self._directed, self._weighted, self.penetrable_limit, self.robust, sources, horizon, collector
+        )
+
+    def _compute_cross_edges(self, ts, xs, boundary, collector):
+        if self.penetrable_limit != 0:
+            raise ValueError("Chunked builds are not supported for penetrable visibility graphs.")
+
+        _compute_cross_edges_dc(ts, xs, self._directed, self.robust, boundary, collector)
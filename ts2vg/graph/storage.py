@@ -0,0 +1,149 @@
+"""
+Helpers to store the arrays of a visibility graph on disk, as memory-mappable ``.npy`` files.
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+
+_NPY_HEADER_SIZE = 128
+
+
+def _npy_header(dtype, length: int) -> bytes:
+    # fixed size header (format version 1.0), so that it can be rewritten in place once the final length is known
+    header = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" % (np.dtype(dtype).str, length)
+    header = header.ljust(_NPY_HEADER_SIZE - 10 - 1) + "\n"
+
+    return b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header.encode("latin1")
+
+
+class NpyAppender:
+    """
+    Writes a 1D ``.npy`` file incrementally, without knowing its final length in advance.
+    """
+
+    def __init__(self, path, dtype):
+        self.path = Path(path)
+        self.dtype = np.dtype(dtype)
+        self.length = 0
+
+        self._f = open(self.path, "wb")
+        self._f.write(_npy_header(self.dtype, 0))
+
+    def append(self, arr):
+        arr = np.ascontiguousarray(arr, dtype=self.dtype)
+        self._f.write(arr.data)
+        self.length += len(arr)
+
+    def close(self):
+        if self._f.closed:
+            return
+
+        self._f.seek(0)
+        self._f.write(_npy_header(self.dtype, self.length))
+        self._f.close()
+
+
+class EdgeFilesWriter:
+    """
+    Edge sink writing the blocks of edges produced during a build to ``.npy`` files in ``directory``:
+    ``sources.npy``, ``targets.npy`` and (for weighted graphs) ``weights.npy``.
+    """
+
+    def __init__(self, directory, weighted: bool):
+        directory = Path(directory)
+
+        self.sources = NpyAppender(directory / "sources.npy", np.uint32)
+        self.targets = NpyAppender(directory / "targets.npy", np.uint32)
+        self.weights = NpyAppender(directory / "weights.npy", np.float64) if weighted else None
+
+    def __call__(self, sources, targets, weights):
+        self.sources.append(sources)
+        self.targets.append(targets)
+
+        if self.weights is not None:
+            self.weights.append(weights)
+
+    def close(self):
+        self.sources.close()
+        self.targets.close()
+
+        if self.weights is not None:
+            self.weights.close()
+
+
+class EdgeArraysWriter:
+    """
+    Edge sink accumulating the blocks of edges produced during a build in memory,
+    optionally adding an ``offset`` to the node indices.
+    """
+
+    def __init__(self, weighted: bool, offset: int = 0):
+        self.weighted = weighted
+        self.offset = offset
+
+        self._sources = []
+        self._targets = []
+        self._weights = []
+
+    def __call__(self, sources, targets, weights):
+        # the blocks are views of the collector buffers, which are reused
+        self._sources.append(np.add(sources, self.offset, dtype=np.uint32))
+        self._targets.append(np.add(targets, self.offset, dtype=np.uint32))
+
+        if self.weighted:
+            self._weights.append(np.array(weights, dtype=np.float64))
+
+    def arrays(self):
+        """Return the ``sources``, ``targets`` and ``weights`` (``None`` if unweighted) arrays of all the edges."""
+        sources = np.concatenate(self._sources) if self._sources else np.empty(0, dtype=np.uint32)
+        targets = np.concatenate(self._targets) if self._targets else np.empty(0, dtype=np.uint32)
+
+        if not self.weighted:
+            weights = None
+        else:
+            weights = np.concatenate(self._weights) if self._weights else np.empty(0, dtype=np.float64)
+
+        return sources, targets, weights
+
+
+def open_npy(path, mode: str = "r"):
+    """Open a ``.npy`` file as a memory-mapped array."""
+    return np.load(path, mmap_mode=mode)
+
+
+def create_npy(path, dtype, length: int):
+    """Create a new ``.npy`` file for a 1D array of the given length and open it as a (writable) memory-mapped array."""
+    return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(length,))
+
+
+def write_npy_chunked(path, length: int, dtype, get_chunk, chunk_size: int):
+    """
+    Write a 1D ``.npy`` file of the given length chunk by chunk, calling ``get_chunk(start, stop)``
+    to obtain the values for each chunk, and return it opened as a read-only memory-mapped array.
+    """
+    out = create_npy(path, dtype, length)
+
+    for start in range(0, length, chunk_size):
+        stop = min(start + chunk_size, length)
+        out[start:stop] = get_chunk(start, stop)
+
+    out.flush()
+    del out
+
+    return open_npy(path)
+
+
+def save_npy(path, arr):
+    """
+    Save an array as a ``.npy`` file.
+
+    The file is written under a temporary name and then renamed,
+    so that memory-mapped arrays of a previous file at the same path remain valid.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.stem + ".tmp.npy")
+
+    np.save(tmp_path, arr)
+    os.replace(tmp_path, path)
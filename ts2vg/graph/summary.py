@@ -25,7 +25,7 @@ def simple_summary(vg: "ts2vg.graph.base.VG", title: str = "Visibility Graph", l
     vg_config = {
         "General Type:": vg._general_type_name,
         "Directed:": vg.directed if vg.is_directed else "undirected",
-        "Weighted:": vg.weighted if vg.is_weighted else "unweighted",
+        "Weighted:": (vg.weighted if isinstance(vg.weighted, str) else "custom") if vg.is_weighted else "unweighted",
         "Parametric Min. Weight:": vg.min_weight if vg.min_weight is not None else "--",
         "Parametric Max. Weight:": vg.max_weight if vg.max_weight is not None else "--",
         "Penetrable Limit:": vg.penetrable_limit,
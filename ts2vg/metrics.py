@@ -0,0 +1,1166 @@
+"""
+Graph metrics computed directly on the arrays of a built visibility graph,
+without converting it to a graph object of another library (see :meth:`ts2vg.NaturalVG.as_networkx`).
+
+All the metrics consider the graph as undirected (edge directions are ignored) and, unless stated otherwise, unweighted.
+They work on the undirected adjacency of the graph in CSR form, which is computed once and cached in the graph.
+The graph must have been built with its edges (i.e. not with ``only_degrees``, ``only_node_stats`` or ``sink``).
+
+Examples
+--------
+.. code:: python
+
+    from ts2vg import NaturalVG
+    from ts2vg import metrics
+
+    g = NaturalVG().build(ts)
+
+    cc = metrics.local_clustering(g)
+    r = metrics.degree_assortativity(g)
+    l = metrics.average_shortest_path_length(g)
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+from ts2vg.graph._metrics import (
+    _add_product,
+    _bfs_stats,
+    _core_numbers,
+    _motif_codes,
+    _shortest_path_lengths,
+    _sliding_counts,
+    _triangles,
+    _window_degrees,
+)
+from ts2vg.graph.base import VG
+
+
+def triangles(g) -> np.ndarray:
+    """
+    Number of triangles through each node.
+
+    Parameters
+    ----------
+    g : VG
+        A built visibility graph.
+
+    Returns
+    -------
+    numpy.ndarray
+        1D ``int64`` array with the number of triangles through each node, in the same order as the input time series.
+    """
+    return _triangles(*g._undirected_csr())
+
+
+def local_clustering(g) -> np.ndarray:
+    """
+    Local clustering coefficient of each node.
+
+    The fraction of pairs of neighbours of a node that are also connected, ``0`` for nodes with fewer than two neighbours.
+
+    Parameters
+    ----------
+    g : VG
+        A built visibility graph.
+
+    Returns
+    -------
+    numpy.ndarray
+        1D ``float64`` array with the clustering coefficient of each node, in the same order as the input time series.
+    """
+    csr = g._undirected_csr()
+    degrees = np.diff(csr[0])
+    pairs = degrees * (degrees - 1) / 2
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(degrees > 1, _triangles(*csr) / pairs, 0.0)
+
+
+def average_clustering(g) -> float:
+    """
+    Average of the local clustering coefficients of all the nodes (see :func:`local_clustering`).
+
+    Parameters
+    ----------
+    g : VG
+        A built visibility graph.
+
+    Returns
+    -------
+    float
+        The average clustering coefficient, ``nan`` for empty graphs.
+    """
+    if g.n_vertices == 0:
+        return float("nan")
+
+    return float(np.mean(local_clustering(g)))
+
+
+def transitivity(g) -> float:
+    """
+    Global clustering coefficient (transitivity) of the graph.
+
+    The fraction of connected triples of nodes that are closed into triangles.
+
+    Parameters
+    ----------
+    g : VG
+        A built visibility graph.
+
+    Returns
+    -------
+    float
+        The transitivity of the graph, ``0`` if there are no connected triples.
+    """
+    csr = g._undirected_csr()
+    degrees = np.diff(csr[0])
+    n_triples = np.sum(degrees * (degrees - 1) // 2)
+
+    if n_triples == 0:
+        return 0.0
+
+    # each triangle is counted once for each of its 3 nodes, and closes 3 triples
+    return float(np.sum(_triangles(*csr)) / n_triples)
+
+
+def degree_assortativity(g) -> float:
+    """
+    Degree assortativity coefficient of the graph.
+
+    The Pearson correlation coefficient between the degrees of the two nodes at the ends of the edges
+    (see M. E. J. Newman, "Assortative Mixing in Networks", 2002).
+
+    Parameters
+    ----------
+    g : VG
+        A built visibility graph.
+
+    Returns
+    -------
+    float
+        The assortativity coefficient, in the range [-1, 1].
+        ``nan`` if undefined (e.g. if all the edges join nodes with the same degree).
+    """
+    sources, targets, _ = g._edge_columns()
+    degrees = np.diff(g._undirected_csr()[0]).astype(np.float64)
+
+    d_a = degrees[sources]
+    d_b = degrees[targets]
+
+    # moments of the degrees at the ends of the edges, taken in both directions
+    mean = np.mean(d_a + d_b) / 2
+    mean_sq = np.mean(d_a * d_a + d_b * d_b) / 2
+    mean_prod = np.mean(d_a * d_b)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return float((mean_prod - mean * mean) / (mean_sq - mean * mean))
+
+
+def joint_degree_distribution(g, normalize: bool = True):
+    """
+    Joint degree distribution :math:`P(k, k')` of the graph.
+
+    The empirical probability that the two ends of an edge (taken in both directions) have degrees :math:`k` and :math:`k'`.
+    It is symmetric, and its marginal is the degree distribution of the end of a random edge, :math:`k P(k) / \\langle k \\rangle`.
+
+    Returned as a sparse 2D histogram: only the pairs of degrees joined by at least one edge are listed,
+    so its size is bounded by the number of edges (and not by the square of the maximum degree).
+
+    Parameters
+    ----------
+    g : VG
+        A built visibility graph.
+
+    normalize : bool
+        If ``True``, return probabilities (that sum to 1).
+        If ``False``, return the number of edge ends, i.e. the number of edges joining nodes of degrees ``k`` and ``k'``
+        (edges joining two nodes of the same degree ``k`` are counted twice in ``(k, k)``).
+        Default ``True``.
+
+    Returns
+    -------
+    ks, ks_other, ps : numpy.ndarray
+        ``ps[i]`` is the probability (or count) of the pair of degrees ``(ks[i], ks_other[i])``.
+        Sorted by ``ks`` and then by ``ks_other``.
+    """
+    sources, targets, _ = g._edge_columns()
+    degrees = np.diff(g._undirected_csr()[0])
+
+    d_a = degrees[sources]
+    d_b = degrees[targets]
+
+    # each pair of degrees as a single integer, in both directions of the edges
+    k_max = np.int64(np.max(degrees, initial=0)) + 1
+    codes, counts = np.unique(np.concatenate((d_a * k_max + d_b, d_b * k_max + d_a)), return_counts=True)
+
+    ks, ks_other = np.divmod(codes, k_max)
+
+    if normalize:
+        return ks, ks_other, counts / max(2 * len(sources), 1)
+
+    return ks, ks_other, counts
+
+
+def average_degree_connectivity(g):
+    """
+    Average degree of the neighbors of the nodes of each degree, :math:`k_{nn}(k)`.
+
+    :math:`k_{nn}(k) = \\sum_{k'} k' P(k' | k)`, the average over the nodes with degree :math:`k`
+    of the average degree of their neighbors (see R. Pastor-Satorras et al., "Dynamical and correlation properties of the Internet", 2001).
+    An increasing (decreasing) :math:`k_{nn}(k)` indicates an assortative (disassortative) graph.
+
+    Parameters
+    ----------
+    g : VG
+        A built visibility graph.
+
+    Returns
+    -------
+    ks, knns : numpy.ndarray
+        ``knns[i]`` is the average neighbor degree of the nodes with degree ``ks[i]``.
+        Only the (nonzero) degree values of the nodes in the graph are listed in ``ks``.
+    """
+    sources, targets, _ = g._edge_columns()
+    degrees = np.diff(g._undirected_csr()[0])
+    n = len(degrees)
+
+    # sum of the degrees of the neighbors of each node, then over the nodes of each degree
+    neighbor_degrees = np.bincount(sources, weights=degrees[targets], minlength=n) + np.bincount(
+        targets, weights=degrees[sources], minlength=n
+    )
+    totals = np.bincount(degrees, weights=neighbor_degrees)
+    counts = np.bincount(degrees)
+
+    ks = np.flatnonzero(counts)
+    ks = ks[ks > 0]
+
+    return ks, totals[ks] / (ks * counts[ks])
+
+
+def _validate_motif_size(size: int):
+    if not 2 <= size <= 6:
+        raise ValueError(f"'size' must be between 2 and 6 (got {size}).")
+
+
+def motif_sequence(g, size: int = 4) -> np.ndarray:
+    """
+    Sequential visibility graph motif of each window of ``size`` consecutive nodes
+    (see L. Iacovacci and L. Lacasa, "Sequential visibility-graph motifs", 2016).
+
+    The motif of a window is the subgraph induced by its nodes, identified by a code with one bit for each pair of positions
+    ``(p, q)`` in the window (``0 <= p < q < size``, in lexicographic order), set if the nodes at these positions are connected.
+    E.g. for ``size=3`` the bits are (from the least significant) ``(0, 1)``, ``(0, 2)`` and ``(1, 2)``,
+    so ``0b111`` is a triangle and ``0b101`` is a path.
+    Consecutive nodes are always connected in visibility graphs (unless the time series contains NaN values
+    or ``min_weight`` or ``max_weight`` are used), so only the codes with all the bits ``(p, p + 1)`` set usually occur.
+
+    Computed in linear time from the edges between nodes closer than ``size``.
+
+    Parameters
+    ----------
+    g : VG
+        A built visibility graph.
+
+    size : int
+        Number of consecutive nodes in the motifs, between 2 and 6.
+        Default ``4``.
+
+    Returns
+    -------
+    numpy.ndarray
+        1D ``uint16`` array with the motif code of the window starting at each node (``n - size + 1`` windows).
+    """
+    _validate_motif_size(size)
+
+    return _motif_codes(*g._undirected_csr(), size)
+
+
+def motif_profile(g, size: int = 4, window: Optional[int] = None, step: int = 1, normalize: bool = True) -> np.ndarray:
+    """
+    Sequential visibility graph motif profile: the frequency of each motif (see :func:`motif_sequence`).
+
+    Parameters
+    ----------
+    g : VG
+        A built visibility graph.
+
+    size : int
+        Number of consecutive nodes in the motifs, between 2 and 6.
+        Default ``4``.
+
+    window : int, None
+        If not ``None``, compute a profile for each window of ``window`` consecutive nodes (sliding ``step`` nodes each time)
+        with the motifs fully contained in the window, instead of a single profile for the whole graph.
+        Must be at least ``size``.
+        Default ``None``.
+
+    step : int
+        Number of nodes between the starts of consecutive windows.
+        Only used with ``window``.
+        Default ``1``.
+
+    normalize : bool
+        If ``True``, return the relative frequencies of the motifs (summing to 1), otherwise the number of occurrences.
+        Default ``True``.
+
+    Returns
+    -------
+    numpy.ndarray
+        1D array with the frequency of each motif code (of length ``2 ** (size * (size - 1) // 2)``),
+        or 2D array with one such row for each window if ``window`` is used.
+    """
+    codes = motif_sequence(g, size)
+    n_codes = 1 << (size * (size - 1) // 2)
+
+    if window is None:
+        counts = np.bincount(codes, minlength=n_codes)
+    else:
+        if window < size:
+            raise ValueError(f"'window' must be at least 'size' (got {window} < {size}).")
+        if step < 1:
+            raise ValueError(f"'step' must be positive (got {step}).")
+
+        counts = _sliding_counts(codes, n_codes, window - size + 1, step)
+
+    if not normalize:
+        return counts
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return counts / np.sum(counts, axis=-1, keepdims=True)
+
+
+def motif_profiles(graphs, size: int = 4, normalize: bool = True) -> np.ndarray:
+    """
+    Sequential visibility graph motif profiles of several graphs (see :func:`motif_profile`),
+    e.g. the graphs of a batch of time series built with :func:`ts2vg.batch.build_parallel`.
+
+    Parameters
+    ----------
+    graphs : iterable of VG
+        Built visibility graphs.
+
+    size : int
+        Number of consecutive nodes in the motifs, between 2 and 6.
+        Default ``4``.
+
+    normalize : bool
+        If ``True``, return the relative frequencies of the motifs, otherwise the number of occurrences.
+        Default ``True``.
+
+    Returns
+    -------
+    numpy.ndarray
+        2D array with the profile of each graph as a row.
+    """
+    _validate_motif_size(size)
+
+    profiles = [motif_profile(g, size, normalize=normalize) for g in graphs]
+
+    return np.array(profiles).reshape(len(profiles), 1 << (size * (size - 1) // 2))
+
+
+def _kl_divergence(p, q) -> np.ndarray:
+    """Kullback-Leibler divergence between the distributions with counts ``p`` and ``q`` (along the last axis)."""
+    p = p / np.sum(p, axis=-1, keepdims=True)
+    q = q / np.sum(q, axis=-1, keepdims=True)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        terms = np.where((p > 0) & (q > 0), p * np.log(p / q), 0.0)
+
+    return np.where(np.isnan(p).any(axis=-1), np.nan, np.sum(terms, axis=-1))
+
+
+def _sequence_kl_divergence(degrees_out, degrees_in, order: int) -> np.ndarray:
+    """
+    Kullback-Leibler divergence between the distributions of blocks of ``order`` consecutive out degrees
+    and of blocks of consecutive in degrees read backwards (the out degrees of the reversed series),
+    for each row of the 2D arrays ``degrees_out`` and ``degrees_in`` (e.g. one per window).
+    """
+    n_rows, n = degrees_out.shape
+
+    if n < order or n_rows == 0:
+        return np.full(n_rows, np.nan)
+
+    blocks_out = np.lib.stride_tricks.sliding_window_view(degrees_out, order, axis=1).reshape(-1, order)
+    blocks_in = np.lib.stride_tricks.sliding_window_view(degrees_in[:, ::-1], order, axis=1).reshape(-1, order)
+
+    blocks = np.concatenate((blocks_out, blocks_in))
+    base = int(np.max(blocks, initial=0)) + 1
+
+    if base**order < 2**63:
+        # each block as a single integer, faster to sort than rows
+        blocks = blocks @ (base ** np.arange(order, dtype=np.int64))
+
+    _, inverse = np.unique(blocks, axis=0 if blocks.ndim == 2 else None, return_inverse=True)
+    n_values = np.max(inverse) + 1
+
+    # (row, block) pairs as single integers, only the pairs present are counted (the histograms are sparse)
+    rows = np.repeat(np.arange(n_rows, dtype=np.int64), n - order + 1)
+    keys, inverse = np.unique(np.concatenate((rows, rows)) * n_values + inverse.ravel(), return_inverse=True)
+    inverse = inverse.ravel()
+
+    # both distributions have n - order + 1 blocks in each row
+    p = np.bincount(inverse[: len(rows)], minlength=len(keys)) / (n - order + 1)
+    q = np.bincount(inverse[len(rows) :], minlength=len(keys)) / (n - order + 1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        terms = np.where((p > 0) & (q > 0), p * np.log(p / q), 0.0)
+
+    return np.bincount(keys // n_values, weights=terms, minlength=n_rows)
+
+
+def _reversed_motif_codes(size: int) -> np.ndarray:
+    """Code of the motif of the reversed window, for each motif code (see :func:`motif_sequence`)."""
+    pairs = [(p, q) for p in range(size) for q in range(p + 1, size)]
+    codes = np.arange(1 << len(pairs))
+    reversed_codes = np.zeros_like(codes)
+
+    for k, (p, q) in enumerate(pairs):
+        reversed_codes |= ((codes >> k) & 1) << pairs.index((size - 1 - q, size - 1 - p))
+
+    return reversed_codes
+
+
+_IRREVERSIBILITY_METHODS = ("degree", "degree_sequence", "motif")
+
+# maximum number of degrees computed at once for windowed irreversibility (see `irreversibility`)
+_WINDOW_BLOCK_SIZE = 1 << 20
+
+
+def irreversibility(
+    g,
+    method: str = "degree",
+    window: Optional[int] = None,
+    step: Optional[int] = None,
+    order: int = 2,
+    size: int = 4,
+):
+    """
+    Time irreversibility of the time series, measured on its visibility graph.
+
+    Computed as a Kullback-Leibler divergence (KLD), which is ``0`` for statistically time reversible series:
+
+    ``'degree'`` :
+        KLD between the out and in degree distributions of the graph, :math:`D(P_{out} \\| P_{in})`
+        (see L. Lacasa et al., "Time series irreversibility: a visibility graph approach", 2012).
+        The graph must be directed with ``directed='left_to_right'``.
+        Can be used with graphs built with ``only_degrees`` (but not with ``window``).
+
+    ``'degree_sequence'`` :
+        KLD between the distributions of the blocks of ``order`` consecutive out degrees and in degrees,
+        the latter read backwards in time so that they are the out degrees of the graph of the reversed series
+        (see L. Lacasa and R. Flanagan, "Time reversibility from visibility graphs of nonstationary processes", 2015).
+        The graph must be directed with ``directed='left_to_right'``.
+        Can be used with graphs built with ``only_degrees`` (but not with ``window``).
+
+    ``'motif'`` :
+        KLD between the sequential motif profile (see :func:`motif_profile`) of the graph
+        and the profile of the graph of the reversed time series,
+        which is obtained by reversing the motifs instead of building the reversed graph.
+
+    Degrees (or motifs) only present in one of the two distributions are left out of the sum.
+
+    Parameters
+    ----------
+    g : VG or iterable of VG
+        A built visibility graph, or several of them (e.g. the graphs of a batch of time series built with
+        :func:`ts2vg.batch.build_parallel`).
+
+    method : str
+        One of ``'degree'``, ``'degree_sequence'`` or ``'motif'``.
+        Default ``'degree'``.
+
+    window : int, None
+        If not ``None``, compute the irreversibility of each window of ``window`` consecutive nodes
+        (i.e. of the graph of each window of the time series), instead of a single value for the whole graph.
+        The degrees of the graph of each window are obtained from the edges, which must be available.
+        Default ``None``.
+
+    step : int, None
+        Number of nodes between the starts of consecutive windows.
+        If ``None``, the windows do not overlap (same as ``window``).
+        Only used with ``window``.
+        Default ``None``.
+
+    order : int
+        Length of the blocks of degrees, with ``method='degree_sequence'``.
+        Default ``2``.
+
+    size : int
+        Number of consecutive nodes in the motifs, between 2 and 6, with ``method='motif'``.
+        Default ``4``.
+
+    Returns
+    -------
+    float or numpy.ndarray or list
+        The irreversibility of the graph (``nan`` if the graph is too small), or a 1D array with the irreversibility of each
+        window if ``window`` is used.
+        For several graphs, an array with the result for each of them (or a list of arrays if ``window`` is used).
+    """
+    if not isinstance(g, VG):
+        results = [irreversibility(graph, method, window, step, order, size) for graph in g]
+
+        return results if window is not None else np.array(results, dtype=np.float64)
+
+    if method not in _IRREVERSIBILITY_METHODS:
+        raise ValueError(f"Invalid 'method' parameter: {method}. Must be one of {list(_IRREVERSIBILITY_METHODS)}")
+
+    if method != "motif" and g.directed != "left_to_right":
+        raise ValueError(f"Method '{method}' requires a directed graph with directed='left_to_right'.")
+
+    if method == "degree_sequence" and order < 1:
+        raise ValueError(f"'order' must be positive (got {order}).")
+
+    if window is not None:
+        step = window if step is None else step
+
+        if window < 1 or step < 1:
+            raise ValueError(f"'window' and 'step' must be positive (got {window} and {step}).")
+
+    if method == "motif":
+        reversed_codes = _reversed_motif_codes(size)
+
+        if window is None:
+            counts = motif_profile(g, size, normalize=False)
+        elif window < size:
+            raise ValueError(f"'window' must be at least 'size' (got {window} < {size}).")
+        else:
+            counts = motif_profile(g, size, window, step, normalize=False)
+
+        # the profile of the reversed series has the counts of the reversed motifs
+        result = _kl_divergence(counts, counts[..., reversed_codes])
+
+        return result if window is not None else float(result)
+
+    if window is None:
+        degrees_in = np.asarray(g.degrees_in, dtype=np.int64)
+        degrees_out = np.asarray(g.degrees_out, dtype=np.int64)
+
+        if method == "degree_sequence":
+            return float(_sequence_kl_divergence(degrees_out[None], degrees_in[None], order)[0])
+
+        if g.n_vertices == 0:
+            return float("nan")
+
+        n_values = max(np.max(degrees_in), np.max(degrees_out)) + 1
+
+        return float(_kl_divergence(np.bincount(degrees_out, minlength=n_values), np.bincount(degrees_in, minlength=n_values)))
+
+    if g._edges is None and g._sources is None:
+        raise ValueError(
+            "Windowed irreversibility requires the edges of the graph "
+            "(not available in graphs built with 'only_degrees', 'only_node_stats' or 'sink')."
+        )
+
+    csr = g._undirected_csr()
+    n_windows = (g.n_vertices - window) // step + 1 if g.n_vertices >= window else 0
+
+    # the windows are processed in blocks, so that the arrays of degrees of a block have at most
+    # `_WINDOW_BLOCK_SIZE` values (a dense array for all the windows would be O(n * window) with overlapping windows)
+    block = max(_WINDOW_BLOCK_SIZE // window, 1)
+    results = [np.empty(0)]
+
+    for first in range(0, n_windows, block):
+        # in left to right graphs, the in and out neighbours of each node are the ones before and after it
+        degrees_in, degrees_out = _window_degrees(*csr, window, step, first, min(block, n_windows - first))
+
+        if method == "degree_sequence":
+            results.append(_sequence_kl_divergence(degrees_out, degrees_in, order))
+            continue
+
+        # histograms of the degrees of all the windows of the block at once (degrees inside a window are lower than 'window')
+        offsets = np.arange(len(degrees_in))[:, None] * window
+        counts_in = np.bincount((degrees_in + offsets).ravel(), minlength=degrees_in.size).reshape(-1, window)
+        counts_out = np.bincount((degrees_out + offsets).ravel(), minlength=degrees_out.size).reshape(-1, window)
+
+        results.append(_kl_divergence(counts_out, counts_in))
+
+    return np.concatenate(results)
+
+
+class ConvergenceError(RuntimeError):
+    """
+    Exception class to raise when a power iteration does not converge within ``max_iter`` iterations.
+    """
+
+
+def _centrality_edges(g, use_weights: bool):
+    sources, targets, weights = g._edge_columns()
+
+    if not use_weights:
+        return sources, targets, None
+
+    if not g.is_weighted:
+        raise ValueError("'use_weights' can only be used in weighted graphs.")
+
+    return sources, targets, np.asarray(weights, dtype=np.float64)
+
+
+def _start_vector(g, start, default: float) -> np.ndarray:
+    n = g.n_vertices
+
+    if start is None:
+        return np.full(n, default, dtype=np.float64)
+
+    start = np.array(start, dtype=np.float64)
+
+    if start.shape != (n,):
+        raise ValueError(f"'start' must have one value for each node (got shape {start.shape} for {n} nodes).")
+
+    return start
+
+
+def _power_iteration(step, x, tol: float, max_iter: int) -> np.ndarray:
+    for _ in range(max_iter):
+        x_last = x
+        x = step(x_last)
+
+        # same convergence criterion as NetworkX
+        if np.sum(np.abs(x - x_last)) < len(x) * tol:
+            return x
+
+    raise ConvergenceError(f"Power iteration did not converge in {max_iter} iterations.")
+
+
+def pagerank(
+    g,
+    alpha: float = 0.85,
+    start=None,
+    tol: float = 1e-6,
+    max_iter: int = 100,
+    use_weights: bool = False,
+) -> np.ndarray:
+    """
+    PageRank of each node, computed by power iteration.
+
+    Each iteration is a single pass over the edge arrays of the graph.
+    Nodes without edges distribute their rank uniformly among all the nodes.
+    The result is the same as :func:`networkx.pagerank` (on the undirected graph).
+
+    Parameters
+    ----------
+    g : VG
+        A built visibility graph.
+
+    alpha : float
+        Damping factor.
+        Default ``0.85``.
+
+    start : 1D array like, None
+        Initial values for the iteration (warm start), e.g. the result of a previous computation on a similar graph,
+        such as the graph of an overlapping window of the same time series (aligned to the nodes of this graph).
+        Normalized to sum 1.
+        If ``None``, a uniform vector is used.
+        Default ``None``.
+
+    tol : float
+        Error tolerance used to check convergence, the iteration stops when the sum of the absolute changes of all the nodes
+        is lower than ``n * tol``.
+        Default ``1e-6``.
+
+    max_iter : int
+        Maximum number of iterations, :class:`ConvergenceError` is raised if the iteration has not converged.
+        Default ``100``.
+
+    use_weights : bool
+        If ``True``, edges are weighted by their weights (which must be non negative).
+        Only applicable for weighted graphs.
+        Default ``False``.
+
+    Returns
+    -------
+    numpy.ndarray
+        1D ``float64`` array with the PageRank of each node (summing to 1), in the same order as the input time series.
+    """
+    sources, targets, weights = _centrality_edges(g, use_weights)
+    n = g.n_vertices
+
+    if n == 0:
+        return np.zeros(0)
+
+    strengths = np.zeros(n)
+    _add_product(sources, targets, weights, np.ones(n), strengths)
+
+    dangling = strengths == 0
+    scale = np.divide(alpha, strengths, out=np.zeros(n), where=~dangling)
+
+    def step(x_last):
+        x = np.full(n, (alpha * np.sum(x_last[dangling]) + 1 - alpha) / n)
+        _add_product(sources, targets, weights, x_last * scale, x)
+
+        return x
+
+    x = _start_vector(g, start, 1 / n)
+
+    return _power_iteration(step, x / np.sum(x), tol, max_iter)
+
+
+def eigenvector_centrality(
+    g,
+    start=None,
+    tol: float = 1e-6,
+    max_iter: int = 100,
+    use_weights: bool = False,
+) -> np.ndarray:
+    """
+    Eigenvector centrality of each node, computed by power iteration.
+
+    Each iteration is a single pass over the edge arrays of the graph.
+    As in :func:`networkx.eigenvector_centrality`, the iteration uses the adjacency matrix plus the identity matrix
+    (same eigenvectors, but guaranteed to converge in bipartite graphs), and the result is the same.
+
+    Parameters
+    ----------
+    g : VG
+        A built visibility graph.
+
+    start : 1D array like, None
+        Initial values for the iteration (warm start), e.g. the result of a previous computation on a similar graph,
+        such as the graph of an overlapping window of the same time series (aligned to the nodes of this graph).
+        Must not be all zeros.
+        If ``None``, a uniform vector is used.
+        Default ``None``.
+
+    tol : float
+        Error tolerance used to check convergence, the iteration stops when the sum of the absolute changes of all the nodes
+        is lower than ``n * tol``.
+        Default ``1e-6``.
+
+    max_iter : int
+        Maximum number of iterations, :class:`ConvergenceError` is raised if the iteration has not converged.
+        Default ``100``.
+
+    use_weights : bool
+        If ``True``, edges are weighted by their weights (which must be non negative).
+        Only applicable for weighted graphs.
+        Default ``False``.
+
+    Returns
+    -------
+    numpy.ndarray
+        1D ``float64`` array with the eigenvector centrality of each node (with Euclidean norm 1),
+        in the same order as the input time series.
+    """
+    sources, targets, weights = _centrality_edges(g, use_weights)
+
+    def step(x_last):
+        x = x_last.copy()
+        _add_product(sources, targets, weights, x_last, x)
+
+        return x / (np.linalg.norm(x) or 1)
+
+    x = _start_vector(g, start, 1.0)
+
+    if g.n_vertices > 0 and np.sum(x) == 0:
+        raise ValueError("'start' cannot be all zeros.")
+
+    return _power_iteration(step, x / (np.sum(x) or 1), tol, max_iter)
+
+
+def katz_centrality(
+    g,
+    alpha: float = 0.1,
+    beta=1.0,
+    start=None,
+    tol: float = 1e-6,
+    max_iter: int = 1000,
+    normalized: bool = True,
+    use_weights: bool = False,
+) -> np.ndarray:
+    """
+    Katz centrality of each node, computed by power iteration.
+
+    Each iteration is a single pass over the edge arrays of the graph.
+    The result is the same as :func:`networkx.katz_centrality`.
+
+    Parameters
+    ----------
+    g : VG
+        A built visibility graph.
+
+    alpha : float
+        Attenuation factor.
+        Must be lower than the inverse of the largest eigenvalue of the adjacency matrix for the iteration to converge.
+        Default ``0.1``.
+
+    beta : float or 1D array like
+        Weight attributed to the immediate neighbourhood (of all the nodes, or of each node).
+        Default ``1.0``.
+
+    start : 1D array like, None
+        Initial values for the iteration (warm start), e.g. the (non normalized) result of a previous computation
+        on a similar graph, such as the graph of an overlapping window of the same time series
+        (aligned to the nodes of this graph).
+        If ``None``, a vector of zeros is used.
+        Default ``None``.
+
+    tol : float
+        Error tolerance used to check convergence, the iteration stops when the sum of the absolute changes of all the nodes
+        is lower than ``n * tol``.
+        Default ``1e-6``.
+
+    max_iter : int
+        Maximum number of iterations, :class:`ConvergenceError` is raised if the iteration has not converged.
+        Default ``1000``.
+
+    normalized : bool
+        If ``True``, normalize the result to Euclidean norm 1.
+        Default ``True``.
+
+    use_weights : bool
+        If ``True``, edges are weighted by their weights.
+        Only applicable for weighted graphs.
+        Default ``False``.
+
+    Returns
+    -------
+    numpy.ndarray
+        1D ``float64`` array with the Katz centrality of each node, in the same order as the input time series.
+    """
+    sources, targets, weights = _centrality_edges(g, use_weights)
+    n = g.n_vertices
+
+    beta = np.broadcast_to(np.asarray(beta, dtype=np.float64), (n,))
+
+    def step(x_last):
+        x = beta.copy()
+        _add_product(sources, targets, weights, alpha * x_last, x)
+
+        return x
+
+    x = _power_iteration(step, _start_vector(g, start, 0.0), tol, max_iter)
+
+    if normalized:
+        return x / (np.linalg.norm(x) or 1)
+
+    return x
+
+
+def core_numbers(g) -> np.ndarray:
+    """
+    Core number of each node.
+
+    The core number of a node is the largest *k* such that the node belongs to the *k*-core of the graph
+    (the largest subgraph where all the nodes have degree at least *k*).
+
+    Parameters
+    ----------
+    g : VG
+        A built visibility graph.
+
+    Returns
+    -------
+    numpy.ndarray
+        1D ``int64`` array with the core number of each node, in the same order as the input time series.
+    """
+    return _core_numbers(*g._undirected_csr()[:2])
+
+
+def k_core(g, k=None) -> np.ndarray:
+    """
+    Nodes of the *k*-core of the graph.
+
+    Parameters
+    ----------
+    g : VG
+        A built visibility graph.
+
+    k : int, None
+        Order of the core.
+        If ``None``, the main core (the core with the largest *k* that is not empty) is returned.
+        Default ``None``.
+
+    Returns
+    -------
+    numpy.ndarray
+        1D array with the (sorted) indices of the nodes in the *k*-core.
+    """
+    cores = core_numbers(g)
+
+    if k is None:
+        k = cores.max(initial=0)
+
+    return np.flatnonzero(cores >= k)
+
+
+def shortest_path_lengths(g, source: int) -> np.ndarray:
+    """
+    Length of the shortest paths from node ``source`` to every node.
+
+    Parameters
+    ----------
+    g : VG
+        A built visibility graph.
+
+    source : int
+        Index of the source node.
+
+    Returns
+    -------
+    numpy.ndarray
+        1D ``int64`` array with the number of edges in the shortest path to each node, ``-1`` for unreachable nodes.
+    """
+    if not 0 <= source < g.n_vertices:
+        raise IndexError(f"'source' out of range (got {source} for a graph with {g.n_vertices} nodes).")
+
+    return _shortest_path_lengths(*g._undirected_csr()[:2], source)
+
+
+def _bfs_sources(g, sample: Optional[int], seed) -> np.ndarray:
+    n = g.n_vertices
+
+    if n == 0:
+        raise ValueError("Path lengths are not defined for empty graphs.")
+
+    if sample is None or sample >= n:
+        return np.arange(n, dtype=np.uint32)
+
+    if sample < 1:
+        raise ValueError(f"'sample' must be positive (got {sample}).")
+
+    rng = np.random.default_rng(seed)
+
+    return np.sort(rng.choice(n, size=sample, replace=False)).astype(np.uint32)
+
+
+def _bfs(g, sources, threads: Optional[int], per_node: bool = False):
+    """
+    Run a breadth-first search from each of the ``sources``, splitting them between ``threads`` threads.
+
+    Return the sum of the distances from each source, the number of nodes it reaches and its eccentricity.
+    If ``per_node``, also return the sum and the maximum of the distances from the sources to each node.
+    """
+    indptr, indices, _ = g._undirected_csr()
+    n = g.n_vertices
+    k = len(sources)
+
+    if threads is None:
+        threads = os.cpu_count() or 1
+
+    if threads < 1:
+        raise ValueError(f"'threads' must be positive (got {threads}).")
+
+    totals = np.empty(k, dtype=np.int64)
+    reached = np.empty(k, dtype=np.int64)
+    eccentricities = np.empty(k, dtype=np.int64)
+
+    bounds = np.linspace(0, k, min(threads, k) + 1).astype(int)
+    node_totals = np.zeros((len(bounds) - 1, n) if per_node else (0, 0), dtype=np.int64)
+    node_max = np.zeros_like(node_totals)
+
+    def run(b):
+        lo, hi = bounds[b], bounds[b + 1]
+        _bfs_stats(
+            indptr,
+            indices,
+            sources[lo:hi],
+            totals[lo:hi],
+            reached[lo:hi],
+            eccentricities[lo:hi],
+            node_totals[b] if per_node else None,
+            node_max[b] if per_node else None,
+        )
+
+    if len(bounds) > 2:
+        # the searches release the GIL
+        with ThreadPoolExecutor(len(bounds) - 1) as executor:
+            list(executor.map(run, range(len(bounds) - 1)))
+    elif k > 0:
+        run(0)
+
+    if per_node:
+        return totals, reached, eccentricities, node_totals.sum(axis=0), node_max.max(axis=0, initial=0)
+
+    return totals, reached, eccentricities
+
+
+def _check_connected(g, reached):
+    if np.any(reached != g.n_vertices):
+        raise ValueError("Graph is not connected.")
+
+
+def average_shortest_path_length(g, sample: Optional[int] = None, seed=None, threads: Optional[int] = None) -> float:
+    """
+    Average length of the shortest paths between all pairs of nodes.
+
+    Computed with a breadth-first search from every node (in *O(n·m)* time), or from a random sample of nodes.
+    In that case the result is the average length of the shortest paths from the sampled nodes, an unbiased estimate.
+
+    Parameters
+    ----------
+    g : VG
+        A built visibility graph.
+        Must be connected (which is always the case for natural and horizontal visibility graphs
+        unless the time series contains NaN values or ``min_weight`` or ``max_weight`` are used).
+
+    sample : int, None
+        If not ``None``, only search from this number of source nodes drawn at random (without replacement)
+        and return an approximation.
+        If ``None`` or larger than or equal to the number of nodes, all the nodes are used and the result is exact.
+        Default ``None``.
+
+    seed : int, numpy.random.Generator, optional
+        Seed or random generator used to draw the sample.
+
+    threads : int, None
+        Number of threads running the breadth-first searches.
+        If ``None``, the number of processors of the machine is used.
+        Default ``None``.
+
+    Returns
+    -------
+    float
+        The average shortest path length, ``0`` for graphs with a single node.
+    """
+    totals, reached, _ = _bfs(g, _bfs_sources(g, sample, seed), threads)
+    _check_connected(g, reached)
+
+    if g.n_vertices == 1:
+        return 0.0
+
+    return float(np.sum(totals) / (len(totals) * (g.n_vertices - 1)))
+
+
+def diameter(g, sample: Optional[int] = None, seed=None, threads: Optional[int] = None) -> int:
+    """
+    Diameter of the graph (the largest length of the shortest paths between any pair of nodes).
+
+    Computed with a breadth-first search from every node (in *O(n·m)* time), or from a random sample of nodes.
+    In that case the result is the largest eccentricity of the sampled nodes, a lower bound of the diameter.
+
+    Parameters
+    ----------
+    g : VG
+        A built visibility graph.
+        Must be connected (see :func:`average_shortest_path_length`).
+
+    sample : int, None
+        If not ``None``, only search from this number of source nodes drawn at random (without replacement)
+        and return an approximation.
+        If ``None`` or larger than or equal to the number of nodes, all the nodes are used and the result is exact.
+        Default ``None``.
+
+    seed : int, numpy.random.Generator, optional
+        Seed or random generator used to draw the sample.
+
+    threads : int, None
+        Number of threads running the breadth-first searches.
+        If ``None``, the number of processors of the machine is used.
+        Default ``None``.
+
+    Returns
+    -------
+    int
+        The diameter of the graph.
+    """
+    _, reached, eccentricities = _bfs(g, _bfs_sources(g, sample, seed), threads)
+    _check_connected(g, reached)
+
+    return int(np.max(eccentricities))
+
+
+def eccentricity(g, sample: Optional[int] = None, seed=None, threads: Optional[int] = None) -> np.ndarray:
+    """
+    Eccentricity of each node (the largest length of the shortest paths from the node to any other node).
+
+    Computed with a breadth-first search from every node (in *O(n·m)* time), or from a random sample of nodes.
+    In that case the result for each node is the largest distance to the sampled nodes, a lower bound of its eccentricity.
+
+    Parameters
+    ----------
+    g : VG
+        A built visibility graph.
+        Must be connected (see :func:`average_shortest_path_length`).
+
+    sample : int, None
+        If not ``None``, only search from this number of source nodes drawn at random (without replacement)
+        and return an approximation.
+        If ``None`` or larger than or equal to the number of nodes, all the nodes are used and the result is exact.
+        Default ``None``.
+
+    seed : int, numpy.random.Generator, optional
+        Seed or random generator used to draw the sample.
+
+    threads : int, None
+        Number of threads running the breadth-first searches.
+        If ``None``, the number of processors of the machine is used.
+        Default ``None``.
+
+    Returns
+    -------
+    numpy.ndarray
+        1D ``int64`` array with the eccentricity of each node, in the same order as the input time series.
+    """
+    sources = _bfs_sources(g, sample, seed)
+
+    if len(sources) == g.n_vertices:
+        _, reached, eccentricities = _bfs(g, sources, threads)
+        _check_connected(g, reached)
+
+        return eccentricities
+
+    _, reached, _, _, node_max = _bfs(g, sources, threads, per_node=True)
+    _check_connected(g, reached)
+
+    return node_max
+
+
+def closeness(g, sample: Optional[int] = None, seed=None, threads: Optional[int] = None) -> np.ndarray:
+    """
+    Closeness centrality of each node.
+
+    The inverse of the average length of the shortest paths from the node to the nodes it can reach,
+    scaled by the fraction of nodes it can reach
+    (as in :func:`networkx.closeness_centrality`, following S. Wasserman and K. Faust, "Social Network Analysis", 1994).
+    ``0`` for isolated nodes.
+
+    Computed with a breadth-first search from every node (in *O(n·m)* time), or from a random sample of nodes.
+    In that case the average length of the shortest paths from each node is estimated by the average length of the shortest
+    paths to the sampled nodes (see D. Eppstein and J. Wang, "Fast Approximation of Centrality", 2001),
+    and the graph must be connected.
+
+    Parameters
+    ----------
+    g : VG
+        A built visibility graph.
+
+    sample : int, None
+        If not ``None``, only search from this number of source nodes drawn at random (without replacement)
+        and return an approximation.
+        If ``None`` or larger than or equal to the number of nodes, all the nodes are used and the result is exact.
+        Default ``None``.
+
+    seed : int, numpy.random.Generator, optional
+        Seed or random generator used to draw the sample.
+
+    threads : int, None
+        Number of threads running the breadth-first searches.
+        If ``None``, the number of processors of the machine is used.
+        Default ``None``.
+
+    Returns
+    -------
+    numpy.ndarray
+        1D ``float64`` array with the closeness centrality of each node, in the same order as the input time series.
+    """
+    n = g.n_vertices
+    sources = _bfs_sources(g, sample, seed)
+
+    if len(sources) == n:
+        totals, reached, _ = _bfs(g, sources, threads)
+        reached_others = (reached - 1).astype(np.float64)
+    else:
+        _, reached, _, node_totals, _ = _bfs(g, sources, threads, per_node=True)
+        _check_connected(g, reached)
+
+        # the distance from a node to itself (0) is also sampled
+        totals = node_totals * (n / len(sources))
+        reached_others = np.full(n, n - 1, dtype=np.float64)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(totals > 0, reached_others / totals * reached_others / max(n - 1, 1), 0.0)
+